@@ -4,7 +4,7 @@
 
 from .plugin import MkRefsPlugin
 
-from .apidocs import render_apidocs, PackageDoc
+from .apidocs import render_apidocs, render_apidocs_list, ApidocsWorker, PackageDoc
 
 from .biblio import render_biblio
 
@@ -12,6 +12,8 @@ from .glossary import render_glossary
 
 from .util import load_kg
 
+from .registry import get_kg, invalidate_kg
+
 from .cli import cli
 
 from .version import __version__
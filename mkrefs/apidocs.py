@@ -23,8 +23,10 @@ In particular, this library...
 You're welcome.
 """
 
+import atexit
 import importlib
 import inspect
+import multiprocessing
 import os
 import re
 import sys
@@ -36,7 +38,10 @@ import kglab
 import pathlib
 import rdflib  # type: ignore  # pylint: disable=E0401
 
-from .util import render_reference
+from .util import prune_pages, render_pages, render_reference
+
+
+APIDOCS_WORKER_TIMEOUT: float = 300.0
 
 
 class PackageDoc:
@@ -58,6 +63,7 @@ See also:
         package_name: str,
         git_url: str,
         class_list: typing.List[str],
+        package_obj: typing.Optional[typing.Any] = None,
         ) -> None:
         """
 Constructor, to configure a `PackageDoc` object.
@@ -70,18 +76,18 @@ URL for the Git source repository
 
     class_list:
 list of the classes to include in the apidocs
+
+    package_obj:
+optional, an already imported package module to document, e.g., as kept warm by an `ApidocsWorker`; otherwise the package gets loaded from source
         """
         self.package_name = package_name
         self.git_url = git_url
         self.class_list = class_list
 
-        # hunt for the package
-        spec = importlib.util.spec_from_file_location(self.package_name, self.package_name + "/__init__.py")
-
-        #self.package_obj = sys.modules[self.package_name]
-        self.package_obj = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(self.package_obj)  # type: ignore
-        sys.modules[spec.name] = self.package_obj
+        if package_obj is not None:
+            self.package_obj = package_obj
+        else:
+            self.package_obj = self.load_package(self.package_name)
 
         # prepare a file path prefix (to remove later, per file)
         pkg_path = os.path.dirname(inspect.getfile(self.package_obj))
@@ -100,6 +106,31 @@ list of the classes to include in the apidocs
         }
 
 
+    @classmethod
+    def load_package (
+        cls,
+        package_name: str,
+        ) -> typing.Any:
+        """
+Hunt for the package source and execute its `__init__.py` file,
+registering the resulting module in `sys.modules`.
+
+    package_name:
+name of the Python package
+
+    returns:
+the loaded package module
+        """
+        spec = importlib.util.spec_from_file_location(package_name, package_name + "/__init__.py")
+
+        #package_obj = sys.modules[package_name]
+        package_obj = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(package_obj)  # type: ignore
+        sys.modules[spec.name] = package_obj
+
+        return package_obj
+
+
     def show_all_elements (
         self
         ) -> None:
@@ -763,7 +794,618 @@ generated knowledge graph
         return kg
 
 
-def render_apidocs (  # pylint: disable=R0914
+def _package_mtimes (
+    package_name: str,
+    ) -> typing.Dict[str, float]:
+    """
+Collect the source file modification times for the given package and
+all of its currently imported submodules.
+
+    package_name:
+name of the Python package
+
+    returns:
+a dictionary of module names mapped to their source file mtimes
+    """
+    mtimes: typing.Dict[str, float] = {}
+
+    for mod_name, mod_obj in list(sys.modules.items()):
+        if mod_name == package_name or mod_name.startswith(package_name + "."):
+            file = getattr(mod_obj, "__file__", None)
+
+            if file and os.path.exists(file):
+                mtimes[mod_name] = os.path.getmtime(file)
+
+    return mtimes
+
+
+def _reload_package (
+    package_name: str,
+    mtimes: typing.Dict[str, float],
+    ) -> typing.Tuple[typing.Any, typing.Dict[str, float]]:
+    """
+Import the given package on first use, otherwise re-execute only those
+of its modules whose source files have changed since the last call.
+Submodules get reloaded deepest first, and the package `__init__.py`
+last, so that its re-exported names pick up the changes.
+
+    package_name:
+name of the Python package
+
+    mtimes:
+source file mtimes recorded by the previous call, empty on first use
+
+    returns:
+a tuple of the package module and the updated source file mtimes
+    """
+    if package_name not in sys.modules or not mtimes:
+        package_obj = PackageDoc.load_package(package_name)
+        return package_obj, _package_mtimes(package_name)
+
+    current = _package_mtimes(package_name)
+
+    changed = [
+        mod_name
+        for mod_name, mtime in current.items()
+        if mtimes.get(mod_name) != mtime
+        ]
+
+    if changed and package_name not in changed:
+        changed.append(package_name)
+
+    reloaded: typing.Set[str] = set()
+
+    while changed:
+        for mod_name in sorted(changed, key=lambda n: n.count("."), reverse=True):
+            _reexec_module(sys.modules[mod_name])
+
+        reloaded.update(changed)
+
+        # modules which bound names from a reloaded module, e.g., with
+        # `from .x import y`, still hold the previous objects
+        changed = [
+            mod_name
+            for mod_name in _package_mtimes(package_name)
+            if mod_name not in reloaded and _has_stale_names(sys.modules[mod_name], reloaded)
+            ]
+
+    # reloading may have imported new submodules
+    return sys.modules[package_name], _package_mtimes(package_name)
+
+
+_MODULE_ATTRS: typing.Tuple[str, ...] = (
+    "__name__",
+    "__file__",
+    "__cached__",
+    "__loader__",
+    "__package__",
+    "__path__",
+    "__spec__",
+    "__builtins__",
+    )
+
+
+def _reexec_module (
+    mod_obj: typing.Any,
+    ) -> None:
+    """
+Re-execute a module in place, starting from an empty namespace so that
+the names deleted from its source do not linger.
+
+    mod_obj:
+the module to re-execute
+    """
+    mod_dict = mod_obj.__dict__
+    kept = { key: mod_dict[key] for key in _MODULE_ATTRS if key in mod_dict }
+    mod_dict.clear()
+    mod_dict.update(kept)
+
+    # the import system only binds a submodule onto its package when it
+    # first gets imported
+    prefix = mod_obj.__name__ + "."
+
+    for sub_name, sub_obj in list(sys.modules.items()):
+        if sub_name.startswith(prefix) and "." not in sub_name[len(prefix):]:
+            mod_dict[sub_name[len(prefix):]] = sub_obj
+
+    mod_obj.__spec__.loader.exec_module(mod_obj)
+
+
+def _has_stale_names (
+    mod_obj: typing.Any,
+    reloaded: typing.Set[str],
+    ) -> bool:
+    """
+Determine whether a module holds any classes or functions which were
+defined by one of the reloaded modules before it got reloaded.
+
+    mod_obj:
+the module to check
+
+    reloaded:
+names of the reloaded modules
+
+    returns:
+boolean flag, for whether the module needs to be re-executed too
+    """
+    for obj in list(vars(mod_obj).values()):
+        if not (inspect.isclass(obj) or inspect.isfunction(obj)):
+            continue
+
+        source_name = getattr(obj, "__module__", None)
+
+        if source_name in reloaded and getattr(sys.modules[source_name], obj.__name__, None) is not obj:
+            return True
+
+    return False
+
+
+def _apidocs_worker_loop (
+    conn: typing.Any,
+    package_name: str,
+    git_url: str,
+    ) -> None:
+    """
+Request loop for an `ApidocsWorker` process: each request is a list of
+classes to include, and each response is a `(status, result)` tuple
+with either the apidocs `meta` or a formatted traceback.
+
+    conn:
+worker end of the `multiprocessing.Pipe` connection
+
+    package_name:
+name of the Python package
+
+    git_url:
+URL for the Git source repository
+    """
+    mtimes: typing.Dict[str, float] = {}
+
+    while True:
+        try:
+            class_list = conn.recv()
+        except EOFError:
+            break
+
+        if class_list is None:
+            break
+
+        try:
+            package_obj, mtimes = _reload_package(package_name, mtimes)
+
+            pkg_doc = PackageDoc(package_name, git_url, class_list, package_obj=package_obj)
+            pkg_doc.build()
+
+            conn.send(("ok", pkg_doc.meta))
+        except Exception:  # pylint: disable=W0703
+            # a failed reload can leave the modules half-updated, so exit
+            # and let the next request start a fresh worker process
+            conn.send(("error", traceback.format_exc()))
+            break
+
+    conn.close()
+
+
+class ApidocsWorker:
+    """
+Long-lived worker process which keeps the documented package imported,
+so that rebuilds under `mkdocs serve` only need to reload the modules
+which changed instead of re-executing the whole package in the MkDocs
+process.
+    """
+
+    def __init__ (
+        self,
+        package_name: str,
+        git_url: str,
+        ) -> None:
+        """
+Constructor, which starts the worker process.
+
+    package_name:
+name of the Python package
+
+    git_url:
+URL for the Git source repository
+        """
+        self.package_name = package_name
+        self.git_url = git_url
+
+        self.conn, child_conn = multiprocessing.Pipe()
+
+        self.proc = multiprocessing.Process(
+            target=_apidocs_worker_loop,
+            args=(child_conn, package_name, git_url,),
+            daemon=True,
+            )
+
+        self.proc.start()
+        child_conn.close()
+
+
+    def is_alive (
+        self
+        ) -> bool:
+        """
+Check whether the worker process is still running.
+
+    returns:
+boolean flag, for whether the worker can accept requests
+        """
+        return not self.conn.closed and self.proc.is_alive()
+
+
+    def request (
+        self,
+        class_list: typing.List[str],
+        ) -> None:
+        """
+Send a request for an updated apidocs `meta` to the worker process,
+without waiting for the result, so that several workers can build
+their apidocs concurrently.
+
+    class_list:
+list of the classes to include in the apidocs
+        """
+        self.conn.send(class_list)
+
+
+    def result (
+        self,
+        timeout: float = APIDOCS_WORKER_TIMEOUT,
+        ) -> dict:
+        """
+Wait for the result of the pending request to the worker process.
+A worker which hangs or crashes gets shut down, so that the next call
+to `get_apidocs_worker()` starts a fresh one.
+
+    timeout:
+maximum time to wait, in seconds
+
+    returns:
+apidocs metadata, as built by `PackageDoc.build()`
+        """
+        try:
+            if not self.conn.poll(timeout):
+                raise TimeoutError(f"no response after {timeout} sec")
+
+            status, result = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.close()
+            raise ChildProcessError(f"apidocs worker for `{self.package_name}` failed: {e}") from e
+
+        if status != "ok":
+            raise Exception(f"apidocs worker for `{self.package_name}` failed:\n{result}")
+
+        return result
+
+
+    def get_meta (
+        self,
+        class_list: typing.List[str],
+        ) -> dict:
+        """
+Request an updated apidocs `meta` from the worker process.
+
+    class_list:
+list of the classes to include in the apidocs
+
+    returns:
+apidocs metadata, as built by `PackageDoc.build()`
+        """
+        self.request(class_list)
+        return self.result()
+
+
+    def close (
+        self
+        ) -> None:
+        """
+Shut down the worker process.
+        """
+        if self.proc.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+
+            self.proc.join(timeout=5)
+
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(timeout=1)
+
+        # a hung worker may not respond to `SIGTERM`
+        if self.proc.is_alive():
+            self.proc.kill()
+            self.proc.join()
+
+        self.conn.close()
+
+
+_APIDOCS_WORKERS: typing.Dict[typing.Tuple[str, str], ApidocsWorker] = {}
+
+
+def _get_worker_meta (
+    worker: ApidocsWorker,
+    apidocs_config: dict,
+    ) -> dict:
+    """
+Wait for the apidocs `meta` from a long-lived worker process, restarting
+the worker once if it hangs or crashes.
+
+    worker:
+the worker, which already has the request pending
+
+    apidocs_config:
+configuration for the apidocs package entry
+
+    returns:
+apidocs metadata, as built by `PackageDoc.build()`
+    """
+    timeout = float(apidocs_config.get("worker_timeout", APIDOCS_WORKER_TIMEOUT))
+
+    try:
+        return worker.result(timeout)
+    except ChildProcessError as e:
+        print(f"WARNING: {e}; restarting the worker")
+
+    worker = get_apidocs_worker(apidocs_config["package"], apidocs_config["git"])
+    worker.request(get_includes(apidocs_config))
+
+    return worker.result(timeout)
+
+
+def get_apidocs_worker (
+    package_name: str,
+    git_url: str,
+    ) -> ApidocsWorker:
+    """
+Get the process-lifetime `ApidocsWorker` for the given package,
+starting a new one if none is running yet.
+
+    package_name:
+name of the Python package
+
+    git_url:
+URL for the Git source repository
+
+    returns:
+a running apidocs worker
+    """
+    key = (package_name, git_url,)
+    worker = _APIDOCS_WORKERS.get(key)
+
+    if worker is None or not worker.is_alive():
+        worker = ApidocsWorker(package_name, git_url)
+        _APIDOCS_WORKERS[key] = worker
+
+    return worker
+
+
+@atexit.register
+def _close_apidocs_workers () -> None:
+    """
+Shut down any apidocs workers when the MkDocs process exits.
+    """
+    for worker in _APIDOCS_WORKERS.values():
+        worker.close()
+
+    _APIDOCS_WORKERS.clear()
+
+
+def get_apidocs_configs (
+    local_config: dict,
+    ) -> typing.List[dict]:
+    """
+Get the list of package entries from the `apidocs` local
+configuration, which may be either a single package entry or a list
+of them.
+
+    local_config:
+local configuration
+
+    returns:
+list of apidocs package entries
+    """
+    apidocs_config = local_config["apidocs"]
+
+    if isinstance(apidocs_config, list):
+        return apidocs_config
+
+    return [ apidocs_config ]
+
+
+def get_includes (
+    apidocs_config: dict,
+    ) -> typing.List[str]:
+    """
+Parse the class names to include for an apidocs package entry.
+
+    apidocs_config:
+configuration for one apidocs package entry
+
+    returns:
+list of class names
+    """
+    return [
+        name.strip()
+        for name in apidocs_config["includes"].split(",")
+    ]
+
+
+def build_package_metas (
+    apidocs_configs: typing.List[dict],
+    ) -> typing.List[dict]:
+    """
+Build the apidocs metadata for each of the given package entries.
+A single package gets documented in the current process, unless its
+`worker` parameter is set.
+Multiple packages each get documented in their own worker process, so
+that their `sys.modules` registrations cannot collide, and all the
+workers run concurrently.
+
+    apidocs_configs:
+list of apidocs package entries
+
+    returns:
+list of apidocs metadata, in the same order as the entries
+    """
+    if len(apidocs_configs) == 1 and not apidocs_configs[0].get("worker"):
+        apidocs_config = apidocs_configs[0]
+
+        pkg_doc = PackageDoc(
+            apidocs_config["package"],
+            apidocs_config["git"],
+            get_includes(apidocs_config),
+            )
+
+        # hardcore debug only:
+        #pkg_doc.show_all_elements()
+
+        # build the apidocs markdown
+        pkg_doc.build()
+
+        return [ pkg_doc.meta ]
+
+    workers: typing.List[typing.Tuple[ApidocsWorker, bool]] = []
+
+    try:
+        for apidocs_config in apidocs_configs:
+            if apidocs_config.get("worker"):
+                # keep the package imported in a long-lived worker process
+                worker = get_apidocs_worker(apidocs_config["package"], apidocs_config["git"])
+                workers.append((worker, False,))
+            else:
+                worker = ApidocsWorker(apidocs_config["package"], apidocs_config["git"])
+                workers.append((worker, True,))
+
+            worker.request(get_includes(apidocs_config))
+
+        metas: typing.List[dict] = []
+
+        for (worker, transient), apidocs_config in zip(workers, apidocs_configs):
+            if transient:
+                metas.append(worker.result(float(apidocs_config.get("worker_timeout", APIDOCS_WORKER_TIMEOUT))))
+            else:
+                metas.append(_get_worker_meta(worker, apidocs_config))
+
+        return metas
+    finally:
+        for worker, transient in workers:
+            if transient:
+                worker.close()
+
+
+def get_class_page_jobs (
+    local_config: dict,
+    metas: typing.List[dict],
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    ) -> typing.Tuple[list, list]:
+    """
+Prepare the rendering jobs for the per-class pages of a split apidocs
+reference, which get placed in a subdirectory named after the index
+page, e.g., `ref/PackageDoc.md` for `ref.md`
+When several packages share one index page, the class pages get
+prefixed by package name, e.g., `ref/mkrefs.PackageDoc.md`
+
+    local_config:
+configuration for the apidocs package entry, including the `class_template` for per-class pages
+
+    metas:
+list of apidocs metadata, as built by `PackageDoc.build()`
+
+    template_path:
+file path for Jinja2 template for rendering the apidocs index page
+
+    markdown_path:
+file path for the rendered Markdown index page
+
+    returns:
+a tuple of the list of `(template_path, markdown_path, groups)` tuples to render, and the list of `[package, class_name, class_page]` links for the index page
+    """
+    class_template_path = template_path.parent / local_config["class_template"]
+    class_dir = markdown_path.parent / markdown_path.stem
+    class_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs: typing.List[typing.Tuple[pathlib.Path, pathlib.Path, dict]] = []
+    pages: typing.List[typing.List[str]] = []
+
+    for meta in metas:
+        for class_name, class_meta in meta["class"].items():
+            page_meta = {
+                key: val
+                for key, val in meta.items()
+                if key not in [ "class", "function", "type" ]
+            }
+
+            page_meta["class"] = { class_name: class_meta }
+
+            if len(metas) > 1:
+                page_name = f"{meta['package']}.{class_name}.md"
+            else:
+                page_name = f"{class_name}.md"
+
+            jobs.append((
+                class_template_path,
+                class_dir / page_name,
+                { "package": [ page_meta ] },
+            ))
+
+            pages.append([ meta["package"], class_name, f"{markdown_path.stem}/{page_name}" ])
+
+    return jobs, pages
+
+
+def render_apidocs_page (
+    apidocs_configs: typing.List[dict],
+    metas: typing.List[dict],
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    ) -> typing.Dict[str, list]:
+    """
+Render the Markdown for one apidocs reference page, which may combine
+one or more packages.
+
+    apidocs_configs:
+list of apidocs package entries which share this page; the first entry determines whether the page gets split
+
+    metas:
+list of apidocs metadata, in the same order as the entries
+
+    template_path:
+file path for Jinja2 template for rendering an apidocs reference page in MkDocs
+
+    markdown_path:
+file path for the rendered Markdown file
+
+    returns:
+the apidocs data used to render the page
+    """
+    # render the JSON into Markdown using the Jinja2 template
+    groups: typing.Dict[str, list] = {
+        "package": metas,
+    }
+
+    if apidocs_configs[0].get("split"):
+        jobs, groups["pages"] = get_class_page_jobs(apidocs_configs[0], metas, template_path, markdown_path)
+        jobs.append((template_path, markdown_path, groups,))
+        render_pages(jobs)
+
+        # remove the pages for classes which got deleted or renamed
+        prune_pages(markdown_path.parent / markdown_path.stem, [ class_markdown_path for _, class_markdown_path, _ in jobs ])
+    else:
+        render_reference(
+            template_path,
+            markdown_path,
+            groups,
+        )
+
+    return groups
+
+
+def render_apidocs (
     local_config: dict,
     template_path: pathlib.Path,
     markdown_path: pathlib.Path,
@@ -785,40 +1427,61 @@ file path for the rendered Markdown file
 rendered Markdown
     """
     groups: typing.Dict[str, list] = {}
+    apidocs_configs = get_apidocs_configs(local_config)
 
-    package_name = local_config["apidocs"]["package"]
-    git_url = local_config["apidocs"]["git"]
+    try:
+        metas = build_package_metas(apidocs_configs)
+        groups = render_apidocs_page(apidocs_configs, metas, template_path, markdown_path)
+    except Exception as e:  # pylint: disable=W0703
+        print(f"Error rendering apidocs: {e}")
+        traceback.print_exc()
 
-    includes = [
-        name.strip()
-        for name in local_config["apidocs"]["includes"].split(",")
-    ]
+    return groups
 
-    pkg_doc = PackageDoc(
-        package_name,
-        git_url,
-        includes,
-        )
+
+def render_apidocs_list (
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> typing.Dict[str, typing.Dict[str, list]]:
+    """
+Render the Markdown for all of the apidocs reference pages, where the
+`apidocs` parameter may be either one package entry or a list of them.
+Entries which name the same `page` get rendered together as one
+combined reference, using the template of the first such entry.
+All of the packages get documented concurrently, so the total time is
+close to that of the slowest package.
+
+    local_config:
+local configuration, including the apidocs package entries
+
+    docs_dir:
+base directory for the templates and the rendered Markdown files
+
+    returns:
+the apidocs data used to render each page, keyed by page name
+    """
+    results: typing.Dict[str, typing.Dict[str, list]] = {}
+    apidocs_configs = get_apidocs_configs(local_config)
 
     try:
-        # hardcore debug only:
-        #pkg_doc.show_all_elements()
+        metas = build_package_metas(apidocs_configs)
 
-        # build the apidocs markdown
-        pkg_doc.build()
+        pages: typing.Dict[str, typing.List[int]] = {}
 
-        # render the JSON into Markdown using the Jinja2 template
-        groups = {
-            "package": [ pkg_doc.meta ],
-        }
+        for i, apidocs_config in enumerate(apidocs_configs):
+            pages.setdefault(apidocs_config["page"], []).append(i)
 
-        render_reference(
-            template_path,
-            markdown_path,
-            groups,
-        )
+        for page, indices in pages.items():
+            first_config = apidocs_configs[indices[0]]
+
+            results[page] = render_apidocs_page(
+                [ apidocs_configs[i] for i in indices ],
+                [ metas[i] for i in indices ],
+                docs_dir / first_config["template"],
+                docs_dir / page,
+            )
     except Exception as e:  # pylint: disable=W0703
         print(f"Error rendering apidocs: {e}")
         traceback.print_exc()
 
-    return groups
+    return results
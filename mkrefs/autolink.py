@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Link the mentions of glossary terms in the Markdown of each page, using
+an Aho-Corasick automaton which finds all of the terms in one linear
+scan of the text, instead of one regular expression per term.
+"""
+
+from collections import deque
+import hashlib
+import posixpath
+import typing
+
+from .util import split_markdown
+
+
+class TermMatcher:
+    """
+Aho-Corasick automaton for case-insensitive matching of many terms,
+which reports the leftmost-longest, non-overlapping matches that fall
+on word boundaries.
+    """
+
+    def __init__ (
+        self,
+        terms: typing.List[str],
+        ) -> None:
+        """
+Constructor, which builds the trie of terms then its failure links.
+
+    terms:
+list of terms to match
+        """
+        self.terms: typing.List[str] = [ term.lower() for term in terms ]
+
+        # node 0 is the root; `output` is the index of the term which
+        # ends at a node, and `suffix` links to the next node along the
+        # failure chain which also has an output
+        self.goto: typing.List[typing.Dict[str, int]] = [ {} ]
+        self.fail: typing.List[int] = [ 0 ]
+        self.output: typing.List[int] = [ -1 ]
+        self.suffix: typing.List[int] = [ 0 ]
+
+        for index, term in enumerate(self.terms):
+            if not term:
+                continue
+
+            node = 0
+
+            for char in term:
+                next_node = self.goto[node].get(char)
+
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(-1)
+                    self.suffix.append(0)
+                    self.goto[node][char] = next_node
+
+                node = next_node
+
+            self.output[node] = index
+
+        queue: typing.Deque[int] = deque(self.goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+
+            for char, child in self.goto[node].items():
+                queue.append(child)
+
+                fail = self.fail[node]
+
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+
+                fail = self.goto[fail].get(char, 0)
+                self.fail[child] = fail if fail != child else 0
+                self.suffix[child] = self.fail[child] if self.output[self.fail[child]] >= 0 else self.suffix[self.fail[child]]
+
+
+    def find (
+        self,
+        text: str,
+        ) -> typing.List[typing.Tuple[int, int, int]]:
+        """
+Find the mentions of the terms in a text.
+
+    text:
+text to scan
+
+    returns:
+list of `(start, end, term_index)` matches, in order
+        """
+        lowered = text.lower()
+
+        if len(lowered) != len(text):
+            # keep the positions aligned when lowercasing changes lengths
+            lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        suffix = self.suffix
+
+        found: typing.List[typing.Tuple[int, int, int]] = []
+        node = 0
+
+        for pos, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+
+            node = goto[node].get(char, 0)
+            match_node = node if output[node] >= 0 else suffix[node]
+
+            while match_node:
+                index = output[match_node]
+                start = pos + 1 - len(self.terms[index])
+
+                if (start == 0 or not lowered[start - 1].isalnum()) and (pos + 1 == len(lowered) or not lowered[pos + 1].isalnum()):
+                    found.append((start, pos + 1, index,))
+
+                match_node = suffix[match_node]
+
+        # prefer the leftmost, then the longest, without overlaps
+        found.sort(key=lambda match: (match[0], match[0] - match[1],))
+        matches: typing.List[typing.Tuple[int, int, int]] = []
+        end = 0
+
+        for match in found:
+            if match[0] >= end:
+                matches.append(match)
+                end = match[1]
+
+        return matches
+
+
+_TERM_MATCHERS: typing.Dict[str, TermMatcher] = {}
+_TERM_MATCHERS_MAX: int = 4
+
+
+def get_term_matcher (
+    terms: typing.List[str],
+    ) -> TermMatcher:
+    """
+Get the automaton for a list of terms, which gets reused between the
+rebuilds of `mkdocs serve` while the terms stay the same.
+
+    terms:
+list of terms to match
+
+    returns:
+automaton for the terms
+    """
+    key = hashlib.sha1("\n".join(terms).encode("utf-8")).hexdigest()
+    matcher = _TERM_MATCHERS.get(key)
+
+    if matcher is None:
+        # only the latest few automata are worth keeping, e.g., one
+        # each for autolinking and the index
+        while len(_TERM_MATCHERS) >= _TERM_MATCHERS_MAX:
+            del _TERM_MATCHERS[next(iter(_TERM_MATCHERS))]
+
+        matcher = TermMatcher(terms)
+        _TERM_MATCHERS[key] = matcher
+
+    return matcher
+
+
+def autolink_markdown (
+    markdown: str,
+    matcher: TermMatcher,
+    targets: typing.List[str],
+    page_path: str,
+    ) -> str:
+    """
+Link the first mention of each term on a page, outside of code, links,
+and headings.
+
+    markdown:
+Markdown source text of the page
+
+    matcher:
+automaton for the terms
+
+    targets:
+link targets for each term, in the same order as the terms, as paths relative to `docs_dir` with an anchor
+
+    page_path:
+path of the page relative to `docs_dir`, to make the links relative
+
+    returns:
+Markdown source text with the links added
+    """
+    page_dir = posixpath.dirname(page_path)
+    linked: typing.Set[int] = set()
+    result: typing.List[str] = []
+
+    for is_prose, text in split_markdown(markdown):
+        if not is_prose:
+            result.append(text)
+            continue
+
+        pos = 0
+
+        for start, end, index in matcher.find(text):
+            if index in linked:
+                continue
+
+            linked.add(index)
+            target_page, _, anchor = targets[index].partition("#")
+            link = posixpath.relpath(target_page, page_dir or ".")
+
+            result.append(text[pos:start])
+            result.append(f"[{text[start:end]}]({link}#{anchor})")
+            pos = end
+
+        result.append(text[pos:])
+
+    return "".join(result)
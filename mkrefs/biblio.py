@@ -3,14 +3,14 @@
 # see license https://github.com/DerwenAI/mkrefs#license-and-copyright
 
 from collections import OrderedDict
-import json
-import tempfile
 import typing
 
 import kglab
 import pathlib
 
-from .util import abbrev_iri, denorm_entity, get_item_list, render_reference
+from .closure import get_closure_index
+from .records import to_records
+from .util import abbrev_iri, denorm_entity, extract_jsonld, get_item_list, render_reference
 
 
 def render_biblio (  # pylint: disable=R0914
@@ -43,30 +43,30 @@ rendered Markdown
     df = kg.query_as_df(sparql)
     entry_ids = denorm_entity(df, "entry")
 
-    # get the entity maps
-    entity_map: dict = {}
+    # get the entity maps, where the list-valued properties such as
+    # `bibo:authorList` come from the closure index, in order
+    entity_map: dict = get_closure_index(kg).get_lists(kg, entry_ids.keys())
 
-    sparql = local_config["biblio"]["queries"]["entry_author"]
-    list_name, list_ids = get_item_list(kg, sparql)
-    entity_map[list_name] = list_ids
+    # the legacy `entry_author` query would overwrite the ordered
+    # author lists, so it gets ignored
+    if "entry_author" in local_config["biblio"]["queries"]:
+        print("WARNING: the biblio `entry_author` query is deprecated and ignored; authors come from the closure index")
 
     sparql = local_config["biblio"]["queries"]["entry_publisher"]
     list_name, list_ids = get_item_list(kg, sparql)
     entity_map[list_name] = list_ids
 
-    # extract content as JSON-LD
-    items: dict = {}
-
-    json_path = pathlib.Path(tempfile.NamedTemporaryFile().name)
-    kg.save_jsonld(json_path)
+    # extract content as JSON-LD, for the entries and their linked entities
+    subjects = set(entry_ids.keys())
 
-    with open(json_path, "r") as f:  # pylint: disable=W0621
-        bib_j = json.load(f)
+    for list_ids in entity_map.values():
+        for mapped_ids in list_ids.values():
+            subjects.update(mapped_ids)
 
-        items = {
-            item["@id"]: abbrev_iri(item)
-            for item in bib_j["@graph"]
-        }
+    items: dict = {
+        item["@id"]: abbrev_iri(item, in_place=True)
+        for item in extract_jsonld(kg, subjects)
+    }
 
     # denormalize the JSON-LD for bibliography entries
     entries: dict = {}
@@ -79,11 +79,19 @@ rendered Markdown
             if key in entity_map:
                 entries[citekey][key] = [
                     items[mapped_id]
-                    for mapped_id in entity_map[key][id]
+                    for mapped_id in entity_map[key].get(id, [])
                     ]
 
+    # convert to compact records, where the authors and publishers
+    # referenced by several entries become shared records
+    memo: dict = {}
+
+    entries = OrderedDict(sorted(
+        (citekey, to_records(entry, memo),)
+        for citekey, entry in entries.items()
+        ))
+
     # initialize the `groups` grouping of entries
-    entries = OrderedDict(sorted(entries.items()))
     letters = sorted(list({
                 key[0].lower()
                 for key in entries.keys()
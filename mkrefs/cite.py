@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Resolve the inline citation markers on each page, such as `[gleich15]`
+or `[@page1998; gleich15]`, into links to the bibliography, based on a
+citekey index built once per build from the rendered bibliography.
+"""
+
+import posixpath
+import re
+import typing
+
+from .util import split_markdown
+
+
+# inline markers never include a line end, unlike the protected lines
+# of code blocks and HTML blocks
+_CITE_MARKER_PAT = re.compile(r"^\[(@?[A-Za-z][\w:.+-]*(?:\s*[,;]\s*@?[A-Za-z][\w:.+-]*)*)\]\Z")
+_CITE_SEP_PAT = re.compile(r"\s*[,;]\s*")
+_CITEKEY_PAT = re.compile(r"^[A-Za-z][A-Za-z_-]*\d{2,4}")
+_LINK_DEF_PAT = re.compile(r"^\s*\[([^\]]+)\]:")
+
+
+def get_citekey_index (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    ) -> typing.Dict[str, typing.Tuple[str, str]]:
+    """
+Build an index of the citekeys in a bibliography.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of bibliography entries, as returned by `render_biblio()`
+
+    returns:
+a tuple of the link target relative to `docs_dir` and the title, keyed by citekey
+    """
+    page = local_config["biblio"]["page"]
+    index: typing.Dict[str, typing.Tuple[str, str]] = {}
+
+    for item_list in groups.values():
+        for entry in item_list:
+            title = entry.get("title")
+            index[entry["citeKey"]] = (f"{page}#{entry['citeKey']}", title if isinstance(title, str) else "",)
+
+    return index
+
+
+def get_marker_keys (
+    text: str,
+    ) -> typing.List[str]:
+    """
+Parse the citekeys of an inline citation marker.
+
+    text:
+a protected inline segment of Markdown, as returned by `split_markdown()`
+
+    returns:
+the citekeys in the marker, or an empty list if the text is not a citation marker
+    """
+    match = _CITE_MARKER_PAT.match(text)
+
+    if match is None:
+        return []
+
+    return [ key.lstrip("@") for key in _CITE_SEP_PAT.split(match.group(1)) ]
+
+
+def resolve_citations (
+    markdown: str,
+    index: typing.Dict[str, typing.Tuple[str, str]],
+    page_path: str,
+    ) -> typing.Tuple[str, typing.List[str], typing.List[str]]:
+    """
+Link the citation markers on a page to their bibliography entries.
+A marker gets linked only when all of its citekeys are known; unknown
+keys get reported when the marker looks like a citation, i.e., it uses
+an `@` prefix or a key such as `name2015`, which keeps the task list
+items and shortcut links from being reported.
+
+    markdown:
+Markdown source text of the page
+
+    index:
+citekey index, as returned by `get_citekey_index()`
+
+    page_path:
+path of the page relative to `docs_dir`, to make the links relative
+
+    returns:
+a tuple of the Markdown with the links added, the cited keys in order of their first citation, and the unknown keys
+    """
+    page_dir = posixpath.dirname(page_path)
+    segments = split_markdown(markdown)
+
+    # labels of the link reference definitions, used by shortcut links
+    defined: typing.Set[str] = set()
+
+    for is_prose, text in segments:
+        if not is_prose:
+            match = _LINK_DEF_PAT.match(text)
+
+            if match:
+                defined.add(match.group(1).lower())
+
+    cited: typing.Dict[str, None] = {}
+    unknown: typing.Dict[str, None] = {}
+    result: typing.List[str] = []
+
+    for is_prose, text in segments:
+        match = None if is_prose else _CITE_MARKER_PAT.match(text)
+
+        if match is None or match.group(1).lower() in defined:
+            result.append(text)
+            continue
+
+        keys = [ key.lstrip("@") for key in _CITE_SEP_PAT.split(match.group(1)) ]
+        missing = [ key for key in keys if key not in index ]
+
+        if missing:
+            if "@" in text or any(_CITEKEY_PAT.match(key) for key in missing):
+                unknown.update(dict.fromkeys(missing))
+
+            result.append(text)
+            continue
+
+        links: typing.List[str] = []
+
+        for key in keys:
+            cited[key] = None
+            link = posixpath.relpath(index[key][0].partition("#")[0], page_dir or ".")
+            links.append(f"[[{key}]]({link}#{key})")
+
+        result.append(", ".join(links))
+
+    return "".join(result), list(cited.keys()), list(unknown.keys())
+
+
+def render_citation_list (
+    cited: typing.List[str],
+    index: typing.Dict[str, typing.Tuple[str, str]],
+    page_path: str,
+    heading: str,
+    ) -> str:
+    """
+Render the Markdown for the list of references cited on a page.
+
+    cited:
+cited keys, in order of their first citation
+
+    index:
+citekey index, as returned by `get_citekey_index()`
+
+    page_path:
+path of the page relative to `docs_dir`, to make the links relative
+
+    heading:
+heading for the list
+
+    returns:
+rendered Markdown, to append to the page
+    """
+    page_dir = posixpath.dirname(page_path)
+    lines = [ "", "", f"## {heading}", "" ]
+
+    for key in cited:
+        target, title = index[key]
+        link = posixpath.relpath(target.partition("#")[0], page_dir or ".")
+        lines.append(f"  * [[{key}]]({link}#{key}) \"{title}\"" if title else f"  * [[{key}]]({link}#{key})")
+
+    lines.append("")
+
+    return "\n".join(lines)
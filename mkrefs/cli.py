@@ -3,14 +3,27 @@
 # see license https://github.com/DerwenAI/mkrefs#license-and-copyright
 
 from pprint import pprint
+import concurrent.futures
+import os
 import pathlib
+import queue
+import time
+import typing
+
+import kglab
 import typer
+import watchdog.events  # type: ignore  # pylint: disable=E0401
+import watchdog.observers  # type: ignore  # pylint: disable=E0401
 import yaml
 
-from .apidocs import render_apidocs
+from .apidocs import get_apidocs_configs, render_apidocs_list
 from .biblio import render_biblio
-from .glossary import render_glossary
-from .util import load_kg
+from .depend import get_requirement_paths, render_depend
+from .glossary import GlossaryQueries, render_glossary, render_glossary_variants
+from .snapshot import is_snapshot, save_snapshot
+from .store import SQLiteStore
+from .util import cache_graph_file, get_graph_paths, get_store_path, load_kg, update_kg
+from .validate import validate_graphs
 
 
 APP = typer.Typer()
@@ -25,12 +38,24 @@ Command to generate a package reference apidocs.
     """
     config_path = pathlib.Path(config_file)
     docs_dir = config_path.parent
-    local_config = yaml.safe_load(config_path.read_text())
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+
+    groups = render_apidocs_list(local_config, docs_dir)
+    pprint(groups)
+
 
-    template_path = docs_dir / local_config["apidocs"]["template"]
-    markdown_path = docs_dir / local_config["apidocs"]["page"]
+@APP.command()
+def depend (
+    config_file: str,
+    ) -> None:
+    """
+Command to generate a dependency reference.
+    """
+    config_path = pathlib.Path(config_file)
+    docs_dir = config_path.parent
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
 
-    groups = render_apidocs(local_config, template_path, markdown_path)
+    groups = render_depend(local_config, docs_dir)
     pprint(groups)
 
 
@@ -43,10 +68,10 @@ Command to generate a bibliography.
     """
     config_path = pathlib.Path(config_file)
     docs_dir = config_path.parent
-    local_config = yaml.safe_load(config_path.read_text())
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
 
-    graph_path = docs_dir / local_config["biblio"]["graph"]
-    kg = load_kg(graph_path)
+    graph_paths = get_graph_paths(local_config, "biblio", docs_dir)
+    kg = load_kg(graph_paths, get_store_path(local_config, "biblio", docs_dir))
 
     template_path = docs_dir / local_config["biblio"]["template"]
     markdown_path = docs_dir / local_config["biblio"]["page"]
@@ -64,17 +89,670 @@ Command to generate a glossary.
     """
     config_path = pathlib.Path(config_file)
     docs_dir = config_path.parent
-    local_config = yaml.safe_load(config_path.read_text())
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
 
-    graph_path = docs_dir / local_config["glossary"]["graph"]
-    kg = load_kg(graph_path)
+    graph_paths = get_graph_paths(local_config, "glossary", docs_dir)
+    kg = load_kg(graph_paths, get_store_path(local_config, "glossary", docs_dir))
 
     template_path = docs_dir / local_config["glossary"]["template"]
     markdown_path = docs_dir / local_config["glossary"]["page"]
 
-    groups = render_glossary(local_config, kg, template_path, markdown_path)
+    queries = GlossaryQueries(local_config, kg)
+    groups = render_glossary(local_config, kg, template_path, markdown_path, queries)
     pprint(groups)
 
+    for variant_page, variant_groups in render_glossary_variants(local_config, kg, docs_dir, queries).items():
+        print(variant_page)
+        pprint(variant_groups)
+
+
+@APP.command("compile-graph")
+def compile_graph (
+    config_file: str,
+    ) -> None:
+    """
+Command to compile each distinct TTL graph file named in the
+configuration into a binary graph snapshot, written alongside it with a
+`.kgc` file extension.
+    """
+    config_path = pathlib.Path(config_file)
+    docs_dir = config_path.parent
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+
+    graph_paths: typing.Set[pathlib.Path] = set()
+
+    for component in [ "glossary", "biblio" ]:
+        if component in local_config:
+            graph_paths.update(_graph_key(local_config, component, docs_dir))
+
+    for graph_path in sorted(graph_paths):
+        if is_snapshot(graph_path):
+            continue
+
+        snapshot_path = graph_path.with_suffix(".kgc")
+        start_time = time.time()
+        count = save_snapshot(load_kg(graph_path).rdf_graph(), snapshot_path)
+        print(f"graph: {snapshot_path.name} compiled with {count} triples in {time.time() - start_time:.2f} sec")
+
+
+def _count_entries (
+    component: str,
+    groups: dict,
+    ) -> int:
+    """
+Count the generated entries for a summary of a rendered component.
+
+    component:
+MkRefs component name
+
+    groups:
+data returned from rendering the component
+
+    returns:
+number of entries
+    """
+    if component == "depend":
+        return len(groups.get("dependencies", []))
+
+    if component == "apidocs":
+        return sum(
+            len(meta["class"]) + len(meta["function"]) + len(meta["type"])
+            for page_groups in groups.values()
+            for meta in page_groups.get("package", [])
+            )
+
+    return sum(len(items) for items in groups.values())
+
+
+def _graph_key (
+    local_config: dict,
+    component: str,
+    docs_dir: pathlib.Path,
+    ) -> typing.Tuple[pathlib.Path, ...]:
+    """
+Identify the graph used by a component.
+
+    local_config:
+local configuration
+
+    component:
+MkRefs component name
+
+    docs_dir:
+base directory for the graph files
+
+    returns:
+tuple of the resolved paths to the graph files
+    """
+    return tuple(path.resolve() for path in get_graph_paths(local_config, component, docs_dir))
+
+
+def _graph_name (
+    graph_key: typing.Tuple[pathlib.Path, ...],
+    ) -> str:
+    """
+Describe a graph for progress messages.
+
+    graph_key:
+tuple of the resolved paths to the graph files
+
+    returns:
+file name, or the number of files for a graph loaded from several files
+    """
+    if len(graph_key) == 1:
+        return graph_key[0].name
+
+    return f"{len(graph_key)} files"
+
+
+def _load_graphs (
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    parallel: bool = False,
+    ) -> typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph]:
+    """
+Load each distinct graph used by the configured components only once.
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the graph files
+
+    parallel:
+parse all of the distinct graph files at once, each in a worker process, before loading the graphs
+
+    returns:
+loaded KGs, keyed by the tuples of their resolved file paths
+    """
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph] = {}
+
+    if parallel:
+        # parsing holds the GIL, so it runs in processes which compile
+        # the files into the snapshot cache that the loads then read
+        graph_files = sorted({
+            path
+            for component in [ "glossary", "biblio" ]
+            if component in local_config and get_store_path(local_config, component, docs_dir) is None
+            for path in _graph_key(local_config, component, docs_dir)
+            })
+
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            list(executor.map(cache_graph_file, graph_files))
+
+    for component in [ "glossary", "biblio" ]:
+        if component in local_config:
+            graph_key = _graph_key(local_config, component, docs_dir)
+
+            if graph_key not in graphs:
+                start_time = time.time()
+                graphs[graph_key] = load_kg(list(graph_key), get_store_path(local_config, component, docs_dir))
+                print(f"graph: {_graph_name(graph_key)} loaded in {time.time() - start_time:.2f} sec")
+
+    return graphs
+
+
+def _render_component (
+    component: str,
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph],
+    ) -> typing.Tuple[str, dict, float]:
+    """
+Render one MkRefs component, using the shared graphs.
+
+    component:
+MkRefs component name
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the templates and the rendered Markdown files
+
+    graphs:
+loaded KGs, keyed by the tuples of their resolved file paths
+
+    returns:
+a tuple of the component name, the rendered data, and the elapsed time in seconds
+    """
+    start_time = time.time()
+    groups: typing.Dict[str, typing.Any]
+
+    if component == "apidocs":
+        groups = render_apidocs_list(local_config, docs_dir)
+    elif component == "depend":
+        groups = render_depend(local_config, docs_dir)
+    else:
+        kg = graphs[_graph_key(local_config, component, docs_dir)]
+        template_path = docs_dir / local_config[component]["template"]
+        markdown_path = docs_dir / local_config[component]["page"]
+
+        if component == "glossary":
+            queries = GlossaryQueries(local_config, kg)
+            groups = render_glossary(local_config, kg, template_path, markdown_path, queries)
+            render_glossary_variants(local_config, kg, docs_dir, queries)
+        else:
+            groups = render_biblio(local_config, kg, template_path, markdown_path)
+
+    return component, groups, time.time() - start_time
+
+
+@APP.command()
+def build (
+    config_file: str,
+    parallel: bool = typer.Option(False, help="parse the graph files concurrently, in worker processes"),
+    ) -> None:
+    """
+Command to generate all of the configured components, loading each
+distinct graph only once, then printing a compact summary.
+    """
+    config_path = pathlib.Path(config_file)
+    docs_dir = config_path.parent
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+
+    # load each distinct graph once, shared among the components
+    graphs = _load_graphs(local_config, docs_dir, parallel)
+
+    results = [
+        _render_component(component, local_config, docs_dir, graphs)
+        for component in [ "apidocs", "depend", "glossary", "biblio" ]
+        if component in local_config
+        ]
+
+    for component, groups, elapsed in results:
+        print(f"{component}: {_count_entries(component, groups)} entries rendered in {elapsed:.2f} sec")
+
+
+@APP.command()
+def validate (
+    config_file: str,
+    ) -> None:
+    """
+Command to check the glossary and bibliography graphs for dangling
+references, missing labels or citekeys, duplicate citekeys, and
+citations which do not resolve, without rendering any pages; exits
+with a non-zero status on any error.
+    """
+    config_path = pathlib.Path(config_file)
+    docs_dir = config_path.parent
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+
+    graphs = _load_graphs(local_config, docs_dir)
+
+    glossary_kg = graphs[_graph_key(local_config, "glossary", docs_dir)] if "glossary" in local_config else None
+    biblio_kg = graphs[_graph_key(local_config, "biblio", docs_dir)] if "biblio" in local_config else None
+
+    start_time = time.time()
+    issues = validate_graphs(local_config, glossary_kg, biblio_kg)
+
+    for level, message in issues:
+        print(f"{level}: {message}")
+
+    errors = sum(1 for level, _ in issues if level == "ERROR")
+    print(f"validate: {errors} errors, {len(issues) - errors} warnings in {time.time() - start_time:.2f} sec")
+
+    if errors > 0:
+        raise typer.Exit(code=1)
+
+
+def _watch_paths (
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> typing.Dict[str, typing.Set[pathlib.Path]]:
+    """
+Identify the input files which each configured component depends on.
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the graphs and templates
+
+    returns:
+sets of resolved file paths, keyed by component name
+    """
+    deps: typing.Dict[str, typing.Set[pathlib.Path]] = {}
+
+    if "apidocs" in local_config:
+        deps["apidocs"] = set()
+
+        for apidocs_config in get_apidocs_configs(local_config):
+            for param in [ "template", "class_template" ]:
+                if param in apidocs_config:
+                    deps["apidocs"].add((docs_dir / apidocs_config[param]).resolve())
+
+    if "depend" in local_config:
+        deps["depend"] = {
+            (docs_dir / local_config["depend"]["template"]).resolve(),
+            *[ path.resolve() for path in get_requirement_paths(local_config["depend"], docs_dir) ],
+        }
+
+    for component in [ "glossary", "biblio" ]:
+        if component in local_config:
+            deps[component] = {
+                *_graph_key(local_config, component, docs_dir),
+                (docs_dir / local_config[component]["template"]).resolve(),
+            }
+
+    return deps
+
+
+class _ChangeHandler (watchdog.events.FileSystemEventHandler):
+    """
+Collect the paths of the files which get created, modified, moved, or
+deleted, from the file system events of the watched directories.
+    """
+    _EVENT_TYPES: typing.Set[str] = {
+        watchdog.events.EVENT_TYPE_CREATED,
+        watchdog.events.EVENT_TYPE_MODIFIED,
+        watchdog.events.EVENT_TYPE_MOVED,
+        watchdog.events.EVENT_TYPE_DELETED,
+    }
+
+    def __init__ (
+        self,
+        changes: "queue.Queue[pathlib.Path]",
+        ) -> None:
+        """
+Constructor.
+
+    changes:
+queue which receives the resolved paths of the changed files
+        """
+        super().__init__()
+        self.changes = changes
+
+
+    def on_any_event (
+        self,
+        event: watchdog.events.FileSystemEvent,
+        ) -> None:
+        """
+Queue the paths of a changed file, ignoring directories and any events
+for merely opening or reading a file.
+
+    event:
+file system event
+        """
+        if event.is_directory or event.event_type not in self._EVENT_TYPES:
+            return
+
+        self.changes.put(pathlib.Path(os.fsdecode(event.src_path)).resolve())
+
+        # an editor may save a file by moving a temporary file over it
+        dest_path = getattr(event, "dest_path", None)
+
+        if dest_path:
+            self.changes.put(pathlib.Path(os.fsdecode(dest_path)).resolve())
+
+
+def _schedule_watches (
+    observer: watchdog.observers.api.BaseObserver,
+    handler: _ChangeHandler,
+    docs_dir: pathlib.Path,
+    watched: typing.Set[pathlib.Path],
+    ) -> None:
+    """
+Watch the documentation directory, including the new files which may
+match the glob patterns for graphs, plus the directory of any input
+file which is outside of it.
+
+    observer:
+file system observer
+
+    handler:
+handler for the file system events
+
+    docs_dir:
+base directory for the graphs, templates, and rendered Markdown files
+
+    watched:
+set of input files
+    """
+    observer.unschedule_all()
+    observer.schedule(handler, str(docs_dir), recursive=True)
+
+    for watch_dir in sorted({ path.parent for path in watched if docs_dir not in path.parents }):
+        if watch_dir.is_dir():
+            observer.schedule(handler, str(watch_dir), recursive=False)
+
+
+def _start_watch (
+    config_path: pathlib.Path,
+    docs_dir: pathlib.Path,
+    ) -> typing.Tuple[dict, dict, typing.Dict[str, typing.Set[pathlib.Path]], typing.Set[pathlib.Path]]:
+    """
+Load the configuration and its graphs, then identify the files to watch.
+
+    config_path:
+resolved path for the configuration file
+
+    docs_dir:
+base directory for the graphs, templates, and rendered Markdown files
+
+    returns:
+a tuple of the local configuration, the loaded KGs, the input files for each component, and the set of watched files
+    """
+    local_config = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+    graphs = _load_graphs(local_config, docs_dir)
+    deps = _watch_paths(local_config, docs_dir)
+
+    return local_config, graphs, deps, set().union(*deps.values(), { config_path })
+
+
+def _wait_for_changes (
+    changes: "queue.Queue[pathlib.Path]",
+    delay: float,
+    ) -> typing.Set[pathlib.Path]:
+    """
+Wait for a file to change, then collect any other changes which follow
+within a short delay, e.g., while an editor saves a file in several
+steps.
+
+    changes:
+queue of the resolved paths of the changed files
+
+    delay:
+time to wait for further changes, in seconds
+
+    returns:
+the changed files
+    """
+    while True:
+        try:
+            # a timeout keeps the wait interruptible with Ctrl-C
+            changed = { changes.get(timeout=1.0) }
+            break
+        except queue.Empty:
+            continue
+
+    while True:
+        try:
+            changed.add(changes.get(timeout=delay))
+        except queue.Empty:
+            return changed
+
+
+def _load_new_graphs (
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph],
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> typing.Set[str]:
+    """
+Load the graphs again for any components whose glob patterns now match
+a different set of files, e.g., after a new graph file got created,
+and drop the graphs which no component uses anymore.
+
+    graphs:
+loaded KGs, keyed by the tuples of their resolved file paths, which get updated
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the graph files
+
+    returns:
+names of the components whose graphs got loaded again
+    """
+    loaded: typing.Set[str] = set()
+    previous_keys = set(graphs.keys())
+    graph_keys: typing.Set[typing.Tuple[pathlib.Path, ...]] = set()
+
+    for component in [ "glossary", "biblio" ]:
+        if component not in local_config:
+            continue
+
+        graph_key = _graph_key(local_config, component, docs_dir)
+        graph_keys.add(graph_key)
+
+        if graph_key in previous_keys:
+            continue
+
+        # components which share a graph still load it only once
+        if graph_key not in graphs:
+            graphs[graph_key] = load_kg(list(graph_key), get_store_path(local_config, component, docs_dir))
+            print(f"graph: {_graph_name(graph_key)} loaded")
+
+        loaded.add(component)
+
+    for stale_key in set(graphs.keys()) - graph_keys:
+        del graphs[stale_key]
+
+    return loaded
+
+
+def _update_graph (
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph],
+    graph_key: typing.Tuple[pathlib.Path, ...],
+    ) -> bool:
+    """
+Apply the changes in the files for one graph, as triple diffs when the
+graph gets loaded from one file into memory, otherwise by loading it
+again.
+
+    graphs:
+loaded KGs, keyed by the tuples of their resolved file paths, which get updated
+
+    graph_key:
+tuple of the resolved paths to the graph files
+
+    returns:
+boolean flag, for whether the graph may have changed
+    """
+    kg = graphs[graph_key]
+    store = kg.rdf_graph().store
+
+    if isinstance(store, SQLiteStore) and store.path is not None:
+        # a persistent store gets rebuilt instead
+        graphs[graph_key] = load_kg(list(graph_key), pathlib.Path(store.path))
+        print(f"graph: {_graph_name(graph_key)} changed, store rebuilt")
+        return True
+
+    if len(graph_key) > 1:
+        # only the changed files get parsed again
+        graphs[graph_key] = load_kg(list(graph_key))
+        print(f"graph: {_graph_name(graph_key)} changed, reloaded")
+        return True
+
+    added, removed = update_kg(kg, graph_key[0])
+    print(f"graph: {_graph_name(graph_key)} changed, {added} triples added, {removed} removed")
+
+    return added > 0 or removed > 0
+
+
+def _apply_graph_changes (
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph],
+    changed: typing.Set[pathlib.Path],
+    loaded: typing.Set[typing.Tuple[pathlib.Path, ...]],
+    ) -> typing.Set[pathlib.Path]:
+    """
+Apply the changes to any of the graph files.
+
+    graphs:
+loaded KGs, keyed by the tuples of their resolved file paths, which get updated
+
+    changed:
+the changed files
+
+    loaded:
+keys of the graphs which just got loaded, so they are already current
+
+    returns:
+the changed files, without the graph files whose triples stayed the same
+    """
+    changed = set(changed)
+
+    for graph_key in list(graphs.keys()):
+        if graph_key in loaded or changed.isdisjoint(graph_key):
+            continue
+
+        try:
+            if not _update_graph(graphs, graph_key):
+                changed.discard(graph_key[0])
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error loading graph: {e}")
+
+    return changed
+
+
+def _render_components (
+    components: typing.Set[str],
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    graphs: typing.Dict[typing.Tuple[pathlib.Path, ...], kglab.KnowledgeGraph],
+    ) -> None:
+    """
+Re-render the given components, reporting any errors instead of
+stopping.
+
+    components:
+names of the components to render
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the templates and the rendered Markdown files
+
+    graphs:
+loaded KGs, keyed by the tuples of their resolved file paths
+    """
+    for component in sorted(components):
+        try:
+            _, groups, elapsed = _render_component(component, local_config, docs_dir, graphs)
+            print(f"{component}: {_count_entries(component, groups)} entries rendered in {elapsed:.2f} sec")
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering {component}: {e}")
+
+
+@APP.command()
+def watch (
+    config_file: str,
+    delay: float = typer.Option(0.25, help="time to wait for further file changes before re-rendering, in seconds"),
+    ) -> None:
+    """
+Command to watch the graphs, templates, and configuration, keeping the
+parsed graphs in memory and re-rendering only the affected components
+whenever one of these files gets saved.
+    """
+    config_path = pathlib.Path(config_file).resolve()
+    docs_dir = config_path.parent
+
+    local_config, graphs, deps, watched = _start_watch(config_path, docs_dir)
+    dirty = set(deps.keys())
+
+    changes: "queue.Queue[pathlib.Path]" = queue.Queue()
+    handler = _ChangeHandler(changes)
+    observer = watchdog.observers.Observer()
+    _schedule_watches(observer, handler, docs_dir, watched)
+    observer.start()
+
+    print(f"watching {len(watched)} files, type Ctrl-C to stop")
+
+    try:
+        while True:
+            _render_components(dirty, local_config, docs_dir, graphs)
+            dirty = set()
+            changed = _wait_for_changes(changes, delay)
+
+            if config_path in changed:
+                # the configuration changed, so start over
+                print(f"config: {config_path.name} changed")
+                local_config, graphs, deps, watched = _start_watch(config_path, docs_dir)
+                _schedule_watches(observer, handler, docs_dir, watched)
+                dirty = set(deps.keys())
+                continue
+
+            # glob patterns may match new files, or fewer files
+            try:
+                deps = _watch_paths(local_config, docs_dir)
+                reloaded = _load_new_graphs(graphs, local_config, docs_dir)
+            except Exception as e:  # pylint: disable=W0703
+                print(f"Error loading graph: {e}")
+                continue
+
+            # rendering the components also changes files, which are
+            # not any of the inputs
+            current = set().union(*deps.values())
+            changed &= watched | current
+            watched = current | { config_path }
+
+            loaded = { _graph_key(local_config, component, docs_dir) for component in reloaded }
+            changed = _apply_graph_changes(graphs, changed, loaded)
+
+            dirty = reloaded | {
+                component
+                for component, paths in deps.items()
+                if paths & changed
+            }
+    except KeyboardInterrupt:
+        pass
+    finally:
+        observer.stop()
+        observer.join()
+
 
 def cli () -> None:
     """
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Materialized closures over a KG: the taxonomy path of each concept,
+following its hypernym links, e.g., `skos:broader`, and the ordered
+contents of each RDF list.
+These replace property path queries such as `rdf:rest*/rdf:first`,
+which are slow on large graphs and lose the order of list members.
+"""
+
+from collections import deque
+import typing
+import weakref
+
+import kglab
+import rdflib  # type: ignore  # pylint: disable=E0401
+
+from .util import abbrev_key, get_kg_version
+
+
+class ClosureIndex:  # pylint: disable=R0903
+    """
+Index built with one pass over each of the hypernym, `rdf:first`, and
+`rdf:rest` relations in a KG, plus one topological pass over the
+taxonomy, with identifiers represented as strings,
+the same as the entity maps used for rendering.
+    """
+
+    def __init__ (
+        self,
+        kg: kglab.KnowledgeGraph,
+        hypernym: rdflib.URIRef = rdflib.SKOS.broader,
+        ) -> None:
+        """
+Constructor, which materializes the closures.
+
+    kg:
+the KG graph object
+
+    hypernym:
+the predicate which links a concept to its hypernyms
+        """
+        graph = kg.rdf_graph()
+        self.version: int = get_kg_version(kg)
+
+        # direct hypernym links, sorted for a stable order
+        self.parents: typing.Dict[str, typing.List[str]] = {}
+
+        for s, _, o in graph.triples((None, hypernym, None)):
+            self.parents.setdefault(str(s), []).append(str(o))
+
+        for parent_list in self.parents.values():
+            parent_list.sort()
+
+        self.ancestors: typing.Dict[str, typing.Set[str]] = {}
+        self.paths: typing.Dict[str, typing.List[str]] = {}
+        self._close_taxonomy()
+
+        # ordered contents of the RDF lists, keyed by list head
+        first: typing.Dict[rdflib.term.Node, rdflib.term.Node] = dict(graph.subject_objects(rdflib.RDF.first))
+        rest: typing.Dict[rdflib.term.Node, rdflib.term.Node] = dict(graph.subject_objects(rdflib.RDF.rest))
+        tails = set(rest.values())
+
+        self.lists: typing.Dict[rdflib.term.Node, typing.List[str]] = {}
+
+        for head in first:
+            if head not in tails:
+                self.lists[head] = self._get_list(head, first, rest)
+
+
+    def _close_taxonomy (
+        self,
+        ) -> None:
+        """
+Semiprivate helper method to materialize the transitive ancestry and
+the breadcrumb path of each concept in one topological pass, from the
+roots of the taxonomy down, so that each concept extends the closures
+already computed for its hypernyms.
+Concepts which are in (or below) a cycle never get visited by the
+pass, and fall back to a guarded walk.
+        """
+        children: typing.Dict[str, typing.List[str]] = {}
+
+        for node, parent_list in self.parents.items():
+            for parent in parent_list:
+                children.setdefault(parent, []).append(node)
+
+        pending = {
+            node: len(parent_list)
+            for node, parent_list in self.parents.items()
+        }
+
+        queue = deque(node for node in children if node not in self.parents)
+
+        while queue:
+            node = queue.popleft()
+
+            for child in children.get(node, []):
+                self.ancestors.setdefault(child, set()).add(node)
+                self.ancestors[child].update(self.ancestors.get(node, set()))
+                pending[child] -= 1
+
+                if pending[child] == 0:
+                    first_parent = self.parents[child][0]
+                    self.paths[child] = self.paths.get(first_parent, []) + [ first_parent ]
+                    queue.append(child)
+
+        for node, count in pending.items():
+            if count > 0:
+                self.ancestors[node] = self._get_ancestors(node)
+                self.paths[node] = self._get_path(node)
+
+
+    def _get_ancestors (
+        self,
+        node: str,
+        ) -> typing.Set[str]:
+        """
+Semiprivate helper method to collect the transitive hypernym ancestry
+of a concept, breadth first, while guarding against cycles in the
+taxonomy.
+
+    node:
+concept identifier
+
+    returns:
+set of ancestor identifiers
+        """
+        ancestors: typing.Set[str] = set()
+        seen = { node }
+        queue = deque([ node ])
+
+        while queue:
+            item = queue.popleft()
+
+            for parent in self.parents.get(item, []):
+                if parent not in seen:
+                    seen.add(parent)
+                    ancestors.add(parent)
+                    queue.append(parent)
+
+        return ancestors
+
+
+    def _get_path (
+        self,
+        node: str,
+        ) -> typing.List[str]:
+        """
+Semiprivate helper method to follow the first hypernym link of each
+concept up to a root of the taxonomy, for use as breadcrumbs.
+
+    node:
+concept identifier
+
+    returns:
+list of ancestor identifiers, starting from the root
+        """
+        path: typing.List[str] = []
+        seen = { node }
+        parent_list = self.parents.get(node)
+
+        while parent_list and parent_list[0] not in seen:
+            parent = parent_list[0]
+            seen.add(parent)
+            path.append(parent)
+            parent_list = self.parents.get(parent)
+
+        path.reverse()
+
+        return path
+
+
+    @classmethod
+    def _get_list (
+        cls,
+        head: rdflib.term.Node,
+        first: typing.Dict[rdflib.term.Node, rdflib.term.Node],
+        rest: typing.Dict[rdflib.term.Node, rdflib.term.Node],
+        ) -> typing.List[str]:
+        """
+Semiprivate helper method to walk an RDF list in order, while guarding
+against malformed lists which loop.
+
+    head:
+first node of the list
+
+    first:
+`rdf:first` links
+
+    rest:
+`rdf:rest` links
+
+    returns:
+list of member identifiers
+        """
+        members: typing.List[str] = []
+        seen: set = set()
+        node: typing.Optional[rdflib.term.Node] = head
+
+        while node is not None and node != rdflib.RDF.nil and node not in seen:
+            seen.add(node)
+
+            if node in first:
+                members.append(str(first[node]))
+
+            node = rest.get(node)
+
+        return members
+
+
+    def get_lists (
+        self,
+        kg: kglab.KnowledgeGraph,
+        subjects: typing.Iterable[str],
+        ) -> typing.Dict[str, typing.Dict[str, typing.List[str]]]:
+        """
+Find the list-valued properties of the given subjects, such as
+`bibo:authorList`, with the ordered list contents.
+
+    kg:
+the KG graph object
+
+    subjects:
+subject identifiers
+
+    returns:
+ordered list members, keyed by abbreviated property name, then by subject identifier
+        """
+        graph = kg.rdf_graph()
+        list_map: typing.Dict[str, typing.Dict[str, typing.List[str]]] = {}
+
+        for subject in subjects:
+            for pred, obj in graph.predicate_objects(rdflib.URIRef(subject)):
+                if obj in self.lists:
+                    name = abbrev_key(str(pred))
+                    list_map.setdefault(name, {})[subject] = self.lists[obj]
+
+        return list_map
+
+
+_CLOSURE_INDEXES: "weakref.WeakKeyDictionary[kglab.KnowledgeGraph, typing.Dict[str, ClosureIndex]]" = weakref.WeakKeyDictionary()
+
+
+def get_closure_index (
+    kg: kglab.KnowledgeGraph,
+    hypernym: rdflib.URIRef = rdflib.SKOS.broader,
+    ) -> ClosureIndex:
+    """
+Get the closure index for a KG, building it on first use and again
+whenever the KG has been updated in place, i.e., whenever its version
+from `get_kg_version()` has changed.
+
+    kg:
+the KG graph object
+
+    hypernym:
+the predicate which links a concept to its hypernyms
+
+    returns:
+closure index for the KG
+    """
+    indexes = _CLOSURE_INDEXES.setdefault(kg, {})
+    index = indexes.get(str(hypernym))
+
+    if index is None or index.version != get_kg_version(kg):
+        index = ClosureIndex(kg, hypernym)
+        indexes[str(hypernym)] = index
+
+    return index
+
+
+def invalidate_closure_index (
+    kg: kglab.KnowledgeGraph,
+    ) -> None:
+    """
+Drop the closure indexes for a KG, e.g., after modifying it in place
+other than through `update_kg()`, which bumps its version.
+
+    kg:
+the KG graph object
+    """
+    _CLOSURE_INDEXES.pop(kg, None)
@@ -0,0 +1,502 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Dependency graph for a Python package, resolved offline from the
+metadata of the installed distributions, i.e., without contacting a
+package index.
+
+The direct dependencies come from the package metadata, plus any
+requirements files, then the transitive dependency tree follows the
+requirements of each installed distribution.
+Resolutions get cached by a fingerprint of the Python environment, so
+that repeated builds in an unchanged environment skip the resolution.
+"""
+
+from collections import deque
+import hashlib
+import importlib.metadata
+import json
+import os
+import sys
+import typing
+
+import kglab
+from packaging.markers import UndefinedEnvironmentName  # type: ignore # pylint: disable=E0401
+from packaging.requirements import InvalidRequirement, Requirement  # type: ignore # pylint: disable=E0401
+from packaging.specifiers import InvalidSpecifier  # type: ignore # pylint: disable=E0401
+from packaging.utils import canonicalize_name  # type: ignore # pylint: disable=E0401
+import pathlib
+import rdflib  # type: ignore  # pylint: disable=E0401
+
+from .util import get_cache_dir, render_reference
+
+
+DEPEND_CACHE_VERSION: int = 1
+
+_DEPEND_CACHE: typing.Dict[str, dict] = {}
+
+
+def get_requirement_paths (
+    depend_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> typing.List[pathlib.Path]:
+    """
+Get the paths for the requirements files named by the optional
+`requirements` parameter, which may be either one file or a list.
+
+    depend_config:
+configuration for the `depend` component
+
+    docs_dir:
+base directory for relative paths
+
+    returns:
+list of paths to the requirements files
+    """
+    names = depend_config.get("requirements") or []
+
+    if isinstance(names, str):
+        names = [ names ]
+
+    return [ docs_dir / name for name in names ]
+
+
+def read_requirements (
+    path: pathlib.Path,
+    ) -> typing.List[str]:
+    """
+Read the requirement specifiers from a requirements file, following its
+`-r` includes, and skipping comments, other options, and lines which
+are not requirement specifiers, e.g., URLs.
+
+    path:
+path to the requirements file
+
+    returns:
+list of requirement specifiers
+    """
+    reqs: typing.List[str] = []
+    seen: typing.Set[pathlib.Path] = set()
+    queue: typing.List[pathlib.Path] = [ path ]
+
+    while queue:
+        req_path = queue.pop(0).resolve()
+
+        if req_path in seen:
+            continue
+
+        seen.add(req_path)
+
+        for line in req_path.read_text(encoding="utf-8").splitlines():
+            line = line.split(" #")[0].strip()
+
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith(("-r ", "--requirement ")):
+                queue.append(req_path.parent / line.split(maxsplit=1)[1].strip())
+            elif not line.startswith("-"):
+                reqs.append(line)
+
+    return reqs
+
+
+def get_environment_fingerprint (
+    depend_config: dict,
+    req_paths: typing.List[pathlib.Path],
+    ) -> str:
+    """
+Identify the Python environment and the inputs for a dependency
+resolution.
+Rather than reading the metadata of each distribution, this uses the
+names of the `.dist-info` and `.egg-info` directories on `sys.path`,
+which include the version of each installed distribution.
+
+    depend_config:
+configuration for the `depend` component
+
+    req_paths:
+paths to the requirements files
+
+    returns:
+hex digest for the environment
+    """
+    stamp = [
+        f"v{DEPEND_CACHE_VERSION}",
+        sys.version,
+        sys.executable,
+        json.dumps({ key: depend_config.get(key) for key in [ "package", "extras" ] }, sort_keys=True),
+        ]
+
+    for entry in sys.path:
+        try:
+            with os.scandir(entry or ".") as it:
+                names = sorted(
+                    dir_entry.name
+                    for dir_entry in it
+                    if dir_entry.name.endswith((".dist-info", ".egg-info", ".egg-link"))
+                    )
+        except OSError:
+            continue
+
+        stamp.append(entry)
+        stamp.extend(names)
+
+    for path in req_paths:
+        stamp.append(str(path))
+        stamp.append(path.read_text(encoding="utf-8") if path.exists() else "")
+
+    return hashlib.sha1("\n".join(stamp).encode("utf-8")).hexdigest()
+
+
+def _get_installed () -> typing.Dict[str, importlib.metadata.Distribution]:
+    """
+Index the installed distributions by their canonical names, where the
+first one on `sys.path` takes precedence, as it does for imports.
+
+    returns:
+installed distributions, keyed by canonical name
+    """
+    installed: typing.Dict[str, importlib.metadata.Distribution] = {}
+
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata["Name"]
+
+        if name:
+            installed.setdefault(canonicalize_name(name), dist)
+
+    return installed
+
+
+def _parse_requirements (
+    specs: typing.Iterable[str],
+    extras: typing.Iterable[str],
+    ) -> typing.List[Requirement]:
+    """
+Parse requirement specifiers, keeping only the ones whose environment
+markers apply to the current environment with the given extras.
+
+    specs:
+requirement specifiers
+
+    extras:
+extras requested for the distribution which has these requirements
+
+    returns:
+list of the applicable requirements
+    """
+    reqs: typing.List[Requirement] = []
+    envs = [ { "extra": extra } for extra in [ "" ] + sorted(extras) ]
+
+    for spec in specs:
+        try:
+            req = Requirement(spec)
+        except InvalidRequirement:
+            continue
+
+        try:
+            if req.marker is not None and not any(req.marker.evaluate(env) for env in envs):
+                continue
+        except UndefinedEnvironmentName:
+            continue
+
+        reqs.append(req)
+
+    return reqs
+
+
+def _get_meta_field (
+    meta: importlib.metadata.PackageMetadata,
+    *fields: str,
+    ) -> str:
+    """
+Get the first value of a distribution metadata field, trying each of the
+given fields in order, since the metadata may omit any of them.
+
+    meta:
+metadata of an installed distribution
+
+    fields:
+names of the metadata fields, in order of preference
+
+    returns:
+value of the first field which is present, or an empty string
+    """
+    for field in fields:
+        values = meta.get_all(field) or []
+
+        if values and values[0]:
+            return str(values[0])
+
+    return ""
+
+
+def _describe_dist (
+    key: str,
+    name: str,
+    dist: typing.Optional[importlib.metadata.Distribution],
+    depth: int,
+    ) -> dict:
+    """
+Describe one node of the dependency tree.
+
+    key:
+canonical name of the distribution
+
+    name:
+name of the distribution, as required
+
+    dist:
+the installed distribution, or `None` if it is not installed
+
+    depth:
+shortest distance from the documented package
+
+    returns:
+node description
+    """
+    if dist is None:
+        return {
+            "key": key,
+            "name": name,
+            "version": None,
+            "summary": "",
+            "license": "",
+            "home_page": "",
+            "depth": depth,
+            "requires": [],
+            "required_by": [],
+        }
+
+    meta = dist.metadata
+
+    return {
+        "key": key,
+        "name": meta["Name"] if "Name" in meta else name,
+        "version": dist.version,
+        "summary": _get_meta_field(meta, "Summary"),
+        "license": _get_meta_field(meta, "License-Expression", "License"),
+        "home_page": _get_meta_field(meta, "Home-page"),
+        "depth": depth,
+        "requires": [],
+        "required_by": [],
+    }
+
+
+def resolve_dependencies (
+    package: str,
+    specs: typing.List[str],
+    extras: typing.List[str],
+    ) -> dict:
+    """
+Resolve the transitive dependency tree of a package from the installed
+distributions, breadth-first, so each node gets its shortest depth.
+
+    package:
+name of the documented package
+
+    specs:
+additional requirement specifiers for the package, e.g., from requirements files
+
+    extras:
+extras to include for the package
+
+    returns:
+the `package` key of the root node, and the `nodes` of the tree keyed by canonical name
+    """
+    installed = _get_installed()
+    root_key = canonicalize_name(package)
+    root_dist = installed.get(root_key)
+
+    nodes: typing.Dict[str, dict] = {
+        root_key: _describe_dist(root_key, package, root_dist, 0),
+        }
+
+    root_specs = list(root_dist.requires or []) if root_dist is not None else []
+    queue: typing.Deque[typing.Tuple[str, typing.List[Requirement]]] = deque()
+    queue.append((root_key, _parse_requirements(root_specs + specs, extras),))
+
+    while queue:
+        parent_key, reqs = queue.popleft()
+        parent = nodes[parent_key]
+        required: typing.Set[str] = set()
+
+        for req in reqs:
+            key = canonicalize_name(req.name)
+
+            if key in required or key == parent_key:
+                continue
+
+            required.add(key)
+            dist = installed.get(key)
+            version = dist.version if dist is not None else None
+
+            try:
+                satisfied = version is not None and req.specifier.contains(version, prereleases=True)
+            except InvalidSpecifier:
+                satisfied = False
+
+            parent["requires"].append({
+                "key": key,
+                "name": req.name,
+                "specifier": str(req.specifier),
+                "extras": sorted(req.extras),
+                "installed": version,
+                "satisfied": satisfied,
+            })
+
+            if key not in nodes:
+                nodes[key] = _describe_dist(key, req.name, dist, parent["depth"] + 1)
+
+                if dist is not None:
+                    queue.append((key, _parse_requirements(dist.requires or [], req.extras),))
+
+            nodes[key]["required_by"].append(parent_key)
+
+    return {
+        "package": root_key,
+        "nodes": nodes,
+    }
+
+
+def get_dependencies (
+    depend_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> dict:
+    """
+Get the dependency tree for the documented package, reusing a cached
+resolution when the environment fingerprint has not changed, first from
+memory, e.g., during `mkdocs serve`, then from the cache directory.
+
+    depend_config:
+configuration for the `depend` component
+
+    docs_dir:
+base directory for the requirements files
+
+    returns:
+the dependency tree, as returned by `resolve_dependencies()`, plus its `fingerprint`
+    """
+    req_paths = get_requirement_paths(depend_config, docs_dir)
+    fingerprint = get_environment_fingerprint(depend_config, req_paths)
+
+    tree = _DEPEND_CACHE.get(fingerprint)
+
+    if tree is not None:
+        return tree
+
+    cache_path = get_cache_dir() / f"depend-{fingerprint[:16]}.json"
+
+    try:
+        tree = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        tree = None
+
+    if tree is None or tree.get("fingerprint") != fingerprint:
+        specs: typing.List[str] = []
+
+        for path in req_paths:
+            specs.extend(read_requirements(path))
+
+        tree = resolve_dependencies(depend_config["package"], specs, depend_config.get("extras") or [])
+        tree["fingerprint"] = fingerprint
+
+        tmp_path = cache_path.with_name(cache_path.name + f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(tree), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+    _DEPEND_CACHE.clear()
+    _DEPEND_CACHE[fingerprint] = tree
+
+    return tree
+
+
+def get_depend_rdf (
+    tree: dict,
+    ) -> kglab.KnowledgeGraph:
+    """
+Generate an RDF graph from a dependency tree.
+
+    tree:
+the dependency tree, as returned by `get_dependencies()`
+
+    returns:
+generated knowledge graph
+    """
+    kg = kglab.KnowledgeGraph(
+        namespaces={
+            "dct": "http://purl.org/dc/terms/",
+            "derw": "https://derwen.ai/ns/v1#",
+            "owl": "http://www.w3.org/2002/07/owl#",
+            "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+            "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+            "xsd":  "http://www.w3.org/2001/XMLSchema#",
+        })
+
+    for key, node in tree["nodes"].items():
+        package_node = rdflib.URIRef(f"derw:depend:package:{key}")
+
+        kg.add(package_node, kg.get_ns("rdf").type, kg.get_ns("derw").PythonPackage)
+        kg.add(package_node, kg.get_ns("rdfs").label, rdflib.Literal(node["name"], lang=kg.language))
+
+        if node["version"] is not None:
+            kg.add(package_node, kg.get_ns("owl").versionInfo, rdflib.Literal(node["version"]))
+
+        if node["summary"]:
+            kg.add(package_node, kg.get_ns("dct").description, rdflib.Literal(node["summary"], lang=kg.language))
+
+        if node["license"]:
+            kg.add(package_node, kg.get_ns("dct").license, rdflib.Literal(node["license"]))
+
+        for req in node["requires"]:
+            kg.add(package_node, kg.get_ns("dct").requires, rdflib.URIRef(f"derw:depend:package:{req['key']}"))
+
+    return kg
+
+
+def render_depend (
+    local_config: dict,
+    docs_dir: pathlib.Path,
+    ) -> typing.Dict[str, typing.Any]:
+    """
+Render the Markdown for the dependency reference page, and also write
+the dependency graph as Turtle when the optional `graph` parameter
+names an output file.
+
+    local_config:
+local configuration
+
+    docs_dir:
+base directory for the templates, the requirements files, and the rendered Markdown file
+
+    returns:
+the dependency data used to render the page, with the `package` node, its `dependencies` sorted by name, and the `missing` ones which are not installed
+    """
+    depend_config = local_config["depend"]
+    tree = get_dependencies(depend_config, docs_dir)
+    nodes = tree["nodes"]
+
+    dependencies = sorted(
+        [ node for key, node in nodes.items() if key != tree["package"] ],
+        key=lambda node: node["key"],
+        )
+
+    groups: typing.Dict[str, typing.Any] = {
+        "package": nodes[tree["package"]],
+        "dependencies": dependencies,
+        "missing": [ node for node in dependencies if node["version"] is None ],
+    }
+
+    # only write a changed graph, since `mkdocs serve` watches `docs_dir`
+    if depend_config.get("graph"):
+        graph_path = docs_dir / depend_config["graph"]
+        text = get_depend_rdf(tree).save_rdf_text(format="ttl")
+
+        if not graph_path.exists() or graph_path.read_text(encoding="utf-8") != text:
+            graph_path.write_text(text, encoding="utf-8")
+
+    render_reference(docs_dir / depend_config["template"], docs_dir / depend_config["page"], groups)
+
+    return groups
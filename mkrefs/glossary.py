@@ -2,125 +2,852 @@
 # -*- coding: utf-8 -*-
 # see license https://github.com/DerwenAI/mkrefs#license-and-copyright
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+import hashlib
 import json
-import tempfile
+import posixpath
+import re
 import typing
 
 import kglab
+from markdown.extensions.toc import slugify  # type: ignore  # pylint: disable=E0401
+import pandas as pd  # type: ignore # pylint: disable=E0401
 import pathlib
+import rdflib  # type: ignore  # pylint: disable=E0401
 
-from .util import abbrev_iri, denorm_entity, get_item_list, render_reference
+from .closure import get_closure_index
+from .records import to_records
+from .util import abbrev_iri, denorm_entity, df_item_list, extract_jsonld, get_jinja2_template, prune_pages, render_pages, split_sections
 
 
-def render_glossary (  # pylint: disable=R0914
+def get_entry_link (
+    label: str,
+    shard: bool,
+    ) -> str:
+    """
+Link to a glossary entry by its label, which in a sharded glossary
+points to the page for the letter of the entry.
+
+    label:
+glossary entry label
+
+    shard:
+flag for whether the glossary gets sharded into per-letter pages
+
+    returns:
+link target, relative to the page which contains the link
+    """
+    # the same anchors as the Markdown `toc` extension
+    anchor = slugify(label, "-")
+
+    if shard:
+        return f"{label[0].lower()}.md#{anchor}"
+
+    return f"#{anchor}"
+
+
+def get_shard_pages (
+    page: str,
+    letters: typing.Iterable[str],
+    ) -> typing.List[typing.List[str]]:
+    """
+List the per-letter pages of a sharded glossary, which get placed in a
+subdirectory named after the glossary page, e.g., `glossary/a.md` for
+`glossary.md`
+
+    page:
+the glossary page, relative to `docs_dir`
+
+    letters:
+initial letters of the glossary entries
+
+    returns:
+list of `[letter, shard_page]` links, relative to the directory of the glossary page
+    """
+    stem = pathlib.PurePosixPath(page).stem
+
+    return [
+        [ letter, f"{stem}/{letter}.md" ]
+        for letter in letters
+        ]
+
+
+def get_glossary_terms (
     local_config: dict,
-    kg: kglab.KnowledgeGraph,
-    template_path: pathlib.Path,
+    groups: typing.Dict[str, list],
+    ) -> typing.Tuple[typing.List[str], typing.List[str]]:
+    """
+List the terms defined in a glossary, i.e., the labels of its entries
+and of their synonyms, each with a link to its definition.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of glossary entries, as returned by `render_glossary()`
+
+    returns:
+a tuple of the terms, and the link targets for each term relative to `docs_dir`
+    """
+    page = local_config["glossary"]["page"]
+    shard = bool(local_config["glossary"].get("shard"))
+
+    if shard:
+        base = posixpath.join(posixpath.dirname(page), pathlib.PurePosixPath(page).stem, "")
+    else:
+        base = page
+
+    links: typing.Dict[str, str] = {}
+
+    for item_list in groups.values():
+        for item in item_list:
+            if item.get("redirect") is not None:
+                term, definition = item["label"], item["redirect"]
+            else:
+                term = definition = item.get("prefLabel")
+
+            if isinstance(term, str) and term and term.lower() not in links:
+                links[term.lower()] = base + get_entry_link(definition, shard)
+
+    terms = sorted(links.keys())
+
+    return terms, [ links[term] for term in terms ]
+
+
+def _localize_topic (
+    topic_uri: str,
+    entry_ids: dict,
+    shard: bool,
+    ) -> str:
+    """
+Link to a topic, either as a glossary entry or as an external IRI.
+
+    topic_uri:
+topic identifier
+
+    entry_ids:
+glossary entry identifiers, with their labels
+
+    shard:
+flag for whether the glossary gets sharded into per-letter pages
+
+    returns:
+Markdown or HTML link
+    """
+    if topic_uri in entry_ids:
+        label = entry_ids[topic_uri]["label"]
+
+        return f"[{label}]({get_entry_link(label, shard)})"
+
+    return f"<a href='{topic_uri}' target='_blank'>{topic_uri}</a>"
+
+
+_GLOSSARY_CACHE: typing.Dict[str, dict] = {}
+
+_SCOPE_VAR_PAT = re.compile(r"\?scope\b")
+_WHERE_PAT = re.compile(r"\bWHERE\s*\{", re.IGNORECASE)
+
+
+def _subject_hash (
+    graph: rdflib.Graph,
+    topic_uri: str,
+    ) -> str:
+    """
+Hash the triples of one subject, to detect which glossary topics have
+changed between builds.
+Blank nodes get hashed by position only, since their identifiers are
+not stable across parsing.
+
+    graph:
+the RDF graph
+
+    topic_uri:
+topic identifier
+
+    returns:
+hex digest for the triples of the subject
+    """
+    lines = sorted(
+        " ".join([ pred.n3(), "[]" if isinstance(obj, rdflib.BNode) else obj.n3() ])
+        for pred, obj in graph.predicate_objects(rdflib.URIRef(topic_uri))
+        )
+
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def _get_cache_stamp (
+    local_config: dict,
+    template_paths: typing.List[pathlib.Path],
+    ) -> str:
+    """
+Identify the configuration and templates used to render a glossary, so
+that changing either of these forces a full build.
+
+    local_config:
+local configuration
+
+    template_paths:
+file paths for the Jinja2 templates
+
+    returns:
+cache stamp
+    """
+    stamp = [
+        json.dumps(local_config["glossary"], sort_keys=True),
+        json.dumps(local_config.get("biblio", {}).get("page")),
+        ]
+
+    for path in template_paths:
+        stat = path.stat()
+        stamp.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    return "\n".join(stamp)
+
+
+def _get_output_stamp (
     markdown_path: pathlib.Path,
-    ) -> typing.Dict[str, list]:
+    ) -> typing.Optional[typing.Tuple[int, int]]:
     """
-Render the Markdown for a glossary, based on the given KG and
-Jinja2 template.
+Identify the version of a rendered Markdown file, to detect whether it
+has been changed or removed since the previous build.
+
+    markdown_path:
+file path for the rendered Markdown file
+
+    returns:
+`(mtime_ns, size)` tuple, or `None` if the file does not exist
+    """
+    try:
+        stat = markdown_path.stat()
+        return (stat.st_mtime_ns, stat.st_size,)
+    except OSError:
+        return None
+
+
+def get_glossary_scopes (
+    local_config: dict,
+    ) -> typing.List[dict]:
+    """
+List the scoped glossaries configured for a glossary, each with the
+`scope` value to bind into its queries and its generated `page`, plus
+an optional `template`.
+
+    local_config:
+local configuration
+
+    returns:
+list of scope configurations
+    """
+    scopes = local_config["glossary"].get("scopes") or []
+
+    for scope_config in scopes:
+        for key in [ "scope", "page" ]:
+            if key not in scope_config:
+                raise ValueError(f"glossary scope is missing the `{key}` parameter: {scope_config}")
+
+    return scopes
+
+
+def get_glossary_languages (
+    local_config: dict,
+    ) -> typing.List[str]:
+    """
+List the language tags configured for a glossary, where the first one
+is the default language, used for the glossary page itself.
+
+    local_config:
+local configuration
+
+    returns:
+list of language tags, e.g., `["en", "de"]`
+    """
+    return [ str(language) for language in local_config["glossary"].get("languages") or [] ]
+
+
+def get_glossary_hypernym (
+    local_config: dict,
+    kg: kglab.KnowledgeGraph,
+    ) -> rdflib.URIRef:
+    """
+Get the predicate which links a glossary topic to its hypernyms, for the
+breadcrumbs, from the optional `hypernym` parameter as either a CURIE
+or an IRI, which defaults to `skos:broader`.
+
+    local_config:
+local configuration
+
+    kg:
+the KG graph object, for its namespace prefixes
+
+    returns:
+IRI of the predicate
+    """
+    hypernym = str(local_config["glossary"].get("hypernym") or "skos:broader")
+    prefix, _, local_name = hypernym.partition(":")
+    ns_dict = kg.get_ns_dict()
+
+    if prefix in ns_dict and not local_name.startswith("//"):
+        return rdflib.URIRef(str(ns_dict[prefix]) + local_name)
+
+    return rdflib.URIRef(hypernym)
+
+
+def get_language_page (
+    page: str,
+    language: str,
+    ) -> str:
+    """
+Name the page for a glossary in another language, e.g.,
+`glossary_de.md` for `glossary.md`
+
+    page:
+the glossary page, relative to `docs_dir`
+
+    language:
+language tag
+
+    returns:
+the page for the language, relative to `docs_dir`
+    """
+    path = pathlib.PurePosixPath(page)
+
+    return str(path.with_name(f"{path.stem}_{language}{path.suffix}"))
+
+
+def get_glossary_variants (
+    local_config: dict,
+    ) -> typing.List[dict]:
+    """
+List the variant pages of a glossary: one for each scope, in the
+default language, then one for each language after the default one.
+
+    local_config:
+local configuration
+
+    returns:
+list of variants, each with its `scope`, `language`, `page`, and `template`
+    """
+    template = local_config["glossary"]["template"]
+    languages = get_glossary_languages(local_config)
+    default_language = languages[0] if languages else None
+
+    variants: typing.List[dict] = [
+        {
+            "scope": scope_config["scope"],
+            "language": default_language,
+            "page": scope_config["page"],
+            "template": scope_config.get("template", template),
+        }
+        for scope_config in get_glossary_scopes(local_config)
+        ]
+
+    for language in languages[1:]:
+        variants.append({
+            "scope": None,
+            "language": language,
+            "page": get_language_page(local_config["glossary"]["page"], language),
+            "template": template,
+        })
+
+    return variants
+
+
+def _bind_scopes (
+    sparql: str,
+    scopes: typing.List[str],
+    ) -> str:
+    """
+Bind the `?scope` variable of a query to the values of all the scopes,
+so that one query answers for every scoped glossary.
+
+    sparql:
+SPARQL query which uses a `?scope` variable
+
+    scopes:
+SPARQL terms for the scope values, e.g., `derw:topic_NLP`
+
+    returns:
+SPARQL query with a `VALUES` clause for the scopes
+    """
+    match = _WHERE_PAT.search(sparql)
+
+    if match is None:
+        raise ValueError(f"cannot bind the scopes in query: {sparql}")
+
+    values = " ".join(scopes)
+
+    return f"{sparql[:match.end()]} VALUES ?scope {{ {values} }} {sparql[match.end():]}"
+
+
+class GlossaryQueries:
+    """
+Results of the SPARQL queries for a glossary and its variants, i.e., its
+scoped and per-language glossaries.
+Each query runs at most once, when its results first get used, then its
+results get partitioned in memory.
+
+Queries which use a `?scope` variable get bound to the values of all the
+scopes at once, then their rows get partitioned by scope; these queries
+must also select `?scope`.
+Queries which do not use `?scope` get shared by all of the scopes.
+Without a scope, the results are the union for all of the scopes.
+
+Rows also get partitioned by the language tag of their first tagged
+literal, when the glossary has `languages` configured.
+For each entity, i.e., the first column of a query, the rows for a
+language fall back to the rows for the default language, which is the
+first one listed, while rows without tagged literals get shared by all
+of the languages.
+    """
+
+    def __init__ (
+        self,
+        local_config: dict,
+        kg: kglab.KnowledgeGraph,
+        ) -> None:
+        """
+Constructor.
 
     local_config:
 local configuration, including user-configurable SPARQL queries
 
     kg:
 the KG graph object
+        """
+        self.kg = kg
+        self.queries: typing.Dict[str, str] = local_config["glossary"]["queries"]
+        self.scopes: typing.List[str] = [ scope_config["scope"] for scope_config in get_glossary_scopes(local_config) ]
+        self.languages: typing.List[str] = get_glossary_languages(local_config)
+        self.hypernym: rdflib.URIRef = get_glossary_hypernym(local_config, kg)
+        self.scope_values: typing.Optional[typing.Dict[str, str]] = None
+        self.results: typing.Dict[str, dict] = {}
+        self.entry_ids: typing.Dict[tuple, dict] = {}
 
-    template_path:
-file path for Jinja2 template for rendering a glossary page in MkDocs
 
-    markdown_path:
-file path for the rendered Markdown file
+    def _is_scoped (
+        self,
+        name: str,
+        ) -> bool:
+        """
+Semiprivate helper method to determine whether one of the queries gets
+bound to the scopes.
+
+    name:
+name of the query, e.g., `"entry"`
 
     returns:
-rendered Markdown
+boolean flag, for whether the query uses a `?scope` variable
+        """
+        return len(self.scopes) > 0 and _SCOPE_VAR_PAT.search(self.queries[name]) is not None
+
+
+    def _get_scope_values (
+        self,
+        ) -> typing.Dict[str, str]:
+        """
+Semiprivate helper method to resolve the configured scope terms, e.g.,
+CURIEs or literals, to the values which queries return for them, using
+one query for all of the scopes.
+
+    returns:
+the value for each scope term
+        """
+        if self.scope_values is None:
+            rows = " ".join(
+                f"({i} {scope})"
+                for i, scope in enumerate(self.scopes)
+                )
+
+            sparql = f"SELECT ?i ?scope WHERE {{ VALUES (?i ?scope) {{ {rows} }} }}"
+
+            self.scope_values = {
+                self.scopes[int(row["i"].toPython())]: str(row["scope"])
+                for row in self.kg.rdf_graph().query(sparql)
+                }
+
+        return self.scope_values
+
+
+    def _get_result (
+        self,
+        name: str,
+        ) -> dict:
+        """
+Semiprivate helper method to run one of the queries, partitioning its
+rows by scope value and by language tag.
+
+    name:
+name of the query, e.g., `"entry"`
+
+    returns:
+the result columns, the rows with their language tags, and the row indexes for each `(scope_value, language)` partition
+        """
+        if name in self.results:
+            return self.results[name]
+
+        sparql = self.queries[name]
+        scoped = self._is_scoped(name)
+
+        if scoped:
+            sparql = _bind_scopes(sparql, self.scopes)
+
+        result = self.kg.rdf_graph().query(sparql)
+        columns = [ str(var) for var in result.vars ]
+
+        if scoped:
+            if "scope" not in columns:
+                raise ValueError(f"glossary query `{name}` uses `?scope` without selecting it")
+
+            columns.remove("scope")
+
+        rows: typing.List[dict] = []
+        langs: typing.List[typing.Optional[str]] = []
+        parts: typing.Dict[tuple, typing.List[int]] = defaultdict(list)
+
+        for row in result:
+            values = row.asdict()
+            scope_value = str(values.pop("scope")) if scoped else None
+
+            lang = next((
+                val.language
+                for val in values.values()
+                if isinstance(val, rdflib.Literal) and val.language
+                ), None)
+
+            parts[(scope_value, lang,)].append(len(rows))
+            rows.append(values)
+            langs.append(lang)
+
+        self.results[name] = {
+            "columns": columns,
+            "rows": rows,
+            "langs": langs,
+            "parts": parts,
+        }
+
+        return self.results[name]
+
+
+    def get_rows (
+        self,
+        name: str,
+        ) -> typing.Tuple[typing.List[str], typing.List[dict]]:
+        """
+Get the rows of one of the queries for all of the scopes and languages,
+as RDF terms.
+
+    name:
+name of the query, e.g., `"entry"`
+
+    returns:
+a tuple of the result columns, other than `?scope`, and the rows keyed by column
+        """
+        result = self._get_result(name)
+
+        return result["columns"], result["rows"]
+
+
+    def get_results (
+        self,
+        name: str,
+        scope: typing.Optional[str] = None,
+        language: typing.Optional[str] = None,
+        ) -> pd.DataFrame:
+        """
+Get the results of one of the queries for a scope and a language.
+
+    name:
+name of the query, e.g., `"entry"`
+
+    scope:
+optional, the SPARQL term for the scope, as configured; otherwise the union for all of the scopes
+
+    language:
+optional, the language tag; otherwise the results in all languages
+
+    returns:
+SPARQL query result set, as a dataframe
+        """
+        result = self._get_result(name)
+        rows = result["rows"]
+        langs = result["langs"]
+
+        if scope is not None and self._is_scoped(name):
+            value = self._get_scope_values().get(scope)
+
+            indexes = sorted(
+                i
+                for (scope_value, _), part in result["parts"].items()
+                if scope_value == value
+                for i in part
+                )
+        else:
+            indexes = list(range(len(rows)))
+
+        if language is not None:
+            # entities which have rows in this language, otherwise use
+            # the default language
+            entity_col = result["columns"][0]
+
+            found = {
+                rows[i].get(entity_col)
+                for i in indexes
+                if langs[i] == language
+                }
+
+            indexes = [
+                i
+                for i in indexes
+                if langs[i] is None or langs[i] == (language if rows[i].get(entity_col) in found else self.languages[0])
+                ]
+
+        df = pd.DataFrame([ rows[i] for i in indexes ], columns=result["columns"])
+
+        if scope is None and self._is_scoped(name):
+            df = df.drop_duplicates()
+
+        return df
+
+
+    def get_entry_ids (
+        self,
+        scope: typing.Optional[str] = None,
+        language: typing.Optional[str] = None,
+        ) -> dict:
+        """
+Get the glossary entry identifiers for a scope and a language.
+
+    scope:
+optional, the SPARQL term for the scope, as configured
+
+    language:
+optional, the language tag
+
+    returns:
+glossary entry identifiers, with their labels
+        """
+        key = (scope, language,)
+
+        if key not in self.entry_ids:
+            self.entry_ids[key] = denorm_entity(self.get_results("entry", scope, language), "entry")
+
+        return self.entry_ids[key]
+
+
+    def get_item_list (
+        self,
+        name: str,
+        scope: typing.Optional[str] = None,
+        language: typing.Optional[str] = None,
+        ) -> typing.Tuple[str, dict]:
+        """
+Get the list of entity identifiers from one of the queries for a scope
+and a language, to substitute in JSON-LD.
+
+    name:
+name of the query, e.g., `"entry_syn"`
+
+    scope:
+optional, the SPARQL term for the scope, as configured
+
+    language:
+optional, the language tag
+
+    returns:
+a tuple of the list relation to replace, and the identifier values
+        """
+        return df_item_list(self.get_results(name, scope, language))
+
+
+def _select_language (
+    item: dict,
+    language: str,
+    default_language: str,
+    kg_language: str,
+    ) -> dict:
     """
-    # get the glossary entry identifiers
-    sparql = local_config["glossary"]["queries"]["entry"]
-    df = kg.query_as_df(sparql, simplify=False, pythonify=True)
-    entry_ids = denorm_entity(df, "entry")
+Select the values in one language for the properties of a JSON-LD
+entry, after its IRIs get abbreviated, falling back to the default
+language for properties which have not been translated.
+Values which are not language-tagged literals get kept.
+
+    item:
+JSON-LD entry, which does not get modified
+
+    language:
+language tag to select
+
+    default_language:
+language tag to use as the fallback
+
+    kg_language:
+language of the KG, which JSON-LD uses for its plain string values
+
+    returns:
+copy of the entry, where each property has the values for one language
+    """
+    selected: dict = {}
+
+    for key, value in item.items():
+        values = value if isinstance(value, list) else [ value ]
+        shared: list = []
+        tagged: typing.Dict[str, list] = defaultdict(list)
+
+        for val in values:
+            if isinstance(val, str):
+                tagged[kg_language].append(val)
+            elif isinstance(val, dict) and val.get("language") and "value" in val:
+                tagged[val["language"]].append(val["value"])
+            else:
+                shared.append(val)
+
+        if len(tagged) < 1:
+            selected[key] = value
+            continue
+
+        picked = tagged.get(language) or tagged.get(default_language) or [ val for vals in tagged.values() for val in vals ]
+        values = shared + picked
+        selected[key] = values[0] if len(values) == 1 else values
 
-    sparql = local_config["glossary"]["queries"]["entry_syn"]
-    _, syn_labels = get_item_list(kg, sparql)
+    return selected
+
+
+def _denorm_entries (  # pylint: disable=R0913,R0914,R0917
+    queries: GlossaryQueries,
+    scope: typing.Optional[str],
+    language: typing.Optional[str],
+    items: dict,
+    affected: typing.Set[str],
+    shard: bool,
+    biblio_page: str,
+    records: typing.Dict[str, list],
+    deps: typing.Dict[str, set],
+    ) -> None:
+    """
+Denormalize the JSON-LD for glossary entries, each followed by the
+redirects for its synonyms, as compact records.
+
+    queries:
+results of the glossary queries
+
+    scope:
+the SPARQL term for the scope of the glossary, or `None` for the main glossary
+
+    language:
+the language tag of the glossary, or `None` when the glossary does not have `languages` configured
+
+    items:
+JSON-LD content for the entries, keyed by topic identifier, which does not get modified
+
+    affected:
+identifiers of the topics to denormalize
+
+    shard:
+flag for whether the glossary gets sharded into per-letter pages
+
+    biblio_page:
+link to the bibliography page, relative to the glossary page
+
+    records:
+records for each topic, which get updated
+
+    deps:
+identifiers of the topics linked by each topic, which get updated
+    """
+    entry_ids = queries.get_entry_ids(scope, language)
+    _, syn_labels = queries.get_item_list("entry_syn", scope, language)
 
     # get the entity maps
     entity_map: dict = {}
 
-    sparql = local_config["glossary"]["queries"]["entry_ref"]
-    list_name, list_ids = get_item_list(kg, sparql)
+    list_name, list_ids = queries.get_item_list("entry_ref", scope, language)
     entity_map[list_name] = list_ids
 
     ## localize the taxonomy for hypernyms
-    sparql = local_config["glossary"]["queries"]["entry_hyp"]
-    list_name, list_ids = get_item_list(kg, sparql)
-    localized_hyp_ids: dict = {}
+    list_name, hyp_ids = queries.get_item_list("entry_hyp", scope, language)
 
-    for topic_uri, items in list_ids.items():
-        hyp_ids: list = []
+    entity_map[list_name] = {
+        topic_uri: [ _localize_topic(hypernym, entry_ids, shard) for hypernym in hypernyms ]
+        for topic_uri, hypernyms in hyp_ids.items()
+        if topic_uri in affected
+    }
 
-        for hypernym in items:
-            if hypernym in entry_ids:
-                hyp_label = entry_ids[hypernym]["label"]
-                hyp_link = hyp_label.replace(" ", "-")
+    ## the full taxonomy path for each entry, as breadcrumbs
+    closure = get_closure_index(queries.kg, queries.hypernym)
 
-                hyp_ids.append(f"[{hyp_label}](#{hyp_link})")
-            else:
-                hyp_ids.append(f"<a href='{hypernym}' target='_blank'>{hypernym}</a>")
-
-        localized_hyp_ids[topic_uri] = hyp_ids
-
-    entity_map[list_name] = localized_hyp_ids
+    entity_map["breadcrumbs"] = {
+        topic_uri: [ _localize_topic(ancestor, entry_ids, shard) for ancestor in closure.paths[topic_uri] ]
+        for topic_uri in affected
+        if topic_uri in closure.paths
+    }
 
     ## localize the citekey entries for the bibliography
-    sparql = local_config["glossary"]["queries"]["entry_cite"]
-    list_name, list_ids = get_item_list(kg, sparql)
-    biblio_page = "../{}/".format(local_config["biblio"]["page"].replace(".md", ""))
+    list_name, list_ids = queries.get_item_list("entry_cite", scope, language)
     localized_cite_ids: dict = {}
 
-    for topic_uri, items in list_ids.items():
+    for topic_uri, citekeys in list_ids.items():
         localized_cite_ids[topic_uri] = [
             f"[[{citekey}]]({biblio_page}#{citekey})"
-            for citekey in items
+            for citekey in citekeys
             ]
 
     entity_map[list_name] = localized_cite_ids
 
-    # extract content as JSON-LD
-    entries: dict = {}
-
-    json_path = pathlib.Path(tempfile.NamedTemporaryFile().name)
-    kg.save_jsonld(json_path)
+    # copy each entry, since the same content may get shared by several
+    # scopes, and keep the copies until all of them get converted
+    entries: dict = {
+        topic_uri: dict(items[topic_uri])
+        for topic_uri in affected
+        }
 
-    with open(json_path, "r") as f:  # pylint: disable=W0621
-        gloss_j = json.load(f)
+    memo: dict = {}
 
-        entries = {
-            entry_ids[item["@id"]]["label"]: abbrev_iri(item)
-            for item in gloss_j["@graph"]
-            if item["@id"] in entry_ids
-        }
+    for topic_uri, entry in entries.items():
+        definition = entry_ids[topic_uri]["label"]
 
-    # denormalize the JSON-LD for glossary entries
-    for id, val_dict in entry_ids.items():
-        definition = val_dict["label"]
+        for key, entity_ids in entity_map.items():
+            if topic_uri in entity_ids:
+                entry[key] = entity_ids[topic_uri]
 
-        for key, entry in entity_map.items():
-            for topic_uri, items in entry.items():
-                if topic_uri == id:
-                    entries[definition][key] = items
+        records[topic_uri] = [ (definition, to_records(entry, memo),) ]
 
-    # add redirects for the synonyms
-    for topic_uri, items in syn_labels.items():
-        for synonym in items:
-            entries[synonym] = {
+        # the redirects are temporary dicts, so they must not share the
+        # memo, which is keyed by `id()`
+        for synonym in syn_labels.get(topic_uri, []):
+            records[topic_uri].append((synonym, to_records({
                 "label": synonym,
-                "redirect": entry_ids[topic_uri]["label"],
-            }
+                "redirect": definition,
+                "redirect_link": get_entry_link(definition, shard),
+            }),))
+
+        deps[topic_uri] = set(hyp_ids.get(topic_uri, [])) | closure.ancestors.get(topic_uri, set())
+
+
+def _group_entries (
+    entry_ids: dict,
+    records: typing.Dict[str, list],
+    ) -> typing.Dict[str, list]:
+    """
+Group the records of glossary entries by letter, sorted by label, where
+an entry takes precedence over a redirect with the same label.
+
+    entry_ids:
+glossary entry identifiers, with their labels
+
+    records:
+records for each topic
+
+    returns:
+glossary entries, grouped by letter
+    """
+    entries: dict = {}
+
+    for topic_uri in entry_ids.keys():
+        entries.update(record for record in records[topic_uri] if record[1].get("redirect") is None)
+
+    for topic_uri in entry_ids.keys():
+        entries.update(record for record in records[topic_uri] if record[1].get("redirect") is not None)
 
-    # initialize the `groups` grouping of entries
     entries = OrderedDict(sorted(entries.items()))
     letters = sorted(list({
                 key[0].lower()
@@ -137,7 +864,374 @@ rendered Markdown
         letter = definition[0].lower()
         groups[letter].append(entry)
 
-    # render the JSON into Markdown using the Jinja2 template
-    _ = render_reference(template_path, markdown_path, groups)
+    return groups
+
+
+def render_glossary (  # pylint: disable=R0912,R0913,R0914
+    local_config: dict,
+    kg: kglab.KnowledgeGraph,
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    queries: typing.Optional[GlossaryQueries] = None,
+    ) -> typing.Dict[str, list]:
+    """
+Render the Markdown for a glossary, based on the given KG and
+Jinja2 template.
+
+The per-entry data from the previous build gets kept in memory, e.g.,
+during `mkdocs serve` or `mkrefs watch`, along with a hash of the
+triples for each topic.
+Later builds only denormalize the topics which changed, plus the
+entries which link to them, then re-render only the affected letter
+sections and splice them into the page.
+
+    local_config:
+local configuration, including user-configurable SPARQL queries
+
+    kg:
+the KG graph object
+
+    template_path:
+file path for Jinja2 template for rendering a glossary page in MkDocs
+
+    markdown_path:
+file path for the rendered Markdown file
+
+    queries:
+optional, results of the glossary queries to share with the glossary variants, as used by `render_glossary_variants()`
+
+    returns:
+rendered Markdown
+    """
+    shard = bool(local_config["glossary"].get("shard"))
+    shard_template_path = template_path.parent / local_config["glossary"].get("shard_template", template_path.name)
+
+    if queries is None:
+        queries = GlossaryQueries(local_config, kg)
+
+    # the glossary page itself uses the default language, if any
+    language = queries.languages[0] if queries.languages else None
+
+    # get the glossary entry identifiers
+    entry_ids = queries.get_entry_ids(None, language)
+
+    # find which topics changed since the previous build
+    graph = kg.rdf_graph()
+
+    hashes: typing.Dict[str, str] = {
+        topic_uri: _subject_hash(graph, topic_uri)
+        for topic_uri in entry_ids.keys()
+        }
+
+    cache_key = str(markdown_path.resolve())
+    cache_stamp = _get_cache_stamp(local_config, [ template_path, shard_template_path ])
+    cache = _GLOSSARY_CACHE.get(cache_key)
+
+    if cache is not None and (cache["stamp"] != cache_stamp or cache["output"] != _get_output_stamp(markdown_path)):
+        cache = None
+
+    if cache is None:
+        records: typing.Dict[str, list] = {}
+        deps: typing.Dict[str, set] = {}
+        affected = set(entry_ids.keys())
+        affected_letters: typing.Set[str] = set()
+    else:
+        records = dict(cache["records"])
+        deps = dict(cache["deps"])
+
+        changed = {
+            topic_uri
+            for topic_uri in set(hashes.keys()) | set(cache["hashes"].keys())
+            if hashes.get(topic_uri) != cache["hashes"].get(topic_uri)
+            }
+
+        if len(changed) < 1:
+            return cache["groups"]
+
+        # also update the entries which link to the changed topics
+        affected = {
+            topic_uri
+            for topic_uri in entry_ids.keys()
+            if topic_uri in changed or not deps.get(topic_uri, set()).isdisjoint(changed)
+            }
+
+        # the letters of the previous versions of the changed entries
+        affected_letters = {
+            label[0].lower()
+            for topic_uri in changed | affected
+            for label, _ in records.get(topic_uri, [])
+            }
+
+        for topic_uri in changed - set(entry_ids.keys()):
+            records.pop(topic_uri, None)
+            deps.pop(topic_uri, None)
+
+    if shard:
+        shard_dir = posixpath.join(posixpath.dirname(local_config["glossary"]["page"]), markdown_path.stem)
+        biblio_page = posixpath.relpath(local_config["biblio"]["page"], shard_dir)
+    else:
+        biblio_page = "../{}/".format(local_config["biblio"]["page"].replace(".md", ""))
+
+    # extract content as JSON-LD, only for the affected entries
+    items: dict = {
+        item["@id"]: abbrev_iri(item, in_place=True)
+        for item in extract_jsonld(kg, affected)
+        if item["@id"] in entry_ids
+    }
+
+    if language is not None:
+        items = {
+            topic_uri: _select_language(item, language, language, kg.language)
+            for topic_uri, item in items.items()
+        }
+
+    _denorm_entries(queries, None, language, items, affected, shard, biblio_page, records, deps)
+
+    for topic_uri in affected:
+        affected_letters.update(label[0].lower() for label, _ in records[topic_uri])
+
+    # initialize the `groups` grouping of entries
+    groups = _group_entries(entry_ids, records)
+
+    # render the JSON into Markdown using the Jinja2 template, only for
+    # the affected letters when the previous build can be reused
+    sections: typing.Optional[dict] = None
+
+    if shard:
+        render_glossary_shards(local_config, groups, template_path, markdown_path, None if cache is None else affected_letters)
+    elif cache is not None and cache["sections"] is not None:
+        sections = splice_glossary(groups, template_path, markdown_path, cache["sections"], affected_letters)
+    else:
+        sections = render_glossary_page(groups, template_path, markdown_path)
+
+    _GLOSSARY_CACHE[cache_key] = {
+        "stamp": cache_stamp,
+        "output": _get_output_stamp(markdown_path),
+        "hashes": hashes,
+        "records": records,
+        "deps": deps,
+        "groups": groups,
+        "sections": sections,
+    }
 
     return groups
+
+
+def render_glossary_variants (  # pylint: disable=R0914
+    local_config: dict,
+    kg: kglab.KnowledgeGraph,
+    docs_dir: pathlib.Path,
+    queries: typing.Optional[GlossaryQueries] = None,
+    ) -> typing.Dict[str, typing.Dict[str, list]]:
+    """
+Render the Markdown for the variants of a glossary, i.e., the scoped
+glossaries configured in its `scopes` list, plus one page for each of
+its `languages` after the default one, with all of the pages rendered
+concurrently.
+All of the variants share one run of each query, and the content of
+each topic gets extracted once, even when it belongs to several
+variants.
+
+    local_config:
+local configuration, including user-configurable SPARQL queries
+
+    kg:
+the KG graph object
+
+    docs_dir:
+the MkDocs `docs_dir` directory
+
+    queries:
+optional, results of the glossary queries shared with the main glossary, as used by `render_glossary()`
+
+    returns:
+glossary entries grouped by letter, for each variant page relative to `docs_dir`
+    """
+    variants = get_glossary_variants(local_config)
+
+    if len(variants) < 1:
+        return {}
+
+    if queries is None:
+        queries = GlossaryQueries(local_config, kg)
+
+    topics: typing.Set[str] = set()
+
+    for variant in variants:
+        topics.update(queries.get_entry_ids(variant["scope"], variant["language"]).keys())
+
+    items: dict = {
+        item["@id"]: abbrev_iri(item, in_place=True)
+        for item in extract_jsonld(kg, topics)
+        if item["@id"] in topics
+    }
+
+    variant_groups: typing.Dict[str, typing.Dict[str, list]] = {}
+    jobs: typing.List[typing.Tuple[pathlib.Path, pathlib.Path, dict]] = []
+
+    for variant in variants:
+        scope = variant["scope"]
+        language = variant["language"]
+        page = variant["page"]
+        entry_ids = queries.get_entry_ids(scope, language)
+        biblio_page = posixpath.relpath(local_config.get("biblio", {}).get("page", "biblio.md"), posixpath.dirname(page) or ".")
+
+        if language is None:
+            variant_items = items
+        else:
+            variant_items = {
+                topic_uri: _select_language(items[topic_uri], language, queries.languages[0], kg.language)
+                for topic_uri in entry_ids.keys()
+            }
+
+        records: typing.Dict[str, list] = {}
+        deps: typing.Dict[str, set] = {}
+        _denorm_entries(queries, scope, language, variant_items, set(entry_ids.keys()), False, biblio_page, records, deps)
+
+        variant_groups[page] = _group_entries(entry_ids, records)
+
+        markdown_path = docs_dir / page
+        markdown_path.parent.mkdir(parents=True, exist_ok=True)
+
+        jobs.append((docs_dir / variant["template"], markdown_path, variant_groups[page],))
+
+    render_pages(jobs)
+
+    return variant_groups
+
+
+def render_glossary_page (
+    groups: typing.Dict[str, list],
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    ) -> typing.Optional[dict]:
+    """
+Render the Markdown for a whole glossary page, and also split it into
+the rendered section for each letter, so that later builds can splice
+in only the sections which changed.
+
+    groups:
+glossary entries, grouped by letter
+
+    template_path:
+file path for Jinja2 template for rendering a glossary page in MkDocs
+
+    markdown_path:
+file path for the rendered Markdown file
+
+    returns:
+the rendered `prefix` and `suffix` text around the `letters` sections; or `None` if the template output cannot be split into sections
+    """
+    template = get_jinja2_template(template_path.name, str(template_path.parent))
+    text = template.render(groups=groups)
+
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+    return split_sections(template, groups, text)
+
+
+def splice_glossary (
+    groups: typing.Dict[str, list],
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    prev_sections: dict,
+    letters: typing.Set[str],
+    ) -> typing.Optional[dict]:
+    """
+Re-render only the given letter sections of a glossary page, then
+splice them into the sections from the previous build.
+
+    groups:
+glossary entries, grouped by letter
+
+    template_path:
+file path for Jinja2 template for rendering a glossary page in MkDocs
+
+    markdown_path:
+file path for the rendered Markdown file
+
+    prev_sections:
+the rendered sections from the previous build, as returned by `render_glossary_page()`
+
+    letters:
+the letters of the sections to render
+
+    returns:
+the rendered sections, in the same form as `prev_sections`
+    """
+    template = get_jinja2_template(template_path.name, str(template_path.parent))
+    prefix = prev_sections["prefix"]
+    suffix = prev_sections["suffix"]
+    sections = dict(prev_sections["letters"])
+
+    for letter in letters:
+        if letter not in groups:
+            sections.pop(letter, None)
+            continue
+
+        text = template.render(groups={ letter: groups[letter] })
+
+        if not text.startswith(prefix) or not text.endswith(suffix) or len(text) < len(prefix) + len(suffix):
+            # fall back to a full build
+            return render_glossary_page(groups, template_path, markdown_path)
+
+        sections[letter] = text[len(prefix):len(text) - len(suffix)]
+
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(prefix + "".join(sections[letter] for letter in sorted(sections.keys())) + suffix)
+
+    return {
+        "prefix": prefix,
+        "suffix": suffix,
+        "letters": sections,
+    }
+
+
+def render_glossary_shards (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    template_path: pathlib.Path,
+    markdown_path: pathlib.Path,
+    letters: typing.Optional[typing.Set[str]] = None,
+    ) -> None:
+    """
+Render a sharded glossary, with one page per letter rendered
+concurrently, plus the glossary page itself as an index which links to
+them.
+The index page gets rendered with `groups` set to a `shards` list of
+`[letter, shard_page]` links.
+Shard pages from previous builds which no longer have any entries get
+removed.
+
+    local_config:
+local configuration, including the optional `shard_template` for per-letter pages
+
+    groups:
+glossary entries, grouped by letter
+
+    template_path:
+file path for Jinja2 template for rendering the glossary index page
+
+    markdown_path:
+file path for the rendered Markdown index page
+
+    letters:
+optional, render only the pages for these letters, e.g., the ones which changed since the previous build
+    """
+    shard_template_path = template_path.parent / local_config["glossary"].get("shard_template", template_path.name)
+    shard_dir = markdown_path.parent / markdown_path.stem
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    shard_pages = get_shard_pages(markdown_path.name, groups.keys())
+
+    jobs: typing.List[typing.Tuple[pathlib.Path, pathlib.Path, dict]] = [
+        (shard_template_path, markdown_path.parent / shard_page, { letter: groups[letter] },)
+        for letter, shard_page in shard_pages
+        if letters is None or letter in letters
+        ]
+
+    jobs.append((template_path, markdown_path, { "shards": shard_pages },))
+    render_pages(jobs)
+
+    prune_pages(shard_dir, [ markdown_path.parent / shard_page for _, shard_page in shard_pages ])
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Back-of-book index for a site, which joins the glossary topics,
+bibliography entries, and apidocs entities, each listed with the pages
+which mention it.
+
+All of the names and synonyms get compiled into one Aho-Corasick
+automaton, so that collecting the mentions takes one linear-time scan
+of each page as MkDocs loads it, and no page gets read twice.
+"""
+
+import json
+import pathlib
+import posixpath
+import re
+import typing
+
+import markdown  # type: ignore  # pylint: disable=E0401
+
+from .autolink import get_term_matcher
+from .cite import get_marker_keys
+from .glossary import get_shard_pages
+from .util import get_jinja2_template, split_markdown
+
+
+# inline code which names a Python object, e.g., `load_kg()` or
+# `mkrefs.util.load_kg`, but not a code block
+_CODE_NAME_PAT = re.compile(r"^(`+) ?([A-Za-z_][\w.]*)(\([^\n]*\))? ?\1\Z")
+
+
+def get_glossary_index_entities (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the index entities for a glossary, one per entry, where the
+synonyms of an entry become its aliases.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of glossary entries, as returned by `render_glossary()`
+
+    returns:
+list of index entities
+    """
+    page = local_config["glossary"]["page"]
+    shard_pages: typing.Dict[str, str] = {}
+
+    if local_config["glossary"].get("shard"):
+        shard_pages = {
+            letter: posixpath.join(posixpath.dirname(page), shard_page)
+            for letter, shard_page in get_shard_pages(page, groups.keys())
+            }
+
+    entities: typing.Dict[str, dict] = {}
+    aliases: typing.List[typing.Tuple[str, str]] = []
+
+    for letter, item_list in groups.items():
+        for item in item_list:
+            if item.get("redirect") is not None:
+                aliases.append((item["label"], item["redirect"],))
+                continue
+
+            label = item.get("prefLabel")
+
+            if isinstance(label, str) and label not in entities:
+                entities[label] = {
+                    "name": label,
+                    "kind": "glossary",
+                    "page": shard_pages.get(letter, page),
+                    "heading": label,
+                    "terms": [ label ],
+                    "aliases": [],
+                }
+
+    for alias, label in aliases:
+        if label in entities and isinstance(alias, str):
+            entities[label]["terms"].append(alias)
+            entities[label]["aliases"].append(alias)
+
+    return list(entities.values())
+
+
+def get_biblio_index_entities (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the index entities for a bibliography, one per entry, mentioned by
+its citekey.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of bibliography entries, as returned by `render_biblio()`
+
+    returns:
+list of index entities
+    """
+    page = local_config["biblio"]["page"]
+
+    return [
+        {
+            "name": item["citeKey"],
+            "kind": "biblio",
+            "page": page,
+            "heading": item["citeKey"],
+            "terms": [ item["citeKey"] ],
+            "aliases": [],
+        }
+        for item_list in groups.values()
+        for item in item_list
+        ]
+
+
+def get_apidocs_index_entities (
+    page: str,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the index entities for an apidocs reference page, one per class
+and function; methods get left out, since their names tend to be
+common words.
+
+    page:
+the apidocs reference page, relative to `docs_dir`
+
+    groups:
+the apidocs data used to render the page, as returned by `render_apidocs_list()`
+
+    returns:
+list of index entities
+    """
+    class_pages: typing.Dict[typing.Tuple[str, str], str] = {
+        (pkg_name, class_name,): posixpath.join(posixpath.dirname(page), class_page)
+        for pkg_name, class_name, class_page in groups.get("pages", [])
+        }
+
+    entities: typing.List[dict] = []
+
+    for meta in groups.get("package", []):
+        pkg_name = meta["package"]
+
+        for class_name in meta["class"].keys():
+            entities.append({
+                "name": class_name,
+                "kind": "class",
+                "page": class_pages.get((pkg_name, class_name,), page),
+                "heading": f"{class_name} class",
+                "terms": [ class_name ],
+                "aliases": [],
+            })
+
+        # function headings are nested under the `module functions`
+        # heading, which tells them apart from methods of the same name
+        for func_name in meta["function"].keys():
+            entities.append({
+                "name": func_name,
+                "kind": "function",
+                "page": page,
+                "heading": f"module functions\n{func_name} method",
+                "terms": [ func_name ],
+                "aliases": [],
+            })
+
+    return entities
+
+
+class MentionIndex:
+    """
+Collect the mentions of the index entities in the pages of a site, with
+one scan of each page using an Aho-Corasick automaton for all of the
+entity names and aliases.
+    """
+
+    def __init__ (
+        self,
+        entities: typing.List[dict],
+        ) -> None:
+        """
+Constructor.
+
+    entities:
+index entities, from the `get_*_index_entities()` functions
+        """
+        self.entities = entities
+        entity_ids: typing.Dict[str, int] = {}
+
+        # each term refers to the first entity which has it
+        for entity_id, entity in enumerate(entities):
+            for term in entity["terms"]:
+                if term:
+                    entity_ids.setdefault(term.lower(), entity_id)
+
+        terms = sorted(entity_ids.keys())
+        self.matcher = get_term_matcher(terms)
+        self.term_entities: typing.List[int] = [ entity_ids[term] for term in terms ]
+        self.mentions: typing.List[typing.List[str]] = [ [] for _ in entities ]
+
+        # citekeys get cited within citation markers, and the apidocs
+        # names get mentioned within inline code, both case-sensitive
+        self.citekeys: typing.Dict[str, int] = {}
+        self.code_names: typing.Dict[str, int] = {}
+
+        for entity_id, entity in enumerate(entities):
+            if entity["kind"] == "biblio":
+                self.citekeys.setdefault(entity["name"], entity_id)
+            elif entity["kind"] in [ "class", "function" ]:
+                self.code_names.setdefault(entity["name"], entity_id)
+
+
+    def scan (
+        self,
+        page_path: str,
+        text: str,
+        ) -> int:
+        """
+Record the entities mentioned in the prose of a page, i.e., outside of
+code, headings, links, and HTML, the same as for autolinking, plus the
+citekeys within citation markers and the apidocs names within inline
+code.
+
+    page_path:
+the page, relative to `docs_dir`
+
+    text:
+Markdown source text of the page
+
+    returns:
+number of distinct entities mentioned
+        """
+        found: typing.Set[int] = set()
+
+        for is_prose, segment in split_markdown(text):
+            if is_prose:
+                found.update(self.term_entities[index] for _, _, index in self.matcher.find(segment))
+            elif segment.startswith("["):
+                found.update(self.citekeys[key] for key in get_marker_keys(segment) if key in self.citekeys)
+            elif segment.startswith("`"):
+                match = _CODE_NAME_PAT.match(segment)
+
+                if match:
+                    found.update(self.code_names[name] for name in match.group(2).split(".") if name in self.code_names)
+
+        for entity_id in sorted(found):
+            if self.entities[entity_id]["page"] != page_path:
+                self.mentions[entity_id].append(page_path)
+
+        return len(found)
+
+
+    def get_groups (
+        self,
+        base_url: str,
+        page_urls: typing.Dict[str, str],
+        page_titles: typing.Dict[str, str],
+        page_anchors: typing.Dict[str, typing.Dict[str, str]],
+        ) -> typing.Dict[str, list]:
+        """
+Group the index entries by letter, sorted by name, each with links
+relative to a base URL, e.g., the index page.
+
+    base_url:
+site URL which the links are relative to, e.g., of the index page
+
+    page_urls:
+site URLs of the pages, keyed by their paths relative to `docs_dir`
+
+    page_titles:
+titles of the pages, keyed by their paths relative to `docs_dir`
+
+    page_anchors:
+heading anchors for each reference page, as returned by `get_toc_anchors()`
+
+    returns:
+index entries grouped by letter, each with its `name`, `kind`, `url`, `aliases`, and the `pages` which mention it
+        """
+        groups: typing.Dict[str, list] = {}
+
+        for entity_id in sorted(range(len(self.entities)), key=lambda i: self.entities[i]["name"].lower()):
+            entity = self.entities[entity_id]
+            url = page_urls.get(entity["page"])
+
+            if url is None:
+                continue
+
+            anchor = page_anchors.get(entity["page"], {}).get(entity["heading"])
+            url = _relative_url(url, base_url) + (f"#{anchor}" if anchor else "")
+
+            groups.setdefault(entity["name"][0].lower(), []).append({
+                "name": entity["name"],
+                "kind": entity["kind"],
+                "url": url,
+                "aliases": entity["aliases"],
+                "pages": [
+                    {
+                        "title": page_titles.get(page_path, page_path),
+                        "url": _relative_url(page_urls[page_path], base_url),
+                    }
+                    for page_path in self.mentions[entity_id]
+                    if page_path in page_urls
+                    ],
+            })
+
+        return groups
+
+
+def _relative_url (
+    url: str,
+    base_url: str,
+    ) -> str:
+    """
+Link from one site URL to another, the same way as MkDocs.
+
+    url:
+site URL of the target
+
+    base_url:
+site URL of the page which contains the link
+
+    returns:
+relative URL
+    """
+    # imported here, as the rest of the module does not depend on MkDocs
+    from mkdocs.utils import get_relative_url  # pylint: disable=C0415
+
+    return get_relative_url(url, base_url)
+
+
+def render_index_markdown (
+    template_path: pathlib.Path,
+    groups: typing.Dict[str, list],
+    extensions: typing.List[typing.Any],
+    extension_configs: typing.Dict[str, dict],
+    ) -> str:
+    """
+Render the HTML for the index page from a Jinja2 template which
+generates Markdown, converted with the same Markdown extensions as the
+rest of the site.
+Unlike the other reference pages, the index gets rendered after all of
+the pages have been scanned, i.e., after MkDocs has converted their
+Markdown, so its links are relative URLs rather than links to files.
+
+    template_path:
+file path for the Jinja2 template
+
+    groups:
+index entries grouped by letter, as returned by `MentionIndex.get_groups()`
+
+    extensions:
+Markdown extensions, i.e., the MkDocs `markdown_extensions` setting
+
+    extension_configs:
+configuration for the Markdown extensions, i.e., the MkDocs `mdx_configs` setting
+
+    returns:
+rendered HTML
+    """
+    template = get_jinja2_template(template_path.name, str(template_path.parent))
+    text = template.render(groups=groups)
+
+    return markdown.Markdown(extensions=extensions, extension_configs=extension_configs).convert(text)
+
+
+def write_index_json (
+    groups: typing.Dict[str, list],
+    json_path: pathlib.Path,
+    ) -> None:
+    """
+Write the index entries as JSON, e.g., for other tools to use.
+
+    groups:
+index entries grouped by letter, as returned by `MentionIndex.get_groups()` with links relative to the JSON file
+
+    json_path:
+output file path
+    """
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    json_path.write_text(json.dumps(groups, ensure_ascii=False, separators=(",", ":",)), encoding="utf-8")
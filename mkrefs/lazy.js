@@ -0,0 +1,217 @@
+/*
+ * Loader for the lazy-loaded MkRefs reference pages, which fetches the
+ * JSON shard for each letter when its section scrolls into view, or
+ * when a link targets one of its entries.
+ *
+ * see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+ *
+ * The entries get rendered by `MkRefsLazy.renderers[component]`, which
+ * may be replaced to match a customized Jinja2 template.
+ */
+(function () {
+  "use strict";
+
+  var MD_LINK_PAT = /\[([^\]\n]*(?:\[[^\]\n]*\][^\]\n]*)*)\]\(([^)\s]*)\)/g;
+
+  function escape (text) {
+    return String(text === undefined || text === null ? "" : text)
+      .replace(/&/g, "&amp;")
+      .replace(/</g, "&lt;")
+      .replace(/>/g, "&gt;")
+      .replace(/"/g, "&quot;");
+  }
+
+  // convert Markdown inline links; other inline HTML gets kept, the same
+  // as in the Markdown rendering
+  function mdLinks (text) {
+    return String(text).replace(MD_LINK_PAT, function (match, label, url) {
+      return "<a href=\"" + escape(url) + "\">" + label + "</a>";
+    });
+  }
+
+  // the same anchors as the Markdown `toc` extension
+  function slugify (text) {
+    return String(text).normalize("NFKD").replace(/[^\x00-\x7f]/g, "")
+      .replace(/[^\w\s-]/g, "").trim().toLowerCase().replace(/[-\s]+/g, "-");
+  }
+
+  function value (item) {
+    return (item && typeof item === "object") ? item.value : item;
+  }
+
+  function renderGlossary (item) {
+    var out = [];
+
+    if (item.redirect) {
+      out.push("<h3 id=\"" + slugify(item.label) + "\">" + escape(item.label) + "</h3>");
+      out.push("<p>See also: <a href=\"" + escape(item.redirect_link) + "\">" + escape(item.redirect) + "</a></p>");
+      return out.join("\n");
+    }
+
+    out.push("<h3 id=\"" + slugify(item.prefLabel) + "\">" + escape(item.prefLabel) + "</h3>");
+    out.push("<blockquote><p>" + escape(item.definition) + "</p></blockquote>");
+
+    if (item.citeKey && item.citeKey.length) {
+      out.push("<p>Described in: " + item.citeKey.map(mdLinks).join(", ") + "</p>");
+    }
+
+    if (item.breadcrumbs && item.breadcrumbs.length) {
+      out.push("<p>Taxonomy: " + item.breadcrumbs.map(mdLinks).join(" › ") + " › <strong>" + escape(item.prefLabel) + "</strong></p>");
+    }
+
+    if (item.hypernym && item.hypernym.length > 1) {
+      out.push("<p>Broader:</p><ul>" + item.hypernym.map(function (hyp) {
+        return "<li>" + mdLinks(hyp) + "</li>";
+      }).join("") + "</ul>");
+    }
+
+    if (item.closeMatch && item.closeMatch.length > 1) {
+      out.push("<p>References:</p><ul>" + item.closeMatch.map(function (ref) {
+        return "<li><a href=\"" + escape(ref) + "\" target=\"_blank\">" + escape(ref) + "</a></li>";
+      }).join("") + "</ul>");
+    }
+
+    return out.join("\n");
+  }
+
+  function renderBiblio (item) {
+    var out = [];
+    var line = [];
+
+    out.push("<h3 id=\"" + slugify(item.citeKey) + "\">" + escape(item.citeKey) + "</h3>");
+
+    line.push("<a href=\"" + escape(item.id) + "\">\"" + escape(item.title) + "\"</a>");
+
+    line.push((item.authorList || []).map(function (auth) {
+      return "<a href=\"" + escape(auth.id) + "\"><strong>" + escape(auth.name) + "</strong></a>";
+    }).join(", "));
+
+    var pub = "";
+
+    if (item.isPartOf && item.isPartOf.length) {
+      var part = item.isPartOf[0];
+      pub += "<a href=\"" + escape(part.identifier && part.identifier.id) + "\"><em>" + escape(part.shortTitle) + "</em></a>";
+
+      if (item.volume) {
+        pub += " <strong>" + escape(value(item.volume)) + "</strong>";
+      }
+
+      if (item.issue) {
+        pub += " " + escape(value(item.issue));
+      }
+
+      if (item.pageStart) {
+        pub += " pp. " + escape(value(item.pageStart)) + "-" + escape(value(item.pageEnd));
+      }
+
+      pub += " ";
+    }
+
+    line.push(pub + "(" + escape(value(item.Date)) + ")");
+
+    if (item.doi) {
+      line.push("DOI: " + escape(value(item.doi)));
+    }
+
+    if (item.openAccess) {
+      line.push("open: <a href=\"" + escape(item.openAccess.id) + "\" target=\"_blank\">" + escape(item.openAccess.id) + "</a>");
+    }
+
+    out.push("<p>" + line.join("<br>\n") + "</p>");
+    out.push("<blockquote><p>" + escape(item.abstract) + "</p></blockquote>");
+
+    return out.join("\n");
+  }
+
+  var MkRefsLazy = window.MkRefsLazy || {};
+  MkRefsLazy.renderers = MkRefsLazy.renderers || {};
+  MkRefsLazy.renderers.glossary = MkRefsLazy.renderers.glossary || renderGlossary;
+  MkRefsLazy.renderers.biblio = MkRefsLazy.renderers.biblio || renderBiblio;
+  MkRefsLazy.mdLinks = mdLinks;
+  MkRefsLazy.slugify = slugify;
+  window.MkRefsLazy = MkRefsLazy;
+
+  function init (container) {
+    var component = container.getAttribute("data-component");
+    var src = container.getAttribute("data-src");
+    var letters = container.getAttribute("data-letters").split(",").filter(Boolean);
+    var sections = {};
+    var loading = {};
+
+    function load (letter) {
+      if (!(letter in sections)) {
+        return Promise.resolve();
+      }
+
+      if (!(letter in loading)) {
+        loading[letter] = fetch(src + encodeURIComponent(letter) + ".json").then(function (response) {
+          if (!response.ok) {
+            throw new Error("MkRefs: cannot load " + response.url);
+          }
+
+          return response.json();
+        }).then(function (items) {
+          var render = MkRefsLazy.renderers[component];
+          sections[letter].innerHTML = items.map(render).join("\n");
+        });
+      }
+
+      return loading[letter];
+    }
+
+    function showHash () {
+      var anchor = decodeURIComponent(window.location.hash.slice(1));
+
+      if (!anchor || document.getElementById(anchor)) {
+        return;
+      }
+
+      load(anchor[0].toLowerCase()).then(function () {
+        var target = document.getElementById(anchor);
+
+        if (target) {
+          target.scrollIntoView();
+        }
+      });
+    }
+
+    var nav = letters.map(function (letter) {
+      return "<a href=\"#mkrefs-" + escape(component) + "-" + escape(letter) + "\">" + escape(letter.toUpperCase()) + "</a>";
+    }).join(" · ");
+
+    var html = [ "<p class=\"mkrefs-lazy-nav\">" + nav + "</p>" ];
+
+    letters.forEach(function (letter) {
+      html.push("<h2 id=\"mkrefs-" + escape(component) + "-" + escape(letter) + "\">– " + escape(letter.toUpperCase()) + " –</h2>");
+      html.push("<div class=\"mkrefs-lazy-section\" data-letter=\"" + escape(letter) + "\"><p>…</p></div>");
+    });
+
+    container.innerHTML = html.join("\n");
+
+    Array.prototype.forEach.call(container.querySelectorAll(".mkrefs-lazy-section"), function (section) {
+      sections[section.getAttribute("data-letter")] = section;
+    });
+
+    if ("IntersectionObserver" in window) {
+      var observer = new IntersectionObserver(function (observed) {
+        observed.forEach(function (entry) {
+          if (entry.isIntersecting) {
+            observer.unobserve(entry.target);
+            load(entry.target.getAttribute("data-letter"));
+          }
+        });
+      }, { rootMargin: "200px" });
+
+      Object.keys(sections).forEach(function (letter) {
+        observer.observe(sections[letter]);
+      });
+    } else {
+      letters.forEach(load);
+    }
+
+    window.addEventListener("hashchange", showHash);
+    showHash();
+  }
+
+  Array.prototype.forEach.call(document.querySelectorAll(".mkrefs-lazy"), init);
+})();
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Lazy-loaded reference pages, where the page itself is a lightweight
+shell and the entries get fetched as per-letter JSON shards on demand,
+so that the initial page weight stays constant as the graph grows.
+The full Markdown rendering remains available as a separate page, which
+the shell links to as a fallback for browsers without JavaScript.
+"""
+
+import html
+import json
+import pathlib
+import re
+import shutil
+import typing
+
+from .records import EntryRecord
+
+
+LAZY_LOADER: str = "lazy.js"
+LAZY_DATA_DIR: str = "mkrefs_data"
+
+_TITLE_PAT = re.compile(r"^#\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+def get_fallback_page (
+    page: str,
+    ) -> str:
+    """
+Name the page for the full rendering of a lazy-loaded reference page,
+e.g., `glossary_full.md` for `glossary.md`
+
+    page:
+the reference page, relative to `docs_dir`
+
+    returns:
+the fallback page, relative to `docs_dir`
+    """
+    path = pathlib.PurePosixPath(page)
+
+    return str(path.with_name(f"{path.stem}_full{path.suffix}"))
+
+
+def write_fallback_page (
+    markdown_path: pathlib.Path,
+    fallback_path: pathlib.Path,
+    ) -> str:
+    """
+Copy the full Markdown rendering of a reference page to its fallback
+page.
+
+    markdown_path:
+file path for the rendered Markdown page
+
+    fallback_path:
+file path for the fallback page
+
+    returns:
+title of the page, from its first heading
+    """
+    shutil.copyfile(markdown_path, fallback_path)
+    match = _TITLE_PAT.search(markdown_path.read_text(encoding="utf-8"))
+
+    return match.group(1) if match else ""
+
+
+def render_lazy_shell (
+    component: str,
+    title: str,
+    letters: typing.List[str],
+    *,
+    data_url: str,
+    loader_url: str,
+    fallback_url: str,
+    ) -> str:
+    """
+Render the Markdown for the shell of a lazy-loaded reference page,
+which the loader script fills in with the entries for each letter when
+they get viewed or linked.
+
+    component:
+MkRefs plugin component, e.g. `"glossary"`
+
+    title:
+title of the page
+
+    letters:
+initial letters of the entries, one per JSON shard
+
+    data_url:
+URL of the directory of JSON shards, relative to the page
+
+    loader_url:
+URL of the loader script, relative to the page
+
+    fallback_url:
+URL of the full rendering of the page, relative to the page
+
+    returns:
+rendered Markdown
+    """
+    attrs = " ".join([
+        f'data-component="{html.escape(component)}"',
+        f'data-src="{html.escape(data_url)}"',
+        f'data-letters="{html.escape(",".join(letters))}"',
+        ])
+
+    return "\n".join([
+        f"# {title}",
+        "",
+        f'<div class="mkrefs-lazy" {attrs}>',
+        f'<noscript><p>This page loads its entries with JavaScript; see the <a href="{html.escape(fallback_url)}">full page</a> instead.</p></noscript>',
+        "</div>",
+        f'<script src="{html.escape(loader_url)}" defer></script>',
+        "",
+        ])
+
+
+def write_lazy_shards (
+    groups: typing.Dict[str, list],
+    site_dir: pathlib.Path,
+    component: str,
+    ) -> None:
+    """
+Write the entries of a reference page as one JSON shard per letter,
+along with the loader script.
+
+    groups:
+entries grouped by letter, as returned by the component's render function
+
+    site_dir:
+the MkDocs `site_dir` directory
+
+    component:
+MkRefs plugin component, which names the directory for its shards
+    """
+    data_path = site_dir / LAZY_DATA_DIR / component
+    data_path.mkdir(parents=True, exist_ok=True)
+
+    for stale_path in data_path.glob("*.json"):
+        if stale_path.stem not in groups:
+            stale_path.unlink()
+
+    for letter, item_list in groups.items():
+        data = json.dumps(item_list, default=EntryRecord.to_dict, ensure_ascii=False, separators=(",", ":",))
+        (data_path / f"{letter}.json").write_text(data, encoding="utf-8")
+
+    shutil.copyfile(pathlib.Path(__file__).parent / LAZY_LOADER, site_dir / LAZY_DATA_DIR / LAZY_LOADER)
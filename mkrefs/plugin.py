@@ -11,6 +11,7 @@ https://github.com/DerwenAI/mkrefs
 
 from collections import defaultdict
 from pprint import pprint  # pylint: disable=W0611
+import concurrent.futures
 import pathlib
 import sys
 import typing
@@ -20,18 +21,45 @@ import mkdocs.plugins  # type: ignore  # pylint: disable=E0401
 import mkdocs.structure.files  # type: ignore  # pylint: disable=E0401
 import mkdocs.structure.nav  # type: ignore  # pylint: disable=E0401
 import mkdocs.structure.pages  # type: ignore  # pylint: disable=E0401
+import mkdocs.utils  # type: ignore  # pylint: disable=E0401
 
 import jinja2
 import livereload  # type: ignore  # pylint: disable=E0401
 import yaml
 
-from .apidocs import render_apidocs
+from .apidocs import get_apidocs_configs, render_apidocs_list
+from .autolink import TermMatcher, autolink_markdown, get_term_matcher
 from .biblio import render_biblio
-from .glossary import render_glossary
-from .util import load_kg
+from .cite import get_citekey_index, render_citation_list, resolve_citations
+from .depend import render_depend
+from .glossary import GlossaryQueries, get_glossary_terms, get_shard_pages, render_glossary, render_glossary_variants
+from .index import MentionIndex, get_apidocs_index_entities, get_biblio_index_entities, get_glossary_index_entities, \
+    render_index_markdown, write_index_json
+from .lazy import LAZY_DATA_DIR, LAZY_LOADER, get_fallback_page, render_lazy_shell, write_fallback_page, write_lazy_shards
+from .prerender import get_heading_toc, get_html_toc, get_stub_markdown, render_html_page, set_page_html
+from .registry import get_kg
+from .search import build_search_index, filter_search_index, get_apidocs_search_entries, \
+    get_biblio_search_entries, get_glossary_search_entries, get_toc_anchors, write_search_index
+from .util import extend_nav, get_graph_paths, get_store_path
+from .validate import validate_graphs
+
+
+def _late_event (
+    method: typing.Callable,
+    ) -> typing.Callable:
+    """
+Run a plugin event handler after those of the other plugins, e.g., so
+that the `search` plugin has already written its index, on MkDocs
+versions which support event priorities.
+    """
+    if hasattr(mkdocs.plugins, "event_priority"):
+        return mkdocs.plugins.event_priority(-100)(method)
+
+    return method
 
 
-class MkRefsPlugin (mkdocs.plugins.BasePlugin):
+# the plugin keeps the state of each component between the build events
+class MkRefsPlugin (mkdocs.plugins.BasePlugin):  # pylint: disable=R0902
     """
 MkDocs plugin for semantic reference pages, partly constructed from an
 input knowledge graph, and partly by parsing code and dependencies to
@@ -46,6 +74,12 @@ construct portions of a knowledge graph.
             "includes": "class and function names to include",
             },
 
+        "depend": {
+            "page": "the generated Markdown page; e.g., `depend.md`",
+            "template": "a Jinja2 template; e.g., `depend.jinja`",
+            "package": "the Python package name",
+            },
+
         "glossary": {
             "graph": "an RDF graph in Turtle (TTL) format; e.g., `mkrefs.ttl`",
             "page": "the generated Markdown page; e.g., `glossary.md`",
@@ -59,6 +93,15 @@ construct portions of a knowledge graph.
             "template": "a Jinja2 template; e.g., `biblio.jinja`",
             "queries": "a list of SPARQL queries to extract [author, publisher, entry] entities",
             },
+
+        "index": {
+            "page": "the generated Markdown page; e.g., `xref.md`",
+            "template": "a Jinja2 template; e.g., `xref.jinja`",
+            },
+
+        "search": {
+            "dir": "the output directory for the search index, within `site_dir`; e.g., `mkrefs_search`",
+            },
         }
 
     config_scheme = (
@@ -71,13 +114,42 @@ construct portions of a knowledge graph.
         self.local_config: dict = defaultdict()
 
         self.apidocs_used = False
-        self.apidocs_file = None
+        self.apidocs_files: dict = {}
+        self.apidocs_class_files: dict = {}
+
+        self.depend_used = False
+        self.depend_file = None
 
         self.glossary_kg = None
         self.glossary_file = None
+        self.glossary_shard_files: list = []
+        self.glossary_variant_files: list = []
+        self.glossary_future: typing.Optional[concurrent.futures.Future] = None
+        self.glossary_matcher: typing.Optional[TermMatcher] = None
+        self.glossary_targets: typing.List[str] = []
 
         self.biblio_kg = None
         self.biblio_file = None
+        self.biblio_index: typing.Optional[typing.Dict[str, typing.Tuple[str, str]]] = None
+        self.biblio_future: typing.Optional[concurrent.futures.Future] = None
+
+        self.html_pages: typing.Dict[str, typing.Tuple[str, typing.List[dict], str]] = {}
+        self.lazy_pages: typing.Dict[str, dict] = {}
+        self.lazy_fallbacks: typing.Dict[str, str] = {}
+
+        self.index_used = False
+        self.index_file = None
+        self.index_entities: typing.List[dict] = []
+        self.index_mentions: typing.Optional[MentionIndex] = None
+        self.index_pages: typing.Dict[str, mkdocs.structure.pages.Page] = {}
+        self.index_groups: typing.Dict[str, list] = {}
+
+        self.search_dir: typing.Optional[str] = None
+        self.search_entries: typing.List[dict] = []
+
+        # heading anchors of the reference pages, for the search index
+        # and the site index
+        self.page_anchors: typing.Dict[str, typing.Dict[str, str]] = {}
 
 
     def _valid_component_config (
@@ -99,16 +171,242 @@ MkRefs plugin component, e.g. `["biblio", "glossary", "apidocs", "depend", "inde
 boolean flag, for whether the component is configured properly
         """
         if component in self.local_config:
-            for param, message in self._LOCAL_CONFIG_KEYS[component].items():
-                if param not in self.local_config[component]:
-                    print(f"ERROR: `{yaml_path}` is missing the `{component}:{param}` parameter, which should be {message}")
-                    sys.exit(-1)
+            entries = self.local_config[component]
+
+            # some components accept a list of entries
+            if not isinstance(entries, list):
+                entries = [ entries ]
+
+            for entry in entries:
+                for param, message in self._LOCAL_CONFIG_KEYS[component].items():
+                    if param not in entry:
+                        print(f"ERROR: `{yaml_path}` is missing the `{component}:{param}` parameter, which should be {message}")
+                        sys.exit(-1)
 
             return True
 
         return False
 
 
+    def _join_graphs (
+        self,
+        ) -> None:
+        """
+Semiprivate helper method to wait for the graphs which `on_config`
+started loading in the background.
+        """
+        try:
+            if self.glossary_future is not None:
+                self.glossary_kg = self.glossary_future.result()
+                self.glossary_future = None
+
+            if self.biblio_future is not None:
+                self.biblio_kg = self.biblio_future.result()
+                self.biblio_future = None
+        except Exception as e:  # pylint: disable=W0703
+            print(f"ERROR loading graph: {e}")
+            sys.exit(-1)
+
+
+    def _get_index_groups (
+        self,
+        mentions: MentionIndex,
+        base_url: str,
+        ) -> typing.Dict[str, list]:
+        """
+Semiprivate helper method to group the index entries, once all of the
+pages have been scanned.
+
+    mentions:
+the mentions of the index entities, collected from the pages
+
+    base_url:
+site URL which the links are relative to, e.g., of the index page
+
+    returns:
+index entries grouped by letter, as returned by `MentionIndex.get_groups()`
+        """
+        page_urls = {
+            file.src_path.replace("\\", "/"): file.url
+            for file in self._reference_files()
+            }
+
+        page_urls.update({ page_path: scanned.url for page_path, scanned in self.index_pages.items() })
+        page_titles = { page_path: scanned.title for page_path, scanned in self.index_pages.items() }
+
+        return mentions.get_groups(base_url, page_urls, page_titles, self.page_anchors)
+
+
+    def _validate_graphs (
+        self,
+        queries: typing.Optional[GlossaryQueries],
+        ) -> None:
+        """
+Semiprivate helper method to check the invariants of the glossary and
+bibliography graphs, which stops the build on any error, e.g., a
+dangling reference or a duplicate citekey.
+
+    queries:
+results of the glossary queries, or `None` when the glossary is not used
+        """
+        if not self.glossary_kg and not self.biblio_kg:
+            return
+
+        try:
+            issues = validate_graphs(self.local_config, self.glossary_kg, self.biblio_kg, queries)
+        except Exception as e:  # pylint: disable=W0703
+            print(f"ERROR validating graph: {e}")
+            sys.exit(-1)
+
+        for level, message in issues:
+            print(f"{level}: {message}")
+
+        if any(level == "ERROR" for level, _ in issues):
+            sys.exit(-1)
+
+
+    def _prerender (
+        self,
+        component: str,
+        component_config: dict,
+        page: str,
+        groups: typing.Dict[str, typing.Any],
+        docs_dir: pathlib.Path,
+        ) -> None:
+        """
+Semiprivate helper method to render the HTML for a reference page, when
+its component has an `html_template` parameter, so that the page can
+bypass the Markdown conversion of MkDocs.
+
+    component:
+MkRefs plugin component, e.g. `"glossary"`
+
+    component_config:
+local configuration for the component
+
+    page:
+the reference page, relative to `docs_dir`
+
+    groups:
+data used to render the page
+
+    docs_dir:
+base directory for the templates
+        """
+        html_template = component_config.get("html_template")
+
+        if not html_template:
+            return
+
+        # links between the generated pages get resolved by MkDocs only
+        # when it converts their Markdown
+        if component_config.get("shard") or component_config.get("split"):
+            print(f"WARNING: the `{component}:html_template` parameter does not apply to sharded or split pages")
+            return
+
+        try:
+            page_html = render_html_page(docs_dir / html_template, groups)
+            self.html_pages[page.replace("\\", "/")] = get_html_toc(page_html)
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering HTML for {component}: {e}")
+            sys.exit(-1)
+
+
+    def _add_lazy_page (
+        self,
+        component: str,
+        page_file: mkdocs.structure.files.File,
+        groups: typing.Dict[str, list],
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> str:
+        """
+Semiprivate helper method to turn a reference page into the shell of a
+lazy-loaded page, when its component has the `lazy` parameter set, and
+add a fallback page with its full rendering.
+
+    component:
+MkRefs plugin component, e.g. `"glossary"`
+
+    page_file:
+generated file for the reference page
+
+    groups:
+entries grouped by letter, as returned by the component's render function
+
+    files:
+global files collection
+
+    config:
+global configuration object
+
+    returns:
+the page which gets the full rendering, relative to `docs_dir`
+        """
+        component_config = self.local_config[component]
+        page_path = page_file.src_path.replace("\\", "/")
+
+        if not component_config.get("lazy"):
+            return page_path
+
+        if component_config.get("shard"):
+            print(f"WARNING: the `{component}:lazy` parameter does not apply to sharded pages")
+            return page_path
+
+        fallback_path = get_fallback_page(page_path)
+        docs_dir = pathlib.Path(config["docs_dir"])
+
+        try:
+            title = write_fallback_page(docs_dir / page_path, docs_dir / fallback_path)
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error writing the fallback page for {component}: {e}")
+            sys.exit(-1)
+
+        fallback_file = self._add_file(fallback_path, files, config)
+
+        self.lazy_pages[page_path] = {
+            "component": component,
+            "groups": groups,
+            "title": title,
+            "fallback": fallback_file,
+        }
+
+        self.lazy_fallbacks[fallback_path] = page_path
+
+        return fallback_path
+
+
+    def _reference_files (
+        self,
+        ) -> typing.List[mkdocs.structure.files.File]:
+        """
+Semiprivate helper method to list the files for the reference pages
+which MkRefs generates in the current build.
+        """
+        ref_files: typing.List[mkdocs.structure.files.File] = list(self.apidocs_files.values())
+
+        for class_files in self.apidocs_class_files.values():
+            ref_files.extend(class_files)
+
+        if self.depend_used:
+            ref_files.append(self.depend_file)
+
+        if self.glossary_kg:
+            ref_files.append(self.glossary_file)
+            ref_files.extend(self.glossary_shard_files)
+            ref_files.extend(self.glossary_variant_files)
+
+        if self.biblio_kg:
+            ref_files.append(self.biblio_file)
+
+        if self.index_used:
+            ref_files.append(self.index_file)
+
+        ref_files.extend(lazy_page["fallback"] for lazy_page in self.lazy_pages.values())
+
+        return ref_files
+
+
     def on_config (  # pylint: disable=W0613
         self,
         config: config_options.Config,
@@ -138,24 +436,44 @@ the possibly modified global configuration object
         yaml_path = pathlib.Path(config["docs_dir"]) / config["mkrefs_config"]
 
         try:
-            with open(yaml_path, "r") as f:
+            with open(yaml_path, "r", encoding="utf-8") as f:
                 self.local_config = yaml.safe_load(f)
                 #print(self.local_config)
         except Exception as e:  # pylint: disable=W0703
             print(f"ERROR loading local config: {e}")
             sys.exit(-1)
 
-        reuse_graph_path = None
+        # load the graphs in the background, overlapping with the rest
+        # of the MkDocs startup, then join them in `on_files`; the
+        # threads mostly wait on the worker processes which parse the
+        # files, since parsing holds the GIL; the registry shares parsed
+        # graphs across components, and across the rebuilds of `mkdocs
+        # serve` while the files are unchanged
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+        self.glossary_kg = None
+        self.glossary_future = None
+        self.glossary_matcher = None
+        self.biblio_kg = None
+        self.biblio_future = None
+        self.biblio_index = None
+        self.search_dir = None
+
+        if self._valid_component_config(yaml_path, "search"):
+            self.search_dir = self.local_config["search"]["dir"]
 
         if self._valid_component_config(yaml_path, "apidocs"):
             self.apidocs_used = True
 
+        self.depend_used = self._valid_component_config(yaml_path, "depend")
+        self.index_used = self._valid_component_config(yaml_path, "index")
+
         if self._valid_component_config(yaml_path, "glossary"):
             # load the KG for the glossary
             try:
-                graph_path = pathlib.Path(config["docs_dir"]) / self.local_config["glossary"]["graph"]
-                reuse_graph_path = graph_path
-                self.glossary_kg = load_kg(graph_path)
+                graph_paths = get_graph_paths(self.local_config, "glossary", pathlib.Path(config["docs_dir"]))
+                store_path = get_store_path(self.local_config, "glossary", pathlib.Path(config["docs_dir"]))
+                self.glossary_future = executor.submit(get_kg, graph_paths, store_path)
             except Exception as e:  # pylint: disable=W0703
                 print(f"ERROR loading graph: {e}")
                 sys.exit(-1)
@@ -163,19 +481,289 @@ the possibly modified global configuration object
         if self._valid_component_config(yaml_path, "biblio"):
             # load the KG for the bibliography
             try:
-                graph_path = pathlib.Path(config["docs_dir"]) / self.local_config["biblio"]["graph"]
-
-                if graph_path == reuse_graph_path:
-                    self.biblio_kg = self.glossary_kg
-                else:
-                    self.biblio_kg = load_kg(graph_path)
+                graph_paths = get_graph_paths(self.local_config, "biblio", pathlib.Path(config["docs_dir"]))
+                store_path = get_store_path(self.local_config, "biblio", pathlib.Path(config["docs_dir"]))
+                self.biblio_future = executor.submit(get_kg, graph_paths, store_path)
             except Exception as e:  # pylint: disable=W0703
                 print(f"ERROR loading graph: {e}")
                 sys.exit(-1)
 
+        # the submitted loads still run to completion
+        executor.shutdown(wait=False)
+
         return config
 
 
+    def _add_file (
+        self,
+        path: str,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> mkdocs.structure.files.File:
+        """
+Semiprivate helper method to add a generated page to the files
+collection, replacing the file which MkDocs already collected for it
+from a previous build.
+
+    path:
+the generated page, relative to `docs_dir`
+
+    files:
+global files collection
+
+    config:
+global configuration object
+
+    returns:
+the file for the generated page
+        """
+        page_file = mkdocs.structure.files.File(
+            path = path,
+            src_dir = config["docs_dir"],
+            dest_dir = config["site_dir"],
+            use_directory_urls = config["use_directory_urls"],
+            )
+
+        existing = files.get_file_from_path(page_file.src_path)
+
+        if existing is not None:
+            files.remove(existing)
+
+        files.append(page_file)
+
+        return page_file
+
+
+    def _remove_stale_files (
+        self,
+        page_dir: str,
+        files: mkdocs.structure.files.Files,
+        ) -> None:
+        """
+Semiprivate helper method to remove the files which MkDocs collected
+for generated pages that rendering has since removed, e.g., the pages
+for deleted classes.
+
+    page_dir:
+directory of the generated pages, relative to `docs_dir`
+
+    files:
+global files collection
+        """
+        page_dir = page_dir.replace("\\", "/")
+
+        for stale_file in list(files):
+            src_path = pathlib.PurePosixPath(stale_file.src_path.replace("\\", "/"))
+
+            if str(src_path.parent) == page_dir and stale_file.abs_src_path and not pathlib.Path(stale_file.abs_src_path).exists():
+                files.remove(stale_file)
+
+
+    def _render_apidocs_files (
+        self,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> None:
+        """
+Semiprivate helper method to render the apidocs pages, and add them to
+the files collection.
+
+    files:
+global files collection
+
+    config:
+global configuration object
+        """
+        try:
+            apidocs_groups = render_apidocs_list(self.local_config, pathlib.Path(config["docs_dir"]))
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering apidocs: {e}")
+            sys.exit(-1)
+
+        for page, groups in apidocs_groups.items():
+            self.apidocs_files[page] = self._add_file(page, files, config)
+
+            # add the per-class pages, if split
+            self.apidocs_class_files[page] = [
+                self._add_file(str(pathlib.Path(page).parent / class_page), files, config)
+                for _, _, class_page in groups.get("pages", [])
+                ]
+
+            # MkDocs already collected the pages for any deleted or
+            # renamed classes, before rendering removed them
+            self._remove_stale_files(str(pathlib.Path(page).with_suffix("")), files)
+
+            if self.search_dir is not None:
+                self.search_entries.extend(get_apidocs_search_entries(page, groups))
+
+            if self.index_used:
+                self.index_entities.extend(get_apidocs_index_entities(page, groups))
+
+            page_config = next(entry for entry in get_apidocs_configs(self.local_config) if entry["page"] == page)
+            self._prerender("apidocs", page_config, page, groups, pathlib.Path(config["docs_dir"]))
+
+
+    def _render_depend_file (
+        self,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> None:
+        """
+Semiprivate helper method to render the dependencies page, and add it
+to the files collection.
+
+    files:
+global files collection
+
+    config:
+global configuration object
+        """
+        try:
+            depend_groups = render_depend(self.local_config, pathlib.Path(config["docs_dir"]))
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering depend: {e}")
+            sys.exit(-1)
+
+        self.depend_file = self._add_file(self.local_config["depend"]["page"], files, config)
+        self._prerender("depend", self.local_config["depend"], self.depend_file.src_path, depend_groups, pathlib.Path(config["docs_dir"]))
+
+
+    def _render_glossary_files (
+        self,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        queries: typing.Optional[GlossaryQueries],
+        ) -> None:
+        """
+Semiprivate helper method to render the glossary pages, including any
+scoped, per-language, and per-letter pages, and add them to the files
+collection.
+
+    files:
+global files collection
+
+    config:
+global configuration object
+
+    queries:
+results of the glossary queries, shared with the validation
+        """
+        self.glossary_file = self._add_file(self.local_config["glossary"]["page"], files, config)
+
+        template_path = pathlib.Path(config["docs_dir"]) / self.local_config["glossary"]["template"]
+        markdown_path = pathlib.Path(config["docs_dir"]) / self.glossary_file.src_path
+
+        try:
+            glossary_groups = render_glossary(self.local_config, self.glossary_kg, template_path, markdown_path, queries)
+            variant_groups = render_glossary_variants(self.local_config, self.glossary_kg, pathlib.Path(config["docs_dir"]), queries)
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering glossary: {e}")
+            sys.exit(-1)
+
+        # add the scoped and per-language glossary pages
+        self.glossary_variant_files = [
+            self._add_file(variant_page, files, config)
+            for variant_page in variant_groups
+            ]
+
+        # add the per-letter pages, if sharded
+        self.glossary_shard_files = []
+
+        if self.local_config["glossary"].get("shard"):
+            self.glossary_shard_files = [
+                self._add_file(str(pathlib.Path(self.glossary_file.src_path).parent / shard_page), files, config)
+                for _, shard_page in get_shard_pages(self.glossary_file.src_path, glossary_groups.keys())
+                ]
+
+            # MkDocs already collected the pages for any letters which no
+            # longer have entries, before rendering removed them
+            self._remove_stale_files(str(pathlib.Path(self.glossary_file.src_path).with_suffix("")), files)
+
+        # prepare to link the glossary terms mentioned on other pages
+        self.glossary_matcher = None
+
+        if self.local_config["glossary"].get("autolink"):
+            terms, self.glossary_targets = get_glossary_terms(self.local_config, glossary_groups)
+            self.glossary_matcher = get_term_matcher(terms)
+
+        if self.search_dir is not None:
+            self.search_entries.extend(get_glossary_search_entries(self.local_config, glossary_groups))
+
+        if self.index_used:
+            self.index_entities.extend(get_glossary_index_entities(self.local_config, glossary_groups))
+
+        full_page = self._add_lazy_page("glossary", self.glossary_file, glossary_groups, files, config)
+        self._prerender("glossary", self.local_config["glossary"], full_page, glossary_groups, pathlib.Path(config["docs_dir"]))
+
+
+    def _render_biblio_file (
+        self,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> None:
+        """
+Semiprivate helper method to render the bibliography page, and add it
+to the files collection.
+
+    files:
+global files collection
+
+    config:
+global configuration object
+        """
+        self.biblio_file = self._add_file(self.local_config["biblio"]["page"], files, config)
+
+        template_path = pathlib.Path(config["docs_dir"]) / self.local_config["biblio"]["template"]
+        markdown_path = pathlib.Path(config["docs_dir"]) / self.biblio_file.src_path
+
+        try:
+            biblio_groups = render_biblio(self.local_config, self.biblio_kg, template_path, markdown_path)
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering bibliography: {e}")
+            sys.exit(-1)
+
+        # prepare to resolve the citation markers on other pages
+        if self.local_config["biblio"].get("cite"):
+            self.biblio_index = get_citekey_index(self.local_config, biblio_groups)
+
+        if self.search_dir is not None:
+            self.search_entries.extend(get_biblio_search_entries(self.local_config, biblio_groups))
+
+        if self.index_used:
+            self.index_entities.extend(get_biblio_index_entities(self.local_config, biblio_groups))
+
+        full_page = self._add_lazy_page("biblio", self.biblio_file, biblio_groups, files, config)
+        self._prerender("biblio", self.local_config["biblio"], full_page, biblio_groups, pathlib.Path(config["docs_dir"]))
+
+
+    def _render_index_file (
+        self,
+        files: mkdocs.structure.files.Files,
+        config: config_options.Config,
+        ) -> None:
+        """
+Semiprivate helper method to add the index page to the files
+collection, which gets rendered once all of the other pages have been
+scanned, so for now its page only has a title.
+
+    files:
+global files collection
+
+    config:
+global configuration object
+        """
+        self.index_file = self._add_file(self.local_config["index"]["page"], files, config)
+
+        try:
+            markdown_path = pathlib.Path(config["docs_dir"]) / self.index_file.src_path
+            markdown_path.write_text(get_stub_markdown(self.local_config["index"].get("title", "Index")), encoding="utf-8")
+        except Exception as e:  # pylint: disable=W0703
+            print(f"Error rendering index: {e}")
+            sys.exit(-1)
+
+        self.index_mentions = MentionIndex(self.index_entities)
+
+
     def on_files (  # pylint: disable=W0613
         self,
         files: mkdocs.structure.files.Files,
@@ -200,62 +788,37 @@ the default global configuration object
     returns:
 the possibly modified global files collection
         """
-        if self.apidocs_used and self.local_config["apidocs"]["page"]:
-            self.apidocs_file = mkdocs.structure.files.File(
-                path = self.local_config["apidocs"]["page"],
-                src_dir = config["docs_dir"],
-                dest_dir = config["site_dir"],
-                use_directory_urls = config["use_directory_urls"],
-                )
+        self.search_entries = []
+        self.page_anchors = {}
+        self.index_entities = []
+        self.index_mentions = None
+        self.index_pages = {}
+        self.index_groups = {}
+        self.html_pages = {}
+        self.lazy_pages = {}
+        self.lazy_fallbacks = {}
 
-            files.append(self.apidocs_file)
+        # check the graphs before rendering any of the pages, sharing
+        # the results of the glossary queries with its rendering
+        self._join_graphs()
 
-            template_path = pathlib.Path(config["docs_dir"]) / self.local_config["apidocs"]["template"]
-            markdown_path = pathlib.Path(config["docs_dir"]) / self.apidocs_file.src_path
+        queries = GlossaryQueries(self.local_config, self.glossary_kg) if self.glossary_kg else None
+        self._validate_graphs(queries)
 
-            try:
-                _ = render_apidocs(self.local_config, template_path, markdown_path)
-            except Exception as e:  # pylint: disable=W0703
-                print(f"Error rendering apidocs: {e}")
-                sys.exit(-1)
+        if self.apidocs_used:
+            self._render_apidocs_files(files, config)
 
-        if self.glossary_kg:
-            self.glossary_file = mkdocs.structure.files.File(
-                path = self.local_config["glossary"]["page"],
-                src_dir = config["docs_dir"],
-                dest_dir = config["site_dir"],
-                use_directory_urls = config["use_directory_urls"],
-                )
-
-            files.append(self.glossary_file)
-
-            template_path = pathlib.Path(config["docs_dir"]) / self.local_config["glossary"]["template"]
-            markdown_path = pathlib.Path(config["docs_dir"]) / self.glossary_file.src_path
+        if self.depend_used:
+            self._render_depend_file(files, config)
 
-            try:
-                _ = render_glossary(self.local_config, self.glossary_kg, template_path, markdown_path)
-            except Exception as e:  # pylint: disable=W0703
-                print(f"Error rendering glossary: {e}")
-                sys.exit(-1)
+        if self.glossary_kg:
+            self._render_glossary_files(files, config, queries)
 
         if self.biblio_kg:
-            self.biblio_file = mkdocs.structure.files.File(
-                path = self.local_config["biblio"]["page"],
-                src_dir = config["docs_dir"],
-                dest_dir = config["site_dir"],
-                use_directory_urls = config["use_directory_urls"],
-                )
-
-            files.append(self.biblio_file)
-
-            template_path = pathlib.Path(config["docs_dir"]) / self.local_config["biblio"]["template"]
-            markdown_path = pathlib.Path(config["docs_dir"]) / self.biblio_file.src_path
+            self._render_biblio_file(files, config)
 
-            try:
-                _ = render_biblio(self.local_config, self.biblio_kg, template_path, markdown_path)
-            except Exception as e:  # pylint: disable=W0703
-                print(f"Error rendering bibliography: {e}")
-                sys.exit(-1)
+        if self.index_used:
+            self._render_index_file(files, config)
 
         return files
 
@@ -281,7 +844,7 @@ global configuration object
         return
 
 
-    def on_nav (  # pylint: disable=R0201,W0613
+    def on_nav (  # pylint: disable=W0613
         self,
         nav: mkdocs.structure.nav.Navigation,
         config: config_options.Config,
@@ -308,6 +871,13 @@ the possibly modified global navigation object
         """
         #print("on_nav")
         #pprint(vars(nav))
+
+        for page, class_files in self.apidocs_class_files.items():
+            nav = extend_nav(nav, self.apidocs_files[page], class_files)
+
+        if self.glossary_shard_files:
+            nav = extend_nav(nav, self.glossary_file, self.glossary_shard_files)
+
         return nav
 
 
@@ -341,6 +911,7 @@ the possibly modified global Jinja environment
         return env
 
 
+    @_late_event
     def on_post_build (  # pylint: disable=R0201,W0613
         self,
         config: config_options.Config,
@@ -355,7 +926,37 @@ Use this event to call post-build scripts.
     config:
 global configuration object
         """
-        return
+        for lazy_page in self.lazy_pages.values():
+            try:
+                write_lazy_shards(lazy_page["groups"], pathlib.Path(config["site_dir"]), lazy_page["component"])
+            except Exception as e:  # pylint: disable=W0703
+                print(f"Error writing the data for {lazy_page['component']}: {e}")
+                sys.exit(-1)
+
+        if self.search_dir is not None:
+            page_urls = {
+                file.src_path.replace("\\", "/"): file.url
+                for file in self._reference_files()
+                }
+
+            site_dir = pathlib.Path(config["site_dir"])
+
+            try:
+                shards = build_search_index(self.search_entries, page_urls, self.page_anchors)
+                write_search_index(shards, site_dir, self.search_dir)
+                filter_search_index(site_dir / "search" / "search_index.json", page_urls.values())
+            except Exception as e:  # pylint: disable=W0703
+                print(f"Error writing search index: {e}")
+                sys.exit(-1)
+
+        if self.index_mentions is not None and self.local_config["index"].get("json"):
+            json_page = self.local_config["index"]["json"].replace("\\", "/")
+
+            try:
+                write_index_json(self._get_index_groups(self.index_mentions, json_page), pathlib.Path(config["site_dir"]) / json_page)
+            except Exception as e:  # pylint: disable=W0703
+                print(f"Error writing the index data: {e}")
+                sys.exit(-1)
 
 
     def on_pre_template (  # pylint: disable=R0201,W0613
@@ -495,6 +1096,25 @@ global configuration object
     returns:
 The raw source for a page as unicode string; if `None` is returned, the default loading from a file will be performed.
         """
+        page_path = page.file.src_path.replace("\\", "/")
+
+        if page_path in self.lazy_pages:
+            lazy_page = self.lazy_pages[page_path]
+
+            return render_lazy_shell(
+                lazy_page["component"],
+                lazy_page["title"],
+                list(lazy_page["groups"].keys()),
+                data_url=mkdocs.utils.get_relative_url(f"{LAZY_DATA_DIR}/{lazy_page['component']}/", page.url),
+                loader_url=mkdocs.utils.get_relative_url(f"{LAZY_DATA_DIR}/{LAZY_LOADER}", page.url),
+                fallback_url=mkdocs.utils.get_relative_url(lazy_page["fallback"].url, page.url),
+                )
+
+        if page_path in self.html_pages:
+            # a pre-rendered page only needs its title parsed
+            _, _, title = self.html_pages[page_path]
+            return get_stub_markdown(title)
+
         return None
 
 
@@ -529,6 +1149,37 @@ file list
     returns:
 the possibly modified Markdown source text of this page, as a string
 """
+        page_path = page.file.src_path.replace("\\", "/")
+
+        # the fallback of a lazy-loaded page counts as the page itself
+        main_path = self.lazy_fallbacks.get(page_path, page_path)
+
+        if self.index_mentions is not None and page.file.src_path not in [ file.src_path for file in self._reference_files() ]:
+            # scan the page as written, before any links get added
+            self.index_mentions.scan(page_path, markdown)
+            self.index_pages[page_path] = page
+
+        if self.search_dir is not None and page.file.src_path in [ file.src_path for file in self._reference_files() ]:
+            # the MkRefs search index covers the entities on this page
+            page.meta["search"] = { "exclude": True }
+
+        if self.biblio_index is not None and main_path != self.biblio_file.src_path:
+            markdown, cited, unknown = resolve_citations(markdown, self.biblio_index, page_path)
+
+            for citekey in unknown:
+                print(f"WARNING: `{page_path}` cites an unknown citekey `{citekey}`")
+
+            heading = self.local_config["biblio"].get("cite_heading", "References")
+
+            if cited and heading:
+                markdown += render_citation_list(cited, self.biblio_index, page_path, heading)
+
+        if self.glossary_matcher is not None:
+            glossary_pages = [ self.glossary_file ] + self.glossary_shard_files + self.glossary_variant_files
+
+            if main_path not in [ file.src_path for file in glossary_pages ]:
+                markdown = autolink_markdown(markdown, self.glossary_matcher, self.glossary_targets, page_path)
+
         return markdown
 
 
@@ -562,6 +1213,19 @@ global files collection
     returns:
 the possibly modified HTML rendered from Markdown source, as string
         """
+        page_path = page.file.src_path.replace("\\", "/")
+
+        if page_path in self.html_pages:
+            html, toc_tokens, _ = self.html_pages[page_path]
+            set_page_html(page, html, toc_tokens)
+
+        if (self.search_dir is not None or self.index_used) and page.file.src_path in [ file.src_path for file in self._reference_files() ]:
+            # the entries of a lazy-loaded page have the same anchors as
+            # on its fallback page; all of the headings count, including
+            # those deeper than `toc_depth`
+            if page_path not in self.lazy_pages:
+                self.page_anchors[self.lazy_fallbacks.get(page_path, page_path)] = get_toc_anchors(get_heading_toc(html))
+
         return html
 
 
@@ -595,6 +1259,39 @@ global navigation object
     returns:
 the possibly modified template context variables, as a dict
         """
+        page_path = page.file.src_path.replace("\\", "/")
+
+        if page_path in self.lazy_pages:
+            # the shell of a lazy-loaded page gets its entries, and their
+            # anchors, from the fallback page
+            fallback_page = self.lazy_pages[page_path]["fallback"].page
+
+            if fallback_page is not None and fallback_page.present_anchor_ids is not None:
+                page.present_anchor_ids = (page.present_anchor_ids or set()) | fallback_page.present_anchor_ids
+
+        if self.index_mentions is not None and page.file.src_path == self.index_file.src_path:
+            # by now MkDocs has converted the Markdown for all of the pages
+            try:
+                self.index_groups = self._get_index_groups(self.index_mentions, page.url)
+                docs_dir = pathlib.Path(config["docs_dir"])
+                html_template = self.local_config["index"].get("html_template")
+
+                if html_template:
+                    page_html = render_html_page(docs_dir / html_template, self.index_groups)
+                else:
+                    page_html = render_index_markdown(
+                        docs_dir / self.local_config["index"]["template"],
+                        self.index_groups,
+                        config["markdown_extensions"],
+                        config["mdx_configs"],
+                        )
+
+                page.content, toc_tokens, _ = get_html_toc(page_html)
+                set_page_html(page, page.content, toc_tokens)
+            except Exception as e:  # pylint: disable=W0703
+                print(f"Error rendering index: {e}")
+                sys.exit(-1)
+
         return context
 
 
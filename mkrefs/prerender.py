@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Pre-rendered HTML for the generated reference pages, which bypasses the
+Markdown conversion of MkDocs: a Jinja2 template renders the HTML
+directly, then one scan of its headings yields the table of contents.
+"""
+
+import html
+import re
+import typing
+
+import jinja2
+import markdown  # type: ignore  # pylint: disable=E0401
+from markdown.extensions.toc import slugify, unique  # type: ignore  # pylint: disable=E0401
+import markupsafe
+import mkdocs.structure.pages  # type: ignore  # pylint: disable=E0401
+import mkdocs.structure.toc  # type: ignore  # pylint: disable=E0401
+import pathlib
+
+
+_HEADING_PAT = re.compile(r"<h([1-6])(\s[^>]*)?>(.*?)</h\1>", re.DOTALL | re.IGNORECASE)
+_HEADING_ID_PAT = re.compile(r"""\bid\s*=\s*["']([^"']+)["']""")
+_TAG_PAT = re.compile(r"<[^>]+>")
+_PERMALINK_PAT = re.compile(r"""<a\s[^>]*\bclass\s*=\s*["']headerlink["'][^>]*>.*?</a>""", re.DOTALL | re.IGNORECASE)
+_ANCHOR_ID_PAT = re.compile(r"""<(?:[a-z][\w-]*(?:\s[^>]*?)?\sid|a(?:\s[^>]*?)?\sname)\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+_MD_LINK_PAT = re.compile(r"\[([^\]\n]*(?:\[[^\]\n]*\][^\]\n]*)*)\]\(([^)\s]*)\)")
+
+
+def md_links (
+    text: typing.Any,
+    ) -> markupsafe.Markup:
+    """
+Jinja2 filter which converts the Markdown inline links within a string
+into HTML links, e.g., for the hypernym and citation links of glossary
+entries, which get prepared as Markdown.
+
+    text:
+text which may contain Markdown inline links
+
+    returns:
+text with the links converted, which like any inline HTML in the text gets treated as safe, the same as in the Markdown templates
+    """
+    return markupsafe.Markup(_MD_LINK_PAT.sub(
+        lambda match: f'<a href="{html.escape(match.group(2))}">{match.group(1)}</a>',
+        str(text),
+        ))
+
+
+def md_block (
+    text: typing.Any,
+    ) -> markupsafe.Markup:
+    """
+Jinja2 filter which converts a short Markdown text into HTML, e.g., for
+the docstrings documented by apidocs, without the `toc` extension.
+
+    text:
+Markdown text
+
+    returns:
+converted HTML
+    """
+    if not text:
+        return markupsafe.Markup("")
+
+    return markupsafe.Markup(markdown.markdown(str(text), extensions=[ "fenced_code", "tables" ]))
+
+
+def render_html_page (
+    template_path: pathlib.Path,
+    groups: typing.Dict[str, typing.Any],
+    ) -> str:
+    """
+Render the HTML for a reference page, with the same data used to render
+its Markdown.
+Templates may use the `md_links` and `md_block` filters for the values
+which contain Markdown.
+
+    template_path:
+file path for the Jinja2 template which renders HTML
+
+    groups:
+data for the page, as returned by the component's render function
+
+    returns:
+rendered HTML
+    """
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(str(template_path.parent)),
+        autoescape=True,
+        )
+
+    env.filters["md_links"] = md_links
+    env.filters["md_block"] = md_block
+
+    return env.get_template(template_path.name).render(groups=groups)
+
+
+def get_html_toc (
+    page_html: str,
+    ) -> typing.Tuple[str, typing.List[dict], str]:
+    """
+Build the table of contents for a pre-rendered page from its headings,
+adding an anchor to each heading which does not have one.
+
+    page_html:
+rendered HTML for the page
+
+    returns:
+a tuple of the HTML with anchors for all of the headings, the MkDocs table of contents tokens, and the page title from its first `<h1>` heading
+    """
+    headings = list(_HEADING_PAT.finditer(page_html))
+
+    # anchors given by the template take precedence
+    used: typing.Set[str] = set()
+
+    for match in headings:
+        id_match = _HEADING_ID_PAT.search(match.group(2) or "")
+
+        if id_match is not None:
+            used.add(id_match.group(1))
+
+    toc: typing.List[dict] = []
+    stack: typing.List[dict] = []
+    title = ""
+    result: typing.List[str] = []
+    pos = 0
+
+    for match in headings:
+        level = int(match.group(1))
+        attrs = match.group(2) or ""
+        name = _TAG_PAT.sub("", _PERMALINK_PAT.sub("", match.group(3))).strip()
+        id_match = _HEADING_ID_PAT.search(attrs)
+
+        if id_match is not None:
+            anchor = id_match.group(1)
+        else:
+            # the same anchors as the Markdown `toc` extension
+            anchor = unique(slugify(html.unescape(name), "-"), used)
+            attrs = f'{attrs} id="{anchor}"'
+
+        result.append(page_html[pos:match.start()])
+        result.append(f"<h{level}{attrs}>{match.group(3)}</h{level}>")
+        pos = match.end()
+
+        if level == 1 and not title:
+            title = html.unescape(name)
+
+        token: dict = { "level": level, "id": anchor, "name": name, "children": [] }
+
+        while stack and stack[-1]["level"] >= level:
+            stack.pop()
+
+        if stack:
+            stack[-1]["children"].append(token)
+        else:
+            toc.append(token)
+
+        stack.append(token)
+
+    result.append(page_html[pos:])
+
+    return "".join(result), toc, title
+
+
+def get_anchor_ids (
+    page_html: str,
+    ) -> typing.Set[str]:
+    """
+Collect the anchors of a pre-rendered page, i.e., the `id` attributes of
+its elements and the names of its `<a>` elements, the same as MkDocs
+collects them from the pages which it converts, for validating the
+links to the page.
+
+    page_html:
+rendered HTML for the page
+
+    returns:
+set of anchors
+    """
+    return set(_ANCHOR_ID_PAT.findall(page_html))
+
+
+def get_heading_toc (
+    page_html: str,
+    ) -> mkdocs.structure.toc.TableOfContents:
+    """
+Build the table of contents for all of the headings of a rendered page,
+including those deeper than the `toc_depth` of the Markdown `toc`
+extension, e.g., the apidocs functions, which MkDocs leaves out of
+`page.toc` while their headings still get anchors.
+
+    page_html:
+rendered HTML for the page
+
+    returns:
+MkDocs table of contents
+    """
+    _, toc_tokens, _ = get_html_toc(page_html)
+
+    return mkdocs.structure.toc.get_toc(typing.cast(list, toc_tokens))
+
+
+def set_page_html (
+    page: mkdocs.structure.pages.Page,
+    page_html: str,
+    toc_tokens: typing.List[dict],
+    ) -> None:
+    """
+Set the table of contents and the anchors for a page which bypasses the
+Markdown conversion of MkDocs, so that the theme gets its navigation and
+MkDocs still validates the links to the anchors on the page.
+
+    page:
+MkDocs page object, which gets modified
+
+    page_html:
+rendered HTML for the page
+
+    toc_tokens:
+table of contents tokens, as returned by `get_html_toc()`
+    """
+    page.toc = mkdocs.structure.toc.get_toc(typing.cast(list, toc_tokens))
+    page.present_anchor_ids = get_anchor_ids(page_html)
+
+
+def get_stub_markdown (
+    title: str,
+    ) -> str:
+    """
+Get the minimal Markdown source which MkDocs parses for a pre-rendered
+page, in place of its full generated Markdown.
+
+    title:
+page title
+
+    returns:
+Markdown source text
+    """
+    return f"# {title}\n" if title else ""
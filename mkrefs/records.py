@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Compact records for the denormalized glossary and bibliography entries,
+as an alternative to nested dictionaries copied from JSON-LD.
+
+Each distinct set of keys gets its own record class with `__slots__`,
+so that entries with the same shape share one class and carry no
+per-instance dictionary.
+Records remain attribute-accessible from Jinja2 templates, and also
+support the read-only parts of the dictionary protocol.
+"""
+
+import sys
+import typing
+
+
+_INTERN_MAX_LEN: int = 256
+
+
+class EntryRecord:
+    """
+Base class for the generated record classes, one per key shape.
+    """
+    __slots__: typing.Tuple[str, ...] = ()
+
+
+    def __getitem__ (
+        self,
+        key: str,
+        ) -> typing.Any:
+        """
+Get a field by name, as with a dictionary.
+        """
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+
+    def __contains__ (
+        self,
+        key: str,
+        ) -> bool:
+        """
+Check whether the record has the named field.
+        """
+        return key in self.__slots__
+
+
+    def get (
+        self,
+        key: str,
+        default: typing.Any = None,
+        ) -> typing.Any:
+        """
+Get a field by name, or a default value if the record does not have it.
+        """
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+
+    def keys (
+        self,
+        ) -> typing.Tuple[str, ...]:
+        """
+Get the names of the fields in the record.
+        """
+        return self.__slots__
+
+
+    def items (
+        self,
+        ) -> typing.List[typing.Tuple[str, typing.Any]]:
+        """
+Get the `(name, value)` pairs for the fields in the record.
+        """
+        return [ (key, getattr(self, key),) for key in self.__slots__ ]
+
+
+    def to_dict (
+        self,
+        ) -> dict:
+        """
+Convert the record, and any records nested within it, back into plain
+dictionaries, e.g., for JSON serialization.
+        """
+        return {
+            key: _to_plain(value)
+            for key, value in self.items()
+            }
+
+
+    def __repr__ (
+        self,
+        ) -> str:
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"EntryRecord({fields})"
+
+
+    def __reduce__ (
+        self,
+        ) -> tuple:
+        return (_rebuild_record, (self.__slots__, tuple(getattr(self, key) for key in self.__slots__),),)
+
+
+_RESERVED_KEYS: typing.Set[str] = { name for name in dir(EntryRecord) if not name.startswith("__") }
+_RECORD_CLASSES: typing.Dict[typing.Tuple[str, ...], typing.Type[EntryRecord]] = {}
+
+
+def get_record_class (
+    keys: typing.Tuple[str, ...],
+    ) -> typing.Optional[typing.Type[EntryRecord]]:
+    """
+Get the record class for a key shape, creating it on first use.
+
+    keys:
+field names, in sorted order
+
+    returns:
+record class, or `None` if the keys cannot be used as attribute names
+    """
+    cls = _RECORD_CLASSES.get(keys)
+
+    if cls is None:
+        if not all(key.isidentifier() and key not in _RESERVED_KEYS for key in keys):
+            return None
+
+        cls = typing.cast(typing.Type[EntryRecord], type("EntryRecord", (EntryRecord,), { "__slots__": keys }))
+        _RECORD_CLASSES[keys] = cls
+
+    return cls
+
+
+def _rebuild_record (
+    keys: typing.Tuple[str, ...],
+    values: tuple,
+    ) -> EntryRecord:
+    """
+Rebuild a record after unpickling, e.g., in the worker processes which
+render pages concurrently.
+    """
+    cls = get_record_class(keys)
+    if cls is None:
+        raise ValueError(f"cannot rebuild a record with the keys {keys}")
+
+    record = cls.__new__(cls)
+
+    for key, value in zip(keys, values):
+        setattr(record, key, value)
+
+    return record
+
+
+def _to_plain (
+    value: typing.Any,
+    ) -> typing.Any:
+    """
+Convert records nested within a value back into plain dictionaries.
+    """
+    if isinstance(value, EntryRecord):
+        return value.to_dict()
+
+    if isinstance(value, dict):
+        return { key: _to_plain(val) for key, val in value.items() }
+
+    if isinstance(value, list):
+        return [ _to_plain(val) for val in value ]
+
+    return value
+
+
+def to_records (
+    value: typing.Any,
+    memo: typing.Optional[dict] = None,
+    ) -> typing.Any:
+    """
+Convert denormalized entry data into compact records, with short
+strings interned.
+Dictionaries which are shared among entries, such as the authors and
+publishers referenced by many bibliography entries, become shared
+records when the same `memo` gets used for all of the entries.
+
+    value:
+scalar, list, or dictionary to convert
+
+    memo:
+optional, converted records keyed by the `id()` of their source dictionaries
+
+    returns:
+converted data
+    """
+    if memo is None:
+        memo = {}
+
+    if isinstance(value, dict):
+        record = memo.get(id(value))
+
+        if record is not None:
+            return record
+
+        keys = tuple(sorted(value.keys()))
+        cls = get_record_class(keys)
+
+        if cls is None:
+            record = {
+                sys.intern(key): to_records(val, memo)
+                for key, val in value.items()
+                }
+        else:
+            record = cls.__new__(cls)
+
+            for key in keys:
+                setattr(record, key, to_records(value[key], memo))
+
+        memo[id(value)] = record
+        return record
+
+    if isinstance(value, list):
+        return [ to_records(val, memo) for val in value ]
+
+    if isinstance(value, str) and len(value) <= _INTERN_MAX_LEN:
+        return sys.intern(value)
+
+    return value
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Process-lifetime registry of parsed graphs, so that the rebuilds during
+`mkdocs serve` and the different components which use the same graph
+files can share one parsed KG.
+"""
+
+from collections import OrderedDict, defaultdict
+import os
+import threading
+import typing
+
+import kglab
+import pathlib
+import rdflib  # type: ignore  # pylint: disable=E0401
+import rdflib.graph  # type: ignore  # pylint: disable=E0401
+
+from .store import SQLiteStore
+from .util import load_kg
+
+
+GRAPH_REGISTRY_MAX_TRIPLES: int = int(os.environ.get("MKREFS_GRAPH_REGISTRY_MAX_TRIPLES", 5000000))
+
+_RegistryKey = typing.Tuple[typing.Tuple[pathlib.Path, ...], typing.Optional[pathlib.Path]]
+
+# LRU order: the least recently used graph comes first
+_GRAPH_REGISTRY: "OrderedDict[_RegistryKey, typing.Tuple[tuple, kglab.KnowledgeGraph, int]]" = OrderedDict()
+_REGISTRY_LOCK = threading.Lock()
+_LOAD_LOCKS: typing.Dict[_RegistryKey, threading.Lock] = defaultdict(threading.Lock)
+
+
+def _file_stamp (
+    graph_paths: typing.Tuple[pathlib.Path, ...],
+    ) -> tuple:
+    """
+Identify the versions of the graph files by their modification times
+and sizes.
+
+    graph_paths:
+resolved paths to the graph files
+
+    returns:
+version stamp
+    """
+    stamp = []
+
+    for path in graph_paths:
+        stat = path.stat()
+        stamp.append((stat.st_mtime_ns, stat.st_size,))
+
+    return tuple(stamp)
+
+
+def _count_triples (
+    kg: kglab.KnowledgeGraph,
+    ) -> int:
+    """
+Estimate how much memory a KG holds, as its number of triples.
+A KG backed by a persistent store gets counted as zero, since its
+triples stay on disk.
+
+    kg:
+the KG to measure
+
+    returns:
+number of triples held in memory
+    """
+    graph = kg.rdf_graph()
+
+    if isinstance(graph.store, SQLiteStore):
+        return 0
+
+    return len(graph)
+
+
+def _evict (
+    max_triples: int,
+    ) -> None:
+    """
+Drop the least recently used graphs until the registry fits within the
+memory cap, always keeping the most recently used graph.
+Must be called while holding the registry lock.
+
+    max_triples:
+cap on the total number of triples held in memory
+    """
+    # a graph held under several keys only gets counted once
+    counts = { id(kg): count for _, kg, count in _GRAPH_REGISTRY.values() }
+    total = sum(counts.values())
+
+    while total > max_triples and len(_GRAPH_REGISTRY) > 1:
+        _, (_, kg, count) = _GRAPH_REGISTRY.popitem(last=False)
+
+        if all(other_kg is not kg for _, other_kg, _ in _GRAPH_REGISTRY.values()):
+            total -= count
+
+
+class _ReadOnlyGraph (rdflib.graph.ReadOnlyGraphAggregate):
+    """
+Read-only view of one RDF graph, which resolves the prefixes in SPARQL
+queries with the namespace bindings of the graph which it wraps.
+    """
+
+    def namespaces (
+        self,
+        ) -> typing.Generator[typing.Tuple[str, rdflib.URIRef], None, None]:
+        """
+Iterate through the namespace bindings of the wrapped graph.
+
+    yields:
+`(prefix, namespace)` tuples
+        """
+        yield from self.graphs[0].namespaces()
+
+
+def _read_only_view (
+    kg: kglab.KnowledgeGraph,
+    ) -> kglab.KnowledgeGraph:
+    """
+Wrap a KG in a read-only view, since the registry shares it among its
+callers; adding or removing triples through the view raises an
+`rdflib.graph.ModificationException` error.
+
+    kg:
+the KG to wrap
+
+    returns:
+read-only view of the KG, with the same namespace bindings
+    """
+    return kglab.KnowledgeGraph(
+        namespaces=kg.get_ns_dict(),
+        import_graph=_ReadOnlyGraph([ kg.rdf_graph() ]),
+        )
+
+
+def get_kg (
+    graph_paths: typing.List[pathlib.Path],
+    store_path: typing.Optional[pathlib.Path] = None,
+    ) -> kglab.KnowledgeGraph:
+    """
+Get a parsed KG from the registry, loading it only when the graph files
+have not been loaded before, or have changed since then.
+
+    graph_paths:
+paths to the graph files
+
+    store_path:
+optional, path to a persistent SQLite store for the graph
+
+    returns:
+populated KG, as a read-only view since it may be shared with other callers
+    """
+    paths = tuple(path.resolve() for path in graph_paths)
+    key: _RegistryKey = (paths, store_path.resolve() if store_path is not None else None,)
+
+    with _REGISTRY_LOCK:
+        load_lock = _LOAD_LOCKS[key]
+
+    # concurrent requests for the same graph wait for a single load
+    with load_lock:
+        stamp = _file_stamp(paths)
+
+        with _REGISTRY_LOCK:
+            entry = _GRAPH_REGISTRY.get(key)
+
+            if entry is not None and entry[0] == stamp:
+                _GRAPH_REGISTRY.move_to_end(key)
+                return entry[1]
+
+        loaded_kg = load_kg(list(paths), store_path)
+        kg = _read_only_view(loaded_kg)
+
+        with _REGISTRY_LOCK:
+            _GRAPH_REGISTRY[key] = (stamp, kg, _count_triples(loaded_kg),)
+            _GRAPH_REGISTRY.move_to_end(key)
+            _evict(GRAPH_REGISTRY_MAX_TRIPLES)
+
+    return kg
+
+
+def invalidate_kg (
+    graph_paths: typing.Optional[typing.List[pathlib.Path]] = None,
+    ) -> int:
+    """
+Drop graphs from the registry, so that they get loaded again on next
+use.
+
+    graph_paths:
+optional, drop only the graphs loaded from any of these files; otherwise drop all of the graphs
+
+    returns:
+number of graphs dropped
+    """
+    with _REGISTRY_LOCK:
+        if graph_paths is None:
+            keys = list(_GRAPH_REGISTRY.keys())
+        else:
+            resolved = { path.resolve() for path in graph_paths }
+
+            keys = [
+                key
+                for key in _GRAPH_REGISTRY.keys()
+                if resolved.intersection(key[0])
+            ]
+
+        for key in keys:
+            del _GRAPH_REGISTRY[key]
+
+    return len(keys)
@@ -0,0 +1,117 @@
+/*
+ * Loader for the MkRefs search index, which fetches only the shard
+ * needed for each query, then runs a prefix search on its sorted keys.
+ *
+ * see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+ *
+ * usage:
+ *   mkrefsSearch("pagera", 10).then(function (results) { ... });
+ *
+ * each result has the fields: name, kind, url, detail
+ */
+(function () {
+  "use strict";
+
+  var script = document.currentScript;
+  var indexUrl = new URL("./", script.src);
+  var manifest = null;
+  var shards = {};
+
+  function fetchJson (url) {
+    return fetch(url).then(function (response) {
+      if (!response.ok) {
+        throw new Error("MkRefs search: cannot load " + url);
+      }
+
+      return response.arrayBuffer();
+    }).then(function (buffer) {
+      var bytes = new Uint8Array(buffer);
+
+      // servers may already have decoded the gzip data
+      if (bytes.length > 1 && bytes[0] === 0x1f && bytes[1] === 0x8b) {
+        var stream = new Blob([ bytes ]).stream().pipeThrough(new DecompressionStream("gzip"));
+        return new Response(stream).text();
+      }
+
+      return new TextDecoder("utf-8").decode(bytes);
+    }).then(JSON.parse);
+  }
+
+  function getManifest () {
+    if (manifest === null) {
+      manifest = fetchJson(new URL("manifest.json", indexUrl));
+    }
+
+    return manifest;
+  }
+
+  function getShard (shardId) {
+    if (!(shardId in shards)) {
+      shards[shardId] = fetchJson(new URL(shardId + ".json.gz", indexUrl));
+    }
+
+    return shards[shardId];
+  }
+
+  function lowerBound (keys, query) {
+    var lo = 0;
+    var hi = keys.length;
+
+    while (lo < hi) {
+      var mid = (lo + hi) >>> 1;
+
+      if (keys[mid][0] < query) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+
+    return lo;
+  }
+
+  window.mkrefsSearch = function (text, limit) {
+    var query = (text || "").trim().toLowerCase();
+    limit = limit || 20;
+
+    if (query.length < 1) {
+      return Promise.resolve([]);
+    }
+
+    var shardId = /^[a-z0-9]$/.test(query[0]) ? query[0] : "_";
+
+    return getManifest().then(function (data) {
+      if (data.shards.indexOf(shardId) < 0) {
+        return [];
+      }
+
+      return getShard(shardId).then(function (shard) {
+        var siteUrl = new URL(data.root, indexUrl);
+        var results = [];
+        var seen = {};
+
+        for (var i = lowerBound(shard.k, query); i < shard.k.length && results.length < limit; i++) {
+          var key = shard.k[i];
+
+          if (key[0].lastIndexOf(query, 0) !== 0) {
+            break;
+          }
+
+          if (!seen[key[1]]) {
+            var row = shard.e[key[1]];
+            seen[key[1]] = true;
+
+            results.push({
+              name: row[0],
+              kind: row[1],
+              url: new URL(row[2], siteUrl).href,
+              detail: row[3]
+            });
+          }
+        }
+
+        return results;
+      });
+    });
+  };
+})();
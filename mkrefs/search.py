@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Compact search index for the entities described by the MkRefs reference
+pages: glossary terms and synonyms, bibliography citekeys, titles, and
+authors, plus the names documented by apidocs.
+
+The index gets sharded by the first character of each search key, and
+each shard gets written as gzip-compressed JSON, so a browser only loads
+the shard needed for a query.
+Within a shard the keys are sorted, which makes a prefix search a binary
+search followed by a short scan.
+"""
+
+import gzip
+import json
+import pathlib
+import posixpath
+import re
+import shutil
+import typing
+
+from .glossary import get_shard_pages
+
+
+SEARCH_LOADER: str = "search.js"
+
+_DETAIL_MAX_LEN: int = 160
+_KEY_MAX_LEN: int = 64
+
+_WORD_PAT = re.compile(r"\w+")
+_HEADING_PAT = re.compile(r"<[^>]+>|`")
+
+
+def _get_detail (
+    text: typing.Any,
+    ) -> str:
+    """
+Shorten a description for a search result to its first line.
+
+    text:
+description text, which may be missing
+
+    returns:
+shortened description
+    """
+    if not isinstance(text, str):
+        return ""
+
+    line = text.strip().split("\n")[0].strip()
+
+    if len(line) > _DETAIL_MAX_LEN:
+        line = line[:_DETAIL_MAX_LEN - 1].rstrip() + "…"
+
+    return line
+
+
+def get_glossary_search_entries (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the search entries for a glossary: one per entry, searchable by
+its label, plus one per synonym.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of glossary entries, as returned by `render_glossary()`
+
+    returns:
+list of search entries
+    """
+    page = local_config["glossary"]["page"]
+    shard_pages: typing.Dict[str, str] = {}
+
+    if local_config["glossary"].get("shard"):
+        shard_pages = {
+            letter: posixpath.join(posixpath.dirname(page), shard_page)
+            for letter, shard_page in get_shard_pages(page, groups.keys())
+            }
+
+    entries: typing.List[dict] = []
+
+    for letter, item_list in groups.items():
+        for item in item_list:
+            if item.get("redirect") is not None:
+                name = item["label"]
+                heading = item["redirect"]
+                detail = f"see {heading}"
+                entry_page = shard_pages.get(heading[0].lower(), page)
+            else:
+                name = heading = item.get("prefLabel")
+                detail = _get_detail(item.get("definition"))
+                entry_page = shard_pages.get(letter, page)
+
+            if isinstance(name, str) and isinstance(heading, str):
+                entries.append({
+                    "name": name,
+                    "kind": "glossary",
+                    "detail": detail,
+                    "page": entry_page,
+                    "heading": heading,
+                    "terms": [ name ],
+                })
+
+    return entries
+
+
+def get_biblio_search_entries (
+    local_config: dict,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the search entries for a bibliography, one per entry, searchable
+by its citekey, title, and author names.
+
+    local_config:
+local configuration
+
+    groups:
+grouping of bibliography entries, as returned by `render_biblio()`
+
+    returns:
+list of search entries
+    """
+    page = local_config["biblio"]["page"]
+    entries: typing.List[dict] = []
+
+    for item_list in groups.values():
+        for item in item_list:
+            title = item.get("title")
+            title = title if isinstance(title, str) else ""
+
+            authors = [
+                auth.get("name")
+                for auth in item.get("authorList", [])
+                if isinstance(auth.get("name"), str)
+                ]
+
+            entries.append({
+                "name": item["citeKey"],
+                "kind": "biblio",
+                "detail": _get_detail(", ".join([ title ] + authors)),
+                "page": page,
+                "heading": item["citeKey"],
+                "terms": [ item["citeKey"], title ] + authors,
+            })
+
+    return entries
+
+
+def get_apidocs_search_entries (
+    page: str,
+    groups: typing.Dict[str, list],
+    ) -> typing.List[dict]:
+    """
+List the search entries for an apidocs reference page, one per class,
+method, function, and type, based on the metadata from
+`PackageDoc.build()`
+
+    page:
+the apidocs reference page, relative to `docs_dir`
+
+    groups:
+the apidocs data used to render the page, as returned by `render_apidocs_list()`
+
+    returns:
+list of search entries
+    """
+    class_pages: typing.Dict[typing.Tuple[str, str], str] = {
+        (pkg_name, class_name,): posixpath.join(posixpath.dirname(page), class_page)
+        for pkg_name, class_name, class_page in groups.get("pages", [])
+        }
+
+    entries: typing.List[dict] = []
+
+    for meta in groups.get("package", []):
+        pkg_name = meta["package"]
+
+        for class_name, class_meta in meta["class"].items():
+            class_page = class_pages.get((pkg_name, class_name,), page)
+
+            entries.append({
+                "name": class_name,
+                "kind": "class",
+                "detail": _get_detail(class_meta.get("docstring")),
+                "page": class_page,
+                "heading": f"{class_name} class",
+                "terms": [ class_name, f"{pkg_name}.{class_name}" ],
+            })
+
+            for method_name, method_meta in class_meta["method"].items():
+                entries.append({
+                    "name": f"{class_name}.{method_name}",
+                    "kind": "method",
+                    "detail": _get_detail(method_meta.get("docstring")),
+                    "page": class_page,
+                    "heading": f"{class_name} class\n{method_name} method",
+                    "terms": [ method_name, method_meta.get("ns_path", "") ],
+                })
+
+        for func_name, func_meta in meta["function"].items():
+            entries.append({
+                "name": func_name,
+                "kind": "function",
+                "detail": _get_detail(func_meta.get("docstring")),
+                "page": page,
+                "heading": f"{func_name} method",
+                "terms": [ func_name, func_meta.get("ns_path", "") ],
+            })
+
+        for type_name, type_meta in meta["type"].items():
+            entries.append({
+                "name": type_name,
+                "kind": "type",
+                "detail": "",
+                "page": page,
+                "heading": f"{type_name} type",
+                "terms": [ type_name, type_meta.get("ns_path", "") ],
+            })
+
+    return entries
+
+
+def get_toc_anchors (
+    toc: typing.Iterable[typing.Any],
+    ) -> typing.Dict[str, str]:
+    """
+Map the headings in the table of contents for a page to their anchors.
+
+    toc:
+table of contents for the page, i.e., `page.toc`
+
+    returns:
+anchor identifiers, keyed by the plain text of each heading, and also by the text of its parent heading and its own text separated by a newline, e.g., for methods which share the same name in several classes
+    """
+    anchors: typing.Dict[str, str] = {}
+    queue: typing.List[typing.Tuple[str, typing.Any]] = [ ("", link,) for link in toc ]
+
+    for parent, link in queue:
+        title = _HEADING_PAT.sub("", link.title).strip()
+        anchors.setdefault(title, link.id)
+        anchors.setdefault(f"{parent}\n{title}", link.id)
+        queue.extend((title, child,) for child in link.children)
+
+    return anchors
+
+
+def _get_keys (
+    terms: typing.List[str],
+    ) -> typing.List[str]:
+    """
+Get the search keys for an entry, which start at each word of each of
+its terms, so that a prefix search matches any word.
+
+    terms:
+searchable text for the entry
+
+    returns:
+list of distinct search keys
+    """
+    keys: typing.Dict[str, None] = {}
+
+    for term in terms:
+        lowered = term.lower()
+
+        for match in _WORD_PAT.finditer(lowered):
+            if match.start() == 0 or len(match.group(0)) > 1:
+                keys[lowered[match.start():match.start() + _KEY_MAX_LEN]] = None
+
+    return list(keys.keys())
+
+
+def build_search_index (
+    entries: typing.List[dict],
+    page_urls: typing.Dict[str, str],
+    page_anchors: typing.Dict[str, typing.Dict[str, str]],
+    ) -> typing.Dict[str, dict]:
+    """
+Build the shards of the search index.
+
+    entries:
+search entries, from the `get_*_search_entries()` functions
+
+    page_urls:
+site URLs of the reference pages, keyed by their paths relative to `docs_dir`
+
+    page_anchors:
+heading anchors for each reference page, as returned by `get_toc_anchors()`
+
+    returns:
+shards keyed by the first character of their keys, each with its list of `[name, kind, url, detail]` entries and its sorted list of `[key, entry_index]` pairs
+    """
+    shards: typing.Dict[str, dict] = {}
+
+    for entry in entries:
+        url = page_urls.get(entry["page"])
+
+        if url is None:
+            continue
+
+        anchors = page_anchors.get(entry["page"], {})
+        anchor = anchors.get(entry["heading"]) or anchors.get(entry["heading"].split("\n")[-1])
+
+        if anchor:
+            url = f"{url}#{anchor}"
+
+        row = [ entry["name"], entry["kind"], url, entry["detail"] ]
+        row_index: typing.Dict[str, int] = {}
+
+        for key in _get_keys([ term for term in entry["terms"] if term ]):
+            shard_id = key[0] if key[0].isascii() and key[0].isalnum() else "_"
+            shard = shards.setdefault(shard_id, { "e": [], "k": [] })
+
+            # each shard holds its own copy of the entries it refers to
+            if shard_id not in row_index:
+                row_index[shard_id] = len(shard["e"])
+                shard["e"].append(row)
+
+            shard["k"].append([ key, row_index[shard_id] ])
+
+    for shard in shards.values():
+        shard["k"].sort()
+
+    return shards
+
+
+def write_search_index (
+    shards: typing.Dict[str, dict],
+    site_dir: pathlib.Path,
+    search_dir: str,
+    ) -> None:
+    """
+Write the shards of the search index as gzip-compressed JSON files,
+along with a manifest and the loader script.
+
+    shards:
+shards of the search index, as returned by `build_search_index()`
+
+    site_dir:
+the MkDocs `site_dir` directory
+
+    search_dir:
+output directory for the search index, relative to `site_dir`
+    """
+    depth = len(pathlib.PurePosixPath(search_dir).parts)
+    search_path = site_dir / search_dir
+    search_path.mkdir(parents=True, exist_ok=True)
+
+    for stale_path in search_path.glob("*.json.gz"):
+        if stale_path.name[:-len(".json.gz")] not in shards:
+            stale_path.unlink()
+
+    for shard_id, shard in shards.items():
+        data = json.dumps(shard, ensure_ascii=False, separators=(",", ":",)).encode("utf-8")
+
+        # a fixed timestamp keeps unchanged shards byte-identical
+        with gzip.GzipFile(search_path / f"{shard_id}.json.gz", "wb", mtime=0) as f:
+            f.write(data)
+
+    manifest = {
+        "root": "../" * depth,
+        "shards": sorted(shards.keys()),
+        "entries": sum(len(shard["e"]) for shard in shards.values()),
+    }
+
+    (search_path / "manifest.json").write_text(json.dumps(manifest, separators=(",", ":",)), encoding="utf-8")
+    shutil.copyfile(pathlib.Path(__file__).parent / SEARCH_LOADER, search_path / SEARCH_LOADER)
+
+
+def filter_search_index (
+    index_path: pathlib.Path,
+    page_urls: typing.Iterable[str],
+    ) -> int:
+    """
+Remove the reference pages from the search index written by the MkDocs
+`search` plugin, which otherwise indexes the full text of each page.
+
+    index_path:
+path to the `search_index.json` file within `site_dir`
+
+    page_urls:
+site URLs of the pages to remove
+
+    returns:
+number of index entries removed
+    """
+    if not index_path.exists():
+        return 0
+
+    excluded = set(page_urls)
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    docs = index.get("docs", [])
+
+    index["docs"] = [
+        doc
+        for doc in docs
+        if doc.get("location", "").split("#")[0] not in excluded
+        ]
+
+    index_path.write_text(json.dumps(index, separators=(",", ":",)), encoding="utf-8")
+
+    return len(docs) - len(index["docs"])
@@ -0,0 +1,585 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Disk-backed triple store, for graphs which are larger than RAM.
+
+The graph gets loaded once into a local SQLite database, with indexed
+triples, then later builds open it read-only and the SPARQL queries
+only fetch the triples which they match.
+"""
+
+import functools
+import os
+import sqlite3
+import typing
+
+import kglab
+import pathlib
+import rdflib  # type: ignore  # pylint: disable=E0401
+import rdflib.store  # type: ignore  # pylint: disable=E0401
+from rdflib.plugins.sparql.processor import SPARQLProcessor, SPARQLResult, SPARQLUpdateProcessor  # type: ignore  # pylint: disable=E0401
+
+from .snapshot import decode_term, encode_term, is_snapshot, read_snapshot
+
+
+_SCHEMA: typing.List[str] = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS namespaces (prefix TEXT PRIMARY KEY, iri TEXT)",
+    "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS triples (s INTEGER, p INTEGER, o INTEGER, PRIMARY KEY (s, p, o)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s)",
+    "CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p)",
+]
+
+
+class SQLiteStore (rdflib.store.Store):
+    """
+An `rdflib` store plugin backed by a SQLite database, with dictionary
+encoded terms and triples indexed in `spo`, `pos`, and `osp` order.
+Opening an existing store without `create` makes it read-only.
+    """
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    _BATCH_SIZE: int = 10000
+    _CACHE_SIZE: int = 100000
+
+
+    def __init__ (
+        self,
+        configuration: typing.Optional[str] = None,
+        identifier: typing.Optional[rdflib.term.Identifier] = None,
+        ) -> None:
+        """
+Constructor, which opens the store when a configuration is given.
+
+    configuration:
+optional, file path for the SQLite database
+
+    identifier:
+optional, identifier for the store
+        """
+        self.conn: typing.Optional[sqlite3.Connection] = None
+        self.path: typing.Optional[str] = None
+        self.read_only = True
+        self.pending: typing.List[typing.Tuple[str, str, str]] = []
+        self.overlay_ns: typing.Dict[str, rdflib.URIRef] = {}
+
+        super().__init__(configuration=configuration, identifier=identifier)
+
+
+    def open (
+        self,
+        configuration: typing.Union[str, typing.Tuple[str, str]],
+        create: bool = False,
+        ) -> int:
+        """
+Open the SQLite database.
+
+    configuration:
+file path for the SQLite database; the `(path, identifier)` tuples which other `rdflib` stores accept are not supported
+
+    create:
+flag to create the database for writing; otherwise open read-only
+
+    returns:
+`rdflib.store.VALID_STORE` if the store was opened
+        """
+        if not isinstance(configuration, str):
+            raise ValueError(f"the SQLite store configuration must be a file path, not {configuration!r}")
+
+        self.path = configuration
+        self.read_only = not create
+
+        if self.read_only:
+            if not os.path.exists(configuration):
+                return rdflib.store.NO_STORE
+
+            uri = pathlib.Path(configuration).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(configuration, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = OFF")
+            self.conn.execute("PRAGMA synchronous = OFF")
+
+            for sql in _SCHEMA:
+                self.conn.execute(sql)
+
+        self.term_id = functools.lru_cache(maxsize=self._CACHE_SIZE)(self._lookup_id)
+        self.term = functools.lru_cache(maxsize=self._CACHE_SIZE)(self._lookup_term)
+
+        return rdflib.store.VALID_STORE
+
+
+    def close (
+        self,
+        commit_pending_transaction: bool = False,
+        ) -> None:
+        """
+Close the SQLite database, after writing any pending triples.
+
+    commit_pending_transaction:
+not used, since writes always get committed
+        """
+        if self.conn is not None:
+            if not self.read_only:
+                self.flush()
+
+            self.conn.close()
+            self.conn = None
+
+
+    def get_conn (
+        self
+        ) -> sqlite3.Connection:
+        """
+Accessor for the connection to the SQLite database.
+
+    returns:
+the open SQLite connection
+        """
+        if self.conn is None:
+            raise ValueError("the SQLite store is not open")
+
+        return self.conn
+
+
+    def _lookup_id (
+        self,
+        term: rdflib.term.Node,
+        ) -> typing.Optional[int]:
+        """
+Look up the dictionary identifier for an RDF term.
+
+    term:
+RDF term
+
+    returns:
+term identifier, or `None` if the term is not in the store
+        """
+        row = self.get_conn().execute("SELECT id FROM terms WHERE term = ?", (encode_term(term),)).fetchone()
+
+        if row is None:
+            return None
+
+        return row[0]
+
+
+    def _lookup_term (
+        self,
+        term_id: int,
+        ) -> rdflib.term.Node:
+        """
+Look up the RDF term for a dictionary identifier.
+
+    term_id:
+term identifier
+
+    returns:
+RDF term
+        """
+        row = self.get_conn().execute("SELECT term FROM terms WHERE id = ?", (term_id,)).fetchone()
+        return decode_term(row[0])
+
+
+    def flush (
+        self
+        ) -> None:
+        """
+Write the pending triples into the database, in one batch.
+        """
+        if len(self.pending) < 1:
+            return
+
+        terms = { term for triple in self.pending for term in triple }
+        self.get_conn().executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((term,) for term in terms))
+
+        term_ids: typing.Dict[str, int] = {}
+        term_list = list(terms)
+
+        for i in range(0, len(term_list), 500):
+            chunk = term_list[i:i + 500]
+            sql = f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})"
+            term_ids.update(self.get_conn().execute(sql, chunk))
+
+        self.get_conn().executemany(
+            "INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)",
+            ((term_ids[s], term_ids[p], term_ids[o],) for s, p, o in self.pending),
+            )
+
+        self.get_conn().commit()
+        self.pending = []
+        self.term_id.cache_clear()
+
+
+    def add (  # pylint: disable=W0221
+        self,
+        triple: typing.Tuple[rdflib.term.Node, rdflib.term.Node, rdflib.term.Node],
+        context: typing.Any = None,
+        quoted: bool = False,
+        ) -> None:
+        """
+Add a triple to the store, buffered for batch writes.
+
+    triple:
+the `(s, p, o)` triple to add
+
+    context:
+not used, since the store is not context aware
+
+    quoted:
+not used, since the store is not formula aware
+        """
+        if self.read_only:
+            raise PermissionError("the SQLite store is open read-only")
+
+        self.pending.append((encode_term(triple[0]), encode_term(triple[1]), encode_term(triple[2]),))
+
+        if len(self.pending) >= self._BATCH_SIZE:
+            self.flush()
+
+
+    def triples (  # pylint: disable=W0221
+        self,
+        triple_pattern: typing.Tuple[typing.Any, typing.Any, typing.Any],
+        context: typing.Any = None,
+        ) -> typing.Iterator[typing.Tuple[tuple, typing.Iterator]]:
+        """
+Iterate through the triples which match the given pattern, using the
+database indexes.
+
+    triple_pattern:
+the `(s, p, o)` pattern to match, where `None` matches any term
+
+    context:
+not used, since the store is not context aware
+
+    yields:
+each matching triple, plus an empty iterator of its contexts
+        """
+        if not self.read_only:
+            self.flush()
+
+        clauses: typing.List[str] = []
+        params: typing.List[int] = []
+
+        for column, term in zip([ "s", "p", "o" ], triple_pattern):
+            if term is not None:
+                term_id = self.term_id(term)
+
+                if term_id is None:
+                    return
+
+                clauses.append(f"{column} = ?")
+                params.append(term_id)
+
+        sql = "SELECT s, p, o FROM triples"
+
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+
+        for s, p, o in self.get_conn().execute(sql, params):
+            yield (self.term(s), self.term(p), self.term(o),), iter(())
+
+
+    def __len__ (  # pylint: disable=W0221
+        self,
+        context: typing.Any = None,
+        ) -> int:
+        """
+Count the triples in the store.
+
+    context:
+not used, since the store is not context aware
+
+    returns:
+number of triples
+        """
+        return self.get_conn().execute("SELECT COUNT(*) FROM triples").fetchone()[0]
+
+
+    def contexts (
+        self,
+        triple: typing.Any = None,
+        ) -> typing.Generator[rdflib.Graph, None, None]:
+        """
+The store is not context aware, so it has no contexts.
+
+    triple:
+not used
+
+    yields:
+nothing
+        """
+        yield from ()
+
+
+    def query (
+        self,
+        query: typing.Any,
+        initNs: typing.Mapping[str, typing.Any],  # pylint: disable=C0103
+        initBindings: typing.Mapping[str, rdflib.term.Identifier],  # pylint: disable=C0103
+        queryGraph: str,  # pylint: disable=C0103,W0613
+        **kwargs: typing.Any,
+        ) -> typing.Any:
+        """
+Evaluate a SPARQL query with the default `rdflib` engine, which fetches
+only the matching triples through `triples()`.
+
+    query:
+parsed query, or a query string
+
+    initNs:
+namespace bindings for the query
+
+    initBindings:
+initial variable bindings for the query
+
+    queryGraph:
+identifier of the graph to query, which is not used since the store is not context aware
+
+    returns:
+query result
+        """
+        return SPARQLResult(SPARQLProcessor(rdflib.Graph(store=self)).query(query, initBindings, initNs, **kwargs))
+
+
+    def update (
+        self,
+        update: typing.Any,
+        initNs: typing.Mapping[str, typing.Any],  # pylint: disable=C0103
+        initBindings: typing.Mapping[str, rdflib.term.Identifier],  # pylint: disable=C0103
+        queryGraph: str,  # pylint: disable=C0103,W0613
+        **kwargs: typing.Any,
+        ) -> None:
+        """
+Evaluate a SPARQL update with the default `rdflib` engine, which writes
+the changes through `add()` and `remove()`.
+
+    update:
+parsed update, or an update string
+
+    initNs:
+namespace bindings for the update
+
+    initBindings:
+initial variable bindings for the update
+
+    queryGraph:
+identifier of the graph to update, which is not used since the store is not context aware
+        """
+        SPARQLUpdateProcessor(rdflib.Graph(store=self)).update(update, initBindings, initNs, **kwargs)
+
+
+    def bind (  # pylint: disable=W0221
+        self,
+        prefix: str,
+        namespace: rdflib.URIRef,
+        override: bool = True,
+        ) -> None:
+        """
+Bind a namespace prefix; while read-only, bindings only get kept in
+memory.
+
+    prefix:
+namespace prefix
+
+    namespace:
+namespace IRI
+
+    override:
+flag to replace an existing binding for the prefix
+        """
+        if self.read_only:
+            if override or prefix not in self.overlay_ns:
+                self.overlay_ns[prefix] = rdflib.URIRef(namespace)
+        elif override:
+            self.get_conn().execute("INSERT OR REPLACE INTO namespaces (prefix, iri) VALUES (?, ?)", (prefix, str(namespace),))
+        else:
+            self.get_conn().execute("INSERT OR IGNORE INTO namespaces (prefix, iri) VALUES (?, ?)", (prefix, str(namespace),))
+
+
+    def namespaces (
+        self
+        ) -> typing.Iterator[typing.Tuple[str, rdflib.URIRef]]:
+        """
+Iterate through the namespace bindings.
+
+    yields:
+each `(prefix, namespace)` binding
+        """
+        bindings = {
+            prefix: rdflib.URIRef(iri)
+            for prefix, iri in self.get_conn().execute("SELECT prefix, iri FROM namespaces")
+        }
+
+        bindings.update(self.overlay_ns)
+        yield from bindings.items()
+
+
+    def namespace (
+        self,
+        prefix: str,
+        ) -> typing.Optional[rdflib.URIRef]:
+        """
+Look up the namespace IRI bound to a prefix.
+
+    prefix:
+namespace prefix
+
+    returns:
+namespace IRI, or `None` if the prefix is not bound
+        """
+        return dict(self.namespaces()).get(prefix)
+
+
+    def prefix (
+        self,
+        namespace: rdflib.URIRef,
+        ) -> typing.Optional[str]:
+        """
+Look up the prefix bound to a namespace IRI.
+
+    namespace:
+namespace IRI
+
+    returns:
+namespace prefix, or `None` if the namespace is not bound
+        """
+        for prefix, iri in self.namespaces():
+            if iri == namespace:
+                return prefix
+
+        return None
+
+
+def _source_stamp (
+    graph_paths: typing.List[pathlib.Path],
+    ) -> str:
+    """
+Identify the versions of the graph files by their modification times
+and sizes.
+
+    graph_paths:
+paths to the graph files
+
+    returns:
+version stamp
+    """
+    stamps: typing.List[str] = []
+
+    for path in graph_paths:
+        stat = path.stat()
+        stamps.append(f"{path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    return "\n".join(stamps)
+
+
+def build_store (
+    graph_paths: typing.List[pathlib.Path],
+    store_path: pathlib.Path,
+    ) -> None:
+    """
+Load graph files, either TTL or compiled snapshots, into a new SQLite
+store, streaming their triples into the database.
+The store gets written to a temporary file then renamed, so that
+concurrent builds never open a partial store.
+
+    graph_paths:
+paths to the graph files
+
+    store_path:
+path for the SQLite store
+    """
+    # a hidden name, since the store may get built in the background
+    # while MkDocs collects the files in `docs_dir`
+    tmp_path = store_path.with_name(f".{store_path.name}.{os.getpid()}.tmp")
+
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    store = SQLiteStore()
+    store.open(str(tmp_path), create=True)
+    graph = rdflib.Graph(store=store)
+
+    for graph_path in graph_paths:
+        if is_snapshot(graph_path):
+            terms, triples, namespaces = read_snapshot(graph_path)
+
+            for prefix, iri in namespaces.items():
+                graph.bind(prefix, iri, override=False)
+
+            for i in range(0, len(triples), 3):
+                store.add((terms[triples[i]], terms[triples[i + 1]], terms[triples[i + 2]],))
+        else:
+            graph.parse(str(graph_path), format="ttl")
+
+    store.get_conn().execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source', ?)", (_source_stamp(graph_paths),))
+    store.close()
+
+    os.replace(tmp_path, store_path)
+
+
+def is_store_current (
+    graph_paths: typing.List[pathlib.Path],
+    store_path: pathlib.Path,
+    ) -> bool:
+    """
+Check whether a SQLite store was built from the current versions of
+the graph files.
+
+    graph_paths:
+paths to the graph files
+
+    store_path:
+path to the SQLite store
+
+    returns:
+boolean flag, for whether the store can be used as-is
+    """
+    if not store_path.exists():
+        return False
+
+    store = SQLiteStore(str(store_path))
+
+    try:
+        row = store.get_conn().execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        store.close()
+
+    return row is not None and row[0] == _source_stamp(graph_paths)
+
+
+def load_store (
+    graph_paths: typing.List[pathlib.Path],
+    store_path: pathlib.Path,
+    ) -> kglab.KnowledgeGraph:
+    """
+Open a KG backed by a read-only SQLite store, first building the store
+if it is missing or older than any of the graph files.
+
+    graph_paths:
+paths to the graph files
+
+    store_path:
+path to the SQLite store
+
+    returns:
+KG backed by the store
+    """
+    if not is_store_current(graph_paths, store_path):
+        build_store(graph_paths, store_path)
+
+    store = SQLiteStore(str(store_path))
+    graph = rdflib.Graph(store=store)
+
+    return kglab.KnowledgeGraph(
+        import_graph=graph,
+        namespaces={ prefix: str(iri) for prefix, iri in store.namespaces() },
+        )
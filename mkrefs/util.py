@@ -3,33 +3,370 @@
 # see license https://github.com/DerwenAI/mkrefs#license-and-copyright
 
 from collections import defaultdict
+import concurrent.futures
+import hashlib
+import json
+import os
 import re
+import sys
 import typing
+import weakref
 
 import jinja2  # type: ignore # pylint: disable=E0401
 import kglab
+import mkdocs.structure.files  # type: ignore  # pylint: disable=E0401
+import mkdocs.structure.nav  # type: ignore  # pylint: disable=E0401
 import pathlib
 import pandas as pd  # type: ignore # pylint: disable=E0401
+import rdflib  # type: ignore  # pylint: disable=E0401
 
+from .snapshot import is_snapshot, load_snapshot, read_snapshot, save_snapshot
+from .store import load_store
 
-def load_kg (
+
+def get_cache_dir () -> pathlib.Path:
+    """
+Get the directory used to cache intermediate results between builds,
+which can be set through the `MKREFS_CACHE_DIR` environment variable.
+
+    returns:
+path to the cache directory, which gets created if needed
+    """
+    cache_dir = os.environ.get("MKREFS_CACHE_DIR")
+
+    if cache_dir:
+        path = pathlib.Path(cache_dir)
+    else:
+        path = pathlib.Path(os.environ.get("XDG_CACHE_HOME", pathlib.Path.home() / ".cache")) / "mkrefs"
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def get_graph_paths (
+    local_config: dict,
+    component: str,
+    docs_dir: pathlib.Path,
+    ) -> typing.List[pathlib.Path]:
+    """
+Resolve the `graph` parameter of a component, which may be a file
+name, a glob pattern, or a list of these.
+
+    local_config:
+local configuration
+
+    component:
+MkRefs component name, e.g., `"glossary"`
+
+    docs_dir:
+base directory for relative paths in the local configuration
+
+    returns:
+list of paths to the graph files
+    """
+    patterns = local_config[component]["graph"]
+
+    if not isinstance(patterns, list):
+        patterns = [ patterns ]
+
+    paths: typing.List[pathlib.Path] = []
+
+    for pattern in patterns:
+        if any(c in pattern for c in "*?["):
+            matches = sorted(docs_dir.glob(pattern))
+
+            if len(matches) < 1:
+                raise FileNotFoundError(f"no graph files match `{pattern}`")
+
+            paths.extend(matches)
+        else:
+            paths.append(docs_dir / pattern)
+
+    return paths
+
+
+def parse_graph_file (
     path: pathlib.Path,
-    ) -> kglab.KnowledgeGraph:
+    ) -> rdflib.Graph:
     """
-Load a KG from an RDF file in "Turtle" (TTL) format.
+Parse one graph file, either a compiled snapshot or an RDF file in the
+format given by its file extension, which defaults to "Turtle" (TTL).
 
     path:
-path to the RDF file
+path to the graph file
+
+    returns:
+parsed RDF graph
+    """
+    if is_snapshot(path):
+        return load_snapshot(path).rdf_graph()
+
+    graph = rdflib.Graph()
+    graph.parse(str(path), format=rdflib.util.guess_format(str(path)) or "turtle")
+
+    return graph
+
+
+def cache_graph_file (
+    path: pathlib.Path,
+    ) -> pathlib.Path:
+    """
+Parse one graph file into a compiled snapshot in the cache
+directory, unless a snapshot for the current version of the file has
+already been cached.
+This gets called in worker processes, to parse several files in
+parallel.
+
+    path:
+path to the graph file
+
+    returns:
+path to the cached snapshot
+    """
+    if is_snapshot(path):
+        return path
+
+    stat = path.stat()
+    path_key = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+    version_key = hashlib.sha1(f"{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")).hexdigest()[:16]
+
+    cache_dir = get_cache_dir()
+    snapshot_path = cache_dir / f"{path_key}-{version_key}.kgc"
+
+    if not snapshot_path.exists():
+        graph = parse_graph_file(path)
+
+        tmp_path = snapshot_path.with_name(snapshot_path.name + f".{os.getpid()}.tmp")
+        save_snapshot(graph, tmp_path)
+        os.replace(tmp_path, snapshot_path)
+
+        # remove snapshots of the previous versions of the file
+        for stale_path in cache_dir.glob(f"{path_key}-*.kgc"):
+            if stale_path != snapshot_path:
+                stale_path.unlink()
+
+    return snapshot_path
+
+
+def load_kg_files (
+    paths: typing.List[pathlib.Path],
+    ) -> kglab.KnowledgeGraph:
+    """
+Load a KG from several graph files, each either TTL or a compiled
+snapshot.
+The files get parsed in parallel worker processes, then merged into
+one graph.
+Parse results get cached per file, so after a change only the changed
+files need to be parsed again.
+
+    paths:
+paths to the graph files
 
     returns:
 populated KG
     """
-    kg = kglab.KnowledgeGraph()
-    kg.load_rdf(path, format="ttl")
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        snapshot_paths = list(executor.map(cache_graph_file, paths))
+
+    snapshots = [ read_snapshot(snapshot_path) for snapshot_path in snapshot_paths ]
+    namespaces: dict = {}
+
+    # the first file which binds either a prefix or a namespace wins,
+    # since `rdflib` allows only one prefix per namespace
+    for _, _, file_ns in snapshots:
+        for prefix, iri in file_ns.items():
+            if prefix not in namespaces and iri not in namespaces.values():
+                namespaces[prefix] = iri
+
+    kg = kglab.KnowledgeGraph(namespaces=namespaces)
+    graph = kg.rdf_graph()
+
+    for terms, triples, _ in snapshots:
+        graph.addN(
+            (terms[triples[i]], terms[triples[i + 1]], terms[triples[i + 2]], graph,)
+            for i in range(0, len(triples), 3)
+        )
 
     return kg
 
 
+def load_kg (
+    path: typing.Union[pathlib.Path, typing.List[pathlib.Path]],
+    store_path: typing.Optional[pathlib.Path] = None,
+    ) -> kglab.KnowledgeGraph:
+    """
+Load a KG from an RDF file in "Turtle" (TTL) format, or from a compiled
+graph snapshot, or from a list of these.
+
+    path:
+path to the RDF file, or a list of paths
+
+    store_path:
+optional, path to a persistent SQLite store for the graph, which gets built on first use, then opened read-only instead of loading the whole graph into memory
+
+    returns:
+populated KG
+    """
+    paths = path if isinstance(path, list) else [ path ]
+
+    if store_path is not None:
+        return load_store(paths, store_path)
+
+    if len(paths) == 1 and is_snapshot(paths[0]):
+        return load_snapshot(paths[0])
+
+    # TTL files get parsed in worker processes, since parsing holds the
+    # GIL, which would block any other loads or rendering meanwhile
+    return load_kg_files(paths)
+
+
+def get_store_path (
+    local_config: dict,
+    component: str,
+    docs_dir: pathlib.Path,
+    ) -> typing.Optional[pathlib.Path]:
+    """
+Get the path for the optional persistent store of a component's graph.
+
+    local_config:
+local configuration
+
+    component:
+MkRefs component name, e.g., `"glossary"`
+
+    docs_dir:
+base directory for relative paths in the local configuration
+
+    returns:
+path to the SQLite store, or `None` if the graph gets loaded into memory
+    """
+    store = local_config[component].get("store")
+
+    if not store:
+        return None
+
+    return docs_dir / store
+
+
+_KG_VERSIONS: "weakref.WeakKeyDictionary[kglab.KnowledgeGraph, int]" = weakref.WeakKeyDictionary()
+
+
+def get_kg_version (
+    kg: kglab.KnowledgeGraph,
+    ) -> int:
+    """
+Get the version of a loaded KG, which counts the times it has been
+updated in place, so that any indexes derived from it can tell when to
+get rebuilt.
+
+    kg:
+the KG graph object
+
+    returns:
+version counter, starting at `0`
+    """
+    return _KG_VERSIONS.get(kg, 0)
+
+
+def bump_kg_version (
+    kg: kglab.KnowledgeGraph,
+    ) -> None:
+    """
+Increment the version of a KG which has been modified in place.
+
+    kg:
+the KG graph object
+    """
+    _KG_VERSIONS[kg] = get_kg_version(kg) + 1
+
+
+def update_kg (
+    kg: kglab.KnowledgeGraph,
+    path: pathlib.Path,
+    ) -> typing.Tuple[int, int]:
+    """
+Update a loaded KG in place from a changed graph file, either a compiled
+snapshot or an RDF file such as "Turtle" (TTL), by applying the difference in triples rather than replacing
+the graph, so that any unchanged content stays loaded.
+Note that blank nodes get new identifiers on each parse, so triples
+with blank nodes always get replaced.
+
+    kg:
+the KG graph object to update
+
+    path:
+path to the changed graph file
+
+    returns:
+a tuple of the counts of added and removed triples
+    """
+    new_graph = parse_graph_file(path)
+
+    old_graph = kg.rdf_graph()
+    old_triples = set(old_graph)
+    new_triples = set(new_graph)
+
+    removed = old_triples - new_triples
+    added = new_triples - old_triples
+
+    for triple in removed:
+        old_graph.remove(triple)
+
+    for triple in added:
+        old_graph.add(triple)
+
+    if added or removed:
+        bump_kg_version(kg)
+
+    return len(added), len(removed)
+
+
+def extract_jsonld (
+    kg: kglab.KnowledgeGraph,
+    subjects: typing.Iterable[str],
+    ) -> typing.List[dict]:
+    """
+Extract the content for the given subjects as JSON-LD, serializing
+only their triples instead of the whole graph, which also avoids
+materializing a graph backed by a persistent store.
+
+    kg:
+the KG graph object
+
+    subjects:
+IRIs of the subjects to extract
+
+    returns:
+list of the JSON-LD `@graph` items
+    """
+    sub_kg = kglab.KnowledgeGraph(
+        namespaces=kg.get_ns_dict(),
+        language=kg.language,
+        )
+
+    graph = kg.rdf_graph()
+    sub_graph = sub_kg.rdf_graph()
+
+    for subject in set(subjects):
+        for triple in graph.triples((rdflib.URIRef(subject), None, None,)):
+            sub_graph.add(triple)
+
+    # serialize the same way as `save_jsonld()`, without a temporary file
+    doc = json.loads(sub_graph.serialize(
+        format="json-ld",
+        context=sub_kg.get_context(),
+        indent=2,
+        encoding="utf-8",
+        ))
+
+    if "@graph" in doc:
+        return doc["@graph"]
+
+    doc.pop("@context", None)
+    return [ doc ] if doc else []
+
+
 def get_jinja2_template (
     template_file: str,
     dir: str,
@@ -55,11 +392,17 @@ loaded Jinja2 template
     return env.get_template(template_file)
 
 
+_ABBREV_KEYS: typing.Dict[str, str] = {}
+_ABBREV_KEYS_MAX: int = 65536
+
+
 def abbrev_key (
     key: str,
     ) -> str:
     """
-Abbreviate the IRI, if any
+Abbreviate the IRI, if any.
+Results get memoized and interned, since the same few predicate IRIs
+repeat throughout the JSON-LD content.
 
     key:
 string content to abbreviate
@@ -67,46 +410,98 @@ string content to abbreviate
     returns:
 abbreviated IRI content
     """
-    if key.startswith("@"):
-        return key[1:]
+    abbrev = _ABBREV_KEYS.get(key)
+
+    if abbrev is None:
+        if key.startswith("@"):
+            abbrev = key[1:]
+        else:
+            abbrev = key.split(":")[-1]
+            abbrev = abbrev.split("/")[-1]
+            abbrev = abbrev.split("#")[-1]
+
+        abbrev = sys.intern(abbrev)
+
+        if len(_ABBREV_KEYS) >= _ABBREV_KEYS_MAX:
+            _ABBREV_KEYS.clear()
 
-    key = key.split(":")[-1]
-    key = key.split("/")[-1]
-    key = key.split("#")[-1]
+        _ABBREV_KEYS[key] = abbrev
 
-    return key
+    return abbrev
 
 
-def abbrev_iri (
+def abbrev_iri (  # pylint: disable=R0912
     item: typing.Any,
+    in_place: bool = False,
     ) -> typing.Any:
     """
 Abbreviate the IRIs in JSON-LD graph content, so that Jinja2 templates
 can use it.
+The traversal is iterative, so that deeply nested content cannot reach
+the recursion limit.
 
     item:
 scalar, list, or dictionary to iterate through
 
+    in_place:
+optional, modify the dictionaries in place instead of copying the whole structure, e.g., for content which has just been parsed from JSON-LD
+
     returns:
 data with abbreviated IRIs
     """
-    if isinstance(item, dict):
-        d = {
-            abbrev_key(k): abbrev_iri(v)
-            for k, v in item.items()
-            }
-
-        return d
-
-    if isinstance(item, list):
-        l = [
-            abbrev_iri(x)
-            for x in item
-            ]
-
-        return l
-
-    return item
+    if not isinstance(item, (dict, list)):
+        return item
+
+    root: typing.Any
+
+    if in_place:
+        root = item
+    else:
+        root = {} if isinstance(item, dict) else []
+
+    keys = _ABBREV_KEYS
+    stack: typing.List[typing.Tuple[typing.Any, typing.Any]] = [ (item, root) ]
+    child: typing.Any
+
+    while stack:
+        src, dst = stack.pop()
+
+        if isinstance(src, dict):
+            pairs = list(src.items())
+
+            if in_place:
+                dst.clear()
+
+            for k, v in pairs:
+                if isinstance(v, dict):
+                    child = v if in_place else {}
+                    stack.append((v, child))
+                    v = child
+                elif isinstance(v, list):
+                    child = v if in_place else []
+                    stack.append((v, child))
+                    v = child
+
+                abbrev = keys.get(k)
+                dst[abbrev if abbrev is not None else abbrev_key(k)] = v
+        elif in_place:
+            for v in src:
+                if isinstance(v, (dict, list)):
+                    stack.append((v, v))
+        else:
+            for v in src:
+                if isinstance(v, dict):
+                    child = {}
+                    stack.append((v, child))
+                    v = child
+                elif isinstance(v, list):
+                    child = []
+                    stack.append((v, child))
+                    v = child
+
+                dst.append(v)
+
+    return root
 
 
 def denorm_entity (
@@ -188,6 +583,23 @@ SPARQL query
 a tuple of the list relation to replace, and the identifier values
     """
     df = kg.query_as_df(sparql, simplify=False, pythonify=True)
+
+    return df_item_list(df)
+
+
+def df_item_list (
+    df: pd.DataFrame,
+    ) -> typing.Tuple[str, dict]:
+    """
+Collect a list of entity identifiers to substitute in JSON-LD, from the
+result set of a query.
+
+    df:
+SPARQL query result set, as a dataframe with the entity in its first column and the list values in its second column
+
+    returns:
+a tuple of the list relation to replace, and the identifier values
+    """
     list_name = df.columns[1]
 
     list_ids: typing.Dict[str, list] = defaultdict(list)
@@ -229,3 +641,371 @@ rendered Markdown
         f.write(template.render(groups=groups))
 
     return template.render(groups=groups)
+
+
+def split_sections (
+    template: jinja2.Template,
+    groups: typing.Dict[str, list],
+    text: str,
+    ) -> typing.Optional[dict]:
+    """
+Split the rendered output of a template which loops over `groups` into
+the text of each group, plus the text before and after the loop, by
+rendering each group alone and comparing it with the output for no
+groups.
+Later builds can then re-render only some of the groups and splice
+them in.
+
+    template:
+the Jinja2 template
+
+    groups:
+content data, grouped by key in sorted order
+
+    text:
+the output of the template for all of the groups
+
+    returns:
+the `prefix` and `suffix` text around the `letters` sections, keyed by group; or `None` if the output cannot be split consistently
+    """
+    frame = template.render(groups={})
+    sections: typing.Dict[str, str] = {}
+    prefix: typing.Optional[str] = None
+    suffix = ""
+
+    for key, item_list in groups.items():
+        group_text = template.render(groups={ key: item_list })
+
+        if prefix is None:
+            # locate where the loop output gets inserted into the frame
+            pos = len(os.path.commonprefix([ frame, group_text ]))
+
+            while pos > 0 and not group_text.endswith(frame[pos:]):
+                pos -= 1
+
+            prefix = frame[:pos]
+            suffix = frame[pos:]
+
+        if not group_text.startswith(prefix) or not group_text.endswith(suffix) or len(group_text) < len(frame):
+            return None
+
+        sections[key] = group_text[len(prefix):len(group_text) - len(suffix)]
+
+    if prefix is None:
+        prefix = frame
+
+    if prefix + "".join(sections[key] for key in sorted(sections.keys())) + suffix != text:
+        return None
+
+    return {
+        "prefix": prefix,
+        "suffix": suffix,
+        "letters": sections,
+    }
+
+
+_FENCE_PAT = re.compile(r"^\s*(`{3,}|~{3,})")
+_PROTECTED_LINE_PAT = re.compile(r"^( {0,3}#|\s*(!!!|\?\?\?|===|\[[^\]]+\]:))")
+
+# list items, admonitions, and content tabs, whose content gets indented
+_CONTAINER_PAT = re.compile(r"^( {0,3}([-*+]|\d+[.)])\s|\s*(!!!|\?\?\?|===))")
+
+# HTML blocks which run until their closing tag, or else until a blank line
+_HTML_RAW_PAT = re.compile(r"^ {0,3}<(pre|script|style|textarea)(\s|>|$)", re.IGNORECASE)
+_HTML_BLOCK_PAT = re.compile(
+    r"^ {0,3}</?(address|article|aside|blockquote|center|details|dialog|div|dl|fieldset|figcaption|figure|footer|form|h[1-6]|header|hr|iframe|main|nav|ol|p|section|summary|table|tbody|td|tfoot|th|thead|tr|ul)(\s|/?>|$)",
+    re.IGNORECASE,
+    )
+
+_PROTECTED_INLINE_PAT = re.compile(
+    r"(`+).*?\1"                    # inline code
+    r"|<!--.*?-->"                   # HTML comments
+    r"|<a\b[^>]*>.*?</a>"            # HTML links
+    r"|<[^>\n]+>"                    # other HTML tags and autolinks
+    r"|!?\[[^\]\n]*\]\([^)\n]*\)"  # inline links and images
+    r"|!?\[[^\]\n]*\]\[[^\]\n]*\]"  # reference links
+    r"|\[[^\]\n]*\]",                # shortcut links and citation markers
+    re.DOTALL | re.IGNORECASE,
+    )
+
+
+def _split_inline (
+    text: str,
+    segments: typing.List[typing.Tuple[bool, str]],
+    ) -> None:
+    """
+Split a run of prose lines at the protected inline elements.
+
+    text:
+Markdown source text, outside of any protected lines or code blocks
+
+    segments:
+list of `(is_prose, text)` segments to extend
+    """
+    pos = 0
+
+    for match in _PROTECTED_INLINE_PAT.finditer(text):
+        if match.start() > pos:
+            segments.append((True, text[pos:match.start()],))
+
+        segments.append((False, match.group(0),))
+        pos = match.end()
+
+    if pos < len(text):
+        segments.append((True, text[pos:],))
+
+
+def _get_indent (
+    line: str,
+    ) -> int:
+    """
+Measure the indentation of a line, with tabs expanded to 4 columns.
+
+    line:
+line of Markdown source text
+
+    returns:
+number of columns of leading whitespace
+    """
+    prefix = line[:len(line) - len(line.lstrip(" \t"))]
+
+    return len(prefix.expandtabs(4))
+
+
+def _get_html_end (
+    line: str,
+    ) -> typing.Optional[str]:
+    """
+Determine whether a line starts an HTML block, and how that block ends.
+
+    line:
+line of Markdown source text
+
+    returns:
+the closing tag which ends the block, e.g., `"</pre>"`, or an empty string if the block ends at a blank line, or `None` if the line does not start an HTML block
+    """
+    match = _HTML_RAW_PAT.match(line)
+
+    if match:
+        html_end = f"</{match.group(1).lower()}>"
+
+        # the block may also end on the same line
+        return None if html_end in line.lower() else html_end
+
+    if _HTML_BLOCK_PAT.match(line):
+        return ""
+
+    return None
+
+
+def split_markdown (  # pylint: disable=R0912
+    markdown: str,
+    ) -> typing.List[typing.Tuple[bool, str]]:
+    """
+Split Markdown source text into the segments of prose which may get
+rewritten, e.g., to add links, and the protected segments which must
+be left unchanged: fenced and indented code blocks, HTML blocks, inline
+code, headings, admonition titles, link reference definitions, existing
+links, bracketed text, and HTML tags or comments.
+The segments, joined in order, reproduce the input exactly.
+
+Indented code blocks start after a blank line, with 4 columns of
+indentation, or 8 within list items, admonitions, and content tabs,
+since their content gets indented by 4 columns.
+
+    markdown:
+Markdown source text
+
+    returns:
+list of `(is_prose, text)` segments
+    """
+    segments: typing.List[typing.Tuple[bool, str]] = []
+    prose: typing.List[str] = []
+    fence: typing.Optional[str] = None
+    html_end: typing.Optional[str] = None
+    in_code = False
+    in_container = False
+    after_blank = True
+
+    for line in markdown.splitlines(keepends=True):
+        is_blank = not line.strip()
+        indent = _get_indent(line)
+        protected = True
+
+        if fence is not None:
+            # inside a fenced code block, until the matching fence
+            match = _FENCE_PAT.match(line)
+
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+        elif html_end is not None:
+            # inside an HTML block, until its closing tag or a blank line
+            if (html_end and html_end in line.lower()) or (not html_end and is_blank):
+                html_end = None
+        elif in_code and is_blank:
+            # blank lines do not end an indented code block
+            pass
+        elif not is_blank and (after_blank or in_code) and indent >= (8 if in_container else 4):
+            in_code = True
+        else:
+            in_code = False
+
+            if not is_blank and after_blank and indent < 4:
+                in_container = False
+
+            if _CONTAINER_PAT.match(line):
+                in_container = True
+
+            match = _FENCE_PAT.match(line)
+            html_end = _get_html_end(line)
+
+            if match:
+                fence = match.group(1)
+
+            protected = bool(match) or html_end is not None or bool(_PROTECTED_LINE_PAT.match(line))
+
+        if protected:
+            _split_inline("".join(prose), segments)
+            prose = []
+            segments.append((False, line,))
+        else:
+            prose.append(line)
+
+        after_blank = is_blank
+
+    _split_inline("".join(prose), segments)
+
+    return segments
+
+
+def render_pages (
+    jobs: typing.List[typing.Tuple[pathlib.Path, pathlib.Path, dict]],
+    ) -> typing.List[str]:
+    """
+Render the Markdown for several reference pages concurrently, in a
+pool of worker processes, since Jinja2 rendering is CPU-bound.
+
+    jobs:
+list of `(template_path, markdown_path, groups)` tuples, each as the parameters for `render_reference()`
+
+    returns:
+list of rendered Markdown, in the same order as the jobs
+    """
+    if len(jobs) < 2:
+        return [
+            render_reference(template_path, markdown_path, groups)
+            for template_path, markdown_path, groups in jobs
+            ]
+
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        return list(executor.map(render_reference, *zip(*jobs)))
+
+
+def prune_pages (
+    page_dir: pathlib.Path,
+    current: typing.Iterable[pathlib.Path],
+    ) -> typing.List[pathlib.Path]:
+    """
+Remove the pages in a directory which a previous build generated, but
+which the current build no longer generates, e.g., for deleted classes.
+The generated pages get recorded in a manifest in the cache directory,
+so that any other pages in the directory, e.g., hand-written ones, never
+get removed.
+
+    page_dir:
+directory of the generated pages
+
+    current:
+paths of the pages which the current build generated
+
+    returns:
+paths of the removed pages
+    """
+    dir_key = hashlib.sha1(str(page_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+    manifest_path = get_cache_dir() / f"pages-{dir_key}.json"
+    current_names = sorted({ path.name for path in current if path.parent == page_dir })
+
+    try:
+        previous_names = set(json.loads(manifest_path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        previous_names = set()
+
+    removed: typing.List[pathlib.Path] = []
+
+    for name in sorted(previous_names.difference(current_names)):
+        stale_path = page_dir / name
+
+        if stale_path.exists():
+            stale_path.unlink()
+            removed.append(stale_path)
+
+    tmp_path = manifest_path.with_name(manifest_path.name + f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(current_names), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+    return removed
+
+
+def extend_nav (
+    nav: mkdocs.structure.nav.Navigation,
+    anchor_file: mkdocs.structure.files.File,
+    extra_files: typing.List[mkdocs.structure.files.File],
+    ) -> mkdocs.structure.nav.Navigation:
+    """
+Add the pages for generated files into the site navigation, as a
+section which replaces the page of the given anchor file, then
+re-link the previous/next page sequence.
+If the anchor page does not appear in the `nav` configuration, the
+navigation is left unchanged.
+
+    nav:
+the global navigation object
+
+    anchor_file:
+generated file for the top-level page of a MkRefs component, e.g., `ref.md`
+
+    extra_files:
+generated files to nest under the anchor page
+
+    returns:
+the modified global navigation object
+    """
+    anchor_page = anchor_file.page
+
+    # the navigation section holds any kind of structure item
+    extra_pages: typing.List[typing.Any] = [
+        file.page
+        for file in extra_files
+        if file.page is not None
+        ]
+
+    if anchor_page is None or len(extra_pages) < 1 or anchor_page not in nav.pages:
+        return nav
+
+    if anchor_page.parent is not None:
+        siblings = anchor_page.parent.children
+    else:
+        siblings = nav.items
+
+    section = mkdocs.structure.nav.Section(anchor_page.title, [ anchor_page ] + extra_pages)
+    section.parent = anchor_page.parent
+    siblings[siblings.index(anchor_page)] = section
+
+    for page in section.children:
+        page.parent = section
+
+    pos = nav.pages.index(anchor_page) + 1
+    nav.pages[pos:pos] = extra_pages
+
+    prev_page = None
+
+    for page in nav.pages:
+        page.previous_page = prev_page
+        page.next_page = None
+
+        if prev_page is not None:
+            prev_page.next_page = page
+
+        prev_page = page
+
+    return nav
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Validation of the graphs for the glossary and bibliography, which checks
+the invariants that rendering relies on before any of the pages get
+rendered.
+
+Each of the configured queries runs once, the entries get indexed by
+identifier, label, and citekey, then one sweep over the rows of the
+other queries checks every reference against those indexes, while any
+other lookups use the indexes of the graph itself.
+"""
+
+from collections import defaultdict
+import typing
+
+import kglab
+import rdflib  # type: ignore  # pylint: disable=E0401
+
+from .glossary import GlossaryQueries
+
+
+def _query_rows (
+    kg: kglab.KnowledgeGraph,
+    sparql: str,
+    ) -> typing.Tuple[typing.List[str], typing.List[dict]]:
+    """
+Run a SPARQL query, keeping its results as RDF terms.
+
+    kg:
+the KG graph object
+
+    sparql:
+SPARQL query
+
+    returns:
+a tuple of the result columns, and the rows keyed by column
+    """
+    result = kg.rdf_graph().query(sparql)
+
+    return [ str(var) for var in result.vars ], [ row.asdict() for row in result ]
+
+
+def _is_described (
+    graph: rdflib.Graph,
+    term: typing.Any,
+    ) -> bool:
+    """
+Determine whether the graph describes a node, i.e., whether the node is
+the subject of any triple.
+
+    graph:
+the RDF graph
+
+    term:
+RDF term for the node
+
+    returns:
+boolean flag, for whether the node has any properties in the graph
+    """
+    return isinstance(term, (rdflib.URIRef, rdflib.BNode)) and (term, None, None) in graph
+
+
+def _find_unlisted (
+    graph: rdflib.Graph,
+    entry_ids: typing.Iterable[str],
+    ) -> typing.List[str]:
+    """
+List the nodes which have the same types as the entries, but which are
+not entries themselves, e.g., topics which the `entry` query missed
+since they have no label.
+
+    graph:
+the RDF graph
+
+    entry_ids:
+identifiers of the entries
+
+    returns:
+identifiers of the unlisted nodes, sorted
+    """
+    entries = set(entry_ids)
+    types: typing.Set[typing.Any] = set()
+
+    for entry_id in entries:
+        types.update(graph.objects(rdflib.URIRef(entry_id), rdflib.RDF.type))
+
+    return sorted({
+        str(node)
+        for node_type in types
+        for node in graph.subjects(rdflib.RDF.type, node_type)
+        if isinstance(node, rdflib.URIRef) and str(node) not in entries
+        })
+
+
+def _validate_biblio_links (
+    kg: kglab.KnowledgeGraph,
+    queries: dict,
+    entry_keys: typing.Dict[str, typing.Set[str]],
+    ) -> typing.List[typing.Tuple[str, str]]:
+    """
+Check that each publisher referenced by a bibliography entry
+gets described in the graph, since the linked entities get substituted
+from their JSON-LD.
+
+    kg:
+the KG graph object
+
+    queries:
+user-configurable SPARQL queries for the bibliography
+
+    entry_keys:
+citekeys of each bibliography entry, keyed by identifier
+
+    returns:
+the issues found, each as a level of either `"ERROR"` or `"WARNING"` with a message
+    """
+    issues: typing.List[typing.Tuple[str, str]] = []
+    graph = kg.rdf_graph()
+
+    for name in [ "entry_publisher" ]:
+        if name not in queries:
+            continue
+
+        columns, rows = _query_rows(kg, queries[name])
+
+        for row in rows:
+            entry_id = str(row[columns[0]])
+            value = row.get(columns[1])
+
+            if entry_id not in entry_keys:
+                issues.append(("WARNING", f"biblio query `{name}` refers to `{entry_id}`, which is not a biblio entry",))
+            elif not _is_described(graph, value):
+                issues.append(("ERROR", f"biblio entry `{entry_id}` has a dangling `{columns[1]}` reference to `{value}`",))
+
+    return issues
+
+
+def validate_biblio (
+    local_config: dict,
+    kg: kglab.KnowledgeGraph,
+    ) -> typing.Tuple[typing.List[typing.Tuple[str, str]], typing.Set[str]]:
+    """
+Check the invariants of the bibliography: each entry has exactly one
+citekey, no citekey gets used by more than one entry, and each author
+and publisher referenced by an entry gets described in the graph.
+
+    local_config:
+local configuration, including user-configurable SPARQL queries
+
+    kg:
+the KG graph object
+
+    returns:
+a tuple of the issues found, each as a level of either `"ERROR"` or `"WARNING"` with a message, and the set of citekeys
+    """
+    issues: typing.List[typing.Tuple[str, str]] = []
+    queries = local_config["biblio"]["queries"]
+    graph = kg.rdf_graph()
+
+    columns, rows = _query_rows(kg, queries["entry"])
+
+    if "citeKey" not in columns:
+        issues.append(("ERROR", "biblio query `entry` must select `?citeKey`",))
+        return issues, set()
+
+    entry_col = columns[0]
+    entry_keys: typing.Dict[str, typing.Set[str]] = {}
+    key_entries: typing.Dict[str, typing.Set[str]] = defaultdict(set)
+
+    for row in rows:
+        entry_id = str(row[entry_col])
+        citekey = str(row.get("citeKey") or "").strip()
+        entry_keys.setdefault(entry_id, set())
+
+        if citekey:
+            entry_keys[entry_id].add(citekey)
+            key_entries[citekey].add(entry_id)
+
+    for entry_id, citekeys in entry_keys.items():
+        if len(citekeys) < 1:
+            issues.append(("ERROR", f"biblio entry `{entry_id}` has no citekey",))
+        elif len(citekeys) > 1:
+            issues.append(("ERROR", f"biblio entry `{entry_id}` has several citekeys: {', '.join(sorted(citekeys))}",))
+
+    for citekey, entry_ids in key_entries.items():
+        if len(entry_ids) > 1:
+            issues.append(("ERROR", f"biblio citekey `{citekey}` is used by several entries: {', '.join(sorted(entry_ids))}",))
+
+    for entry_id in _find_unlisted(graph, entry_keys.keys()):
+        issues.append(("WARNING", f"biblio entry `{entry_id}` is missing from the `entry` query, e.g., since it has no citekey",))
+
+    issues.extend(_validate_biblio_links(kg, queries, entry_keys))
+
+    return issues, set(key_entries.keys())
+
+
+def _validate_glossary_links (  # pylint: disable=R0913
+    queries: GlossaryQueries,
+    graph: rdflib.Graph,
+    entry_ids: typing.Set[str],
+    unlisted: typing.Set[str],
+    citekeys: typing.Optional[typing.Set[str]],
+    ) -> typing.List[typing.Tuple[str, str]]:
+    """
+Check that the synonyms, references, hypernyms, and citations of the
+glossary entries refer to glossary entries, external IRIs, or
+bibliography entries, respectively.
+
+    queries:
+results of the glossary queries
+
+    graph:
+the RDF graph
+
+    entry_ids:
+identifiers of the glossary entries
+
+    unlisted:
+identifiers of the nodes which have the same types as the entries, but which are not entries themselves
+
+    citekeys:
+optional, the citekeys of the bibliography, to resolve the citations
+
+    returns:
+the issues found, each as a level of either `"ERROR"` or `"WARNING"` with a message
+    """
+    issues: typing.List[typing.Tuple[str, str]] = []
+
+    for name in [ "entry_syn", "entry_ref", "entry_hyp", "entry_cite" ]:
+        columns, rows = queries.get_rows(name)
+
+        for row in rows:
+            entry_id = str(row[columns[0]])
+            value = row.get(columns[1])
+
+            if entry_id not in entry_ids:
+                issues.append(("ERROR", f"glossary query `{name}` has a dangling reference from `{entry_id}`, which is not a glossary entry",))
+
+            # hypernyms which are not entries get linked as external
+            # IRIs, which only works when the graph does not describe them
+            elif name == "entry_hyp" and str(value) not in entry_ids and (str(value) in unlisted or _is_described(graph, value)):
+                issues.append(("ERROR", f"glossary entry `{entry_id}` has a dangling hypernym `{value}`, which is not a glossary entry",))
+
+            elif name == "entry_cite" and citekeys is not None and str(value) not in citekeys:
+                issues.append(("ERROR", f"glossary entry `{entry_id}` cites `{value}`, which is not a biblio entry",))
+
+    return issues
+
+
+def validate_glossary (
+    local_config: dict,
+    kg: kglab.KnowledgeGraph,
+    queries: typing.Optional[GlossaryQueries] = None,
+    citekeys: typing.Optional[typing.Set[str]] = None,
+    ) -> typing.List[typing.Tuple[str, str]]:
+    """
+Check the invariants of the glossary: each entry has a label which no
+other entry uses, the synonyms and hypernyms refer to glossary entries
+or else to external IRIs, and the citations resolve to bibliography
+entries.
+
+    local_config:
+local configuration, including user-configurable SPARQL queries
+
+    kg:
+the KG graph object
+
+    queries:
+optional, results of the glossary queries, to share with the rendering
+
+    citekeys:
+optional, the citekeys of the bibliography, to resolve the citations
+
+    returns:
+the issues found, each as a level of either `"ERROR"` or `"WARNING"` with a message
+    """
+    issues: typing.List[typing.Tuple[str, str]] = []
+    graph = kg.rdf_graph()
+
+    if queries is None:
+        queries = GlossaryQueries(local_config, kg)
+
+    columns, rows = queries.get_rows("entry")
+
+    if "label" not in columns:
+        issues.append(("ERROR", "glossary query `entry` must select `?label`",))
+        return issues
+
+    entry_col = columns[0]
+    entry_labels: typing.Dict[str, typing.Set[str]] = {}
+    label_entries: typing.Dict[typing.Tuple[str, typing.Optional[str]], typing.Set[str]] = defaultdict(set)
+
+    for row in rows:
+        entry_id = str(row[entry_col])
+        label = row.get("label")
+        entry_labels.setdefault(entry_id, set())
+
+        if label is not None and str(label).strip():
+            entry_labels[entry_id].add(str(label))
+            label_entries[(str(label), getattr(label, "language", None),)].add(entry_id)
+
+    for entry_id, labels in entry_labels.items():
+        if len(labels) < 1:
+            issues.append(("ERROR", f"glossary entry `{entry_id}` has no label",))
+
+    for (label, _), entry_ids in label_entries.items():
+        if len(entry_ids) > 1:
+            issues.append(("ERROR", f"glossary label `{label}` is used by several entries: {', '.join(sorted(entry_ids))}",))
+
+    unlisted = set(_find_unlisted(graph, entry_labels.keys()))
+
+    for entry_id in sorted(unlisted):
+        issues.append(("WARNING", f"glossary entry `{entry_id}` is missing from the `entry` query, e.g., since it has no label",))
+
+    issues.extend(_validate_glossary_links(queries, graph, set(entry_labels), unlisted, citekeys))
+
+    return issues
+
+
+def validate_graphs (
+    local_config: dict,
+    glossary_kg: typing.Optional[kglab.KnowledgeGraph],
+    biblio_kg: typing.Optional[kglab.KnowledgeGraph],
+    queries: typing.Optional[GlossaryQueries] = None,
+    ) -> typing.List[typing.Tuple[str, str]]:
+    """
+Check the invariants of the glossary and bibliography graphs, for the
+components which are configured.
+
+    local_config:
+local configuration, including user-configurable SPARQL queries
+
+    glossary_kg:
+the KG graph object for the glossary, or `None` when the glossary is not configured
+
+    biblio_kg:
+the KG graph object for the bibliography, or `None` when the bibliography is not configured
+
+    queries:
+optional, results of the glossary queries, to share with the rendering
+
+    returns:
+the issues found, each as a level of either `"ERROR"` or `"WARNING"` with a message
+    """
+    issues: typing.List[typing.Tuple[str, str]] = []
+    citekeys: typing.Optional[typing.Set[str]] = None
+
+    if biblio_kg is not None:
+        biblio_issues, citekeys = validate_biblio(local_config, biblio_kg)
+        issues.extend(biblio_issues)
+
+    if glossary_kg is not None:
+        issues.extend(validate_glossary(local_config, glossary_kg, queries, citekeys))
+
+    return issues
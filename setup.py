@@ -45,6 +45,7 @@ if __name__ == "__main__":
 
         python_requires = ">=3.6",
         packages = setuptools.find_packages(exclude=[ "docs" ]),
+        package_data = { "mkrefs": [ "lazy.js", "search.js" ] },
         install_requires = parse_requirements_file("requirements.txt"),
 
         entry_points = {
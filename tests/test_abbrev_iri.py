@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for the IRI abbreviation of JSON-LD content, comparing
+the memoized, iterative, and in-place paths of `abbrev_iri()` against
+the original recursive version on a large payload.
+"""
+
+import copy
+import typing
+
+from mkrefs.util import abbrev_iri
+
+
+def recursive_abbrev_key (
+    key: str,
+    ) -> str:
+    """
+The original `abbrev_key()`, without memoization.
+    """
+    if key.startswith("@"):
+        return key[1:]
+
+    key = key.split(":")[-1]
+    key = key.split("/")[-1]
+    key = key.split("#")[-1]
+
+    return key
+
+
+def recursive_abbrev_iri (
+    item: typing.Any,
+    ) -> typing.Any:
+    """
+The original recursive `abbrev_iri()`.
+    """
+    if isinstance(item, dict):
+        return {
+            recursive_abbrev_key(k): recursive_abbrev_iri(v)
+            for k, v in item.items()
+            }
+
+    if isinstance(item, list):
+        return [
+            recursive_abbrev_iri(x)
+            for x in item
+            ]
+
+    return item
+
+
+def make_payload (
+    count: int,
+    ) -> typing.List[dict]:
+    """
+Generate JSON-LD `@graph` items shaped like the glossary and
+bibliography content: typed entries with language-tagged literals,
+lists of linked entities, and nested authors.
+    """
+    return [
+        {
+            "@id": f"https://derwen.ai/ns/v1#topic_{i}",
+            "@type": [ "http://www.w3.org/2004/02/skos/core#Concept", "https://derwen.ai/ns/v1#Topic" ],
+            "http://www.w3.org/2004/02/skos/core#prefLabel": { "@language": "en", "@value": f"topic {i}" },
+            "http://www.w3.org/2004/02/skos/core#definition": { "@language": "en", "@value": f"definition of topic {i}" },
+            "http://www.w3.org/2004/02/skos/core#altLabel": [
+                { "@language": "en", "@value": f"synonym {i}.{j}" }
+                for j in range(3)
+                ],
+            "http://www.w3.org/2004/02/skos/core#broader": [
+                { "@id": f"https://derwen.ai/ns/v1#topic_{i // 10}" },
+                ],
+            "http://purl.org/spar/cito/usesMethodIn": [
+                { "@id": f"https://derwen.ai/ns/v1#citekey_{i % 50}" },
+                ],
+            "http://purl.org/ontology/bibo/authorList": {
+                "@list": [
+                    {
+                        "@id": f"https://derwen.ai/ns/v1#author_{i % 7}_{k}",
+                        "http://xmlns.com/foaf/0.1/name": { "@value": f"author {k}" },
+                    }
+                    for k in range(2)
+                    ],
+            },
+        }
+        for i in range(count)
+        ]
+
+
+def test_abbrev_iri_equivalence () -> None:
+    """
+Each path of `abbrev_iri()` produces the same output as the original
+recursive version.
+    """
+    payload = make_payload(10000)
+    expected = recursive_abbrev_iri(payload)
+
+    assert abbrev_iri(payload) == expected
+
+    # the in-place path modifies its input, so it gets a fresh copy
+    assert abbrev_iri(copy.deepcopy(payload), in_place=True) == expected
+
+    # the input must not get modified, except by the in-place path
+    assert payload == make_payload(10000)
+
+
+def test_abbrev_iri_deep_nesting () -> None:
+    """
+The iterative traversal handles nesting deeper than the recursion limit.
+    """
+    depth = 5000
+    item: typing.Any = { "@value": "leaf" }
+
+    for _ in range(depth):
+        item = { "http://example.org/ns#child": [ item ] }
+
+    result = abbrev_iri(item)
+
+    for _ in range(depth):
+        result = result["child"][0]
+
+    assert result == { "value": "leaf" }
+
+
+def test_abbrev_iri_scalars () -> None:
+    """
+Scalars pass through unchanged, and the in-place path returns its input.
+    """
+    assert abbrev_iri("http://example.org/ns#name") == "http://example.org/ns#name"
+    assert abbrev_iri(None) is None
+
+    item = { "@id": "x", "http://example.org/ns#name": [ { "@value": "y" } ] }
+    assert abbrev_iri(item, in_place=True) is item
+    assert item == { "id": "x", "name": [ { "value": "y" } ] }
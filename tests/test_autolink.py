@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for the Markdown splitter which keeps autolinking out
+of code blocks, HTML blocks, and headings.
+"""
+
+from mkrefs.autolink import TermMatcher, autolink_markdown
+from mkrefs.util import split_markdown
+
+
+def _autolink (
+    markdown: str,
+    ) -> str:
+    """
+Link the glossary term `knowledge graph` on a page, as the plugin would.
+    """
+    return autolink_markdown(markdown, TermMatcher([ "knowledge graph" ]), [ "glossary.md#knowledge-graph" ], "index.md")
+
+
+def _prose (
+    markdown: str,
+    ) -> str:
+    """
+Join the prose segments of a page.
+    """
+    return "".join(text for is_prose, text in split_markdown(markdown) if is_prose)
+
+
+def test_split_markdown_round_trip () -> None:
+    """
+The segments, joined in order, reproduce the input exactly.
+    """
+    markdown = "# Title\n\nSome text.\n\n    code\n\n<pre>\nx\n</pre>\n\n```\nfenced\n```\n"
+
+    assert "".join(text for _, text in split_markdown(markdown)) == markdown
+
+
+def test_prose_gets_linked () -> None:
+    """
+A mention in prose gets linked, only the first time.
+    """
+    assert _autolink("A knowledge graph, and another knowledge graph.\n") == \
+        "A [knowledge graph](glossary.md#knowledge-graph), and another knowledge graph.\n"
+
+
+def test_fenced_code_block () -> None:
+    """
+Fenced code blocks get left unchanged.
+    """
+    markdown = "```python\nkg = knowledge graph\n```\n"
+
+    assert _autolink(markdown) == markdown
+
+
+def test_indented_code_block () -> None:
+    """
+Indented code blocks get left unchanged, whether indented with spaces
+or a tab, including their blank lines and continued code lines.
+    """
+    markdown = "Some text.\n\n    build the knowledge graph\n\n    knowledge graph again\n"
+    assert _autolink(markdown) == markdown
+
+    markdown = "Some text.\n\n\tknowledge graph\n"
+    assert _autolink(markdown) == markdown
+
+
+def test_indented_continuation_line () -> None:
+    """
+An indented line which continues a paragraph is prose, not code.
+    """
+    assert _autolink("Some text\n    about a knowledge graph.\n") == \
+        "Some text\n    about a [knowledge graph](glossary.md#knowledge-graph).\n"
+
+
+def test_indented_list_content () -> None:
+    """
+The indented content of a list item is prose, while code within a list
+item needs 8 columns of indentation.
+    """
+    markdown = "- item\n\n    about the knowledge graph\n\n        knowledge graph code\n"
+    assert _prose(markdown) == "- item\n\n    about the knowledge graph\n\n"
+
+
+def test_indented_comment_is_not_heading () -> None:
+    """
+A `#` comment within an indented code block is code, not a heading,
+while a heading may be indented by at most 3 spaces.
+    """
+    markdown = "Some text.\n\n    # comment about the knowledge graph\n"
+    assert _autolink(markdown) == markdown
+
+    markdown = "   # The knowledge graph\n"
+    assert _autolink(markdown) == markdown
+
+
+def test_pre_block () -> None:
+    """
+`<pre>` blocks get left unchanged through their closing tag, even
+across blank lines.
+    """
+    markdown = "<pre>\nknowledge graph\n\nknowledge graph\n</pre>\n\nA knowledge graph.\n"
+
+    assert _autolink(markdown) == \
+        "<pre>\nknowledge graph\n\nknowledge graph\n</pre>\n\nA [knowledge graph](glossary.md#knowledge-graph).\n"
+
+
+def test_html_block () -> None:
+    """
+HTML blocks get left unchanged until a blank line.
+    """
+    markdown = "<div class=\"note\">\nknowledge graph\n</div>\n\nA knowledge graph.\n"
+
+    assert _autolink(markdown) == \
+        "<div class=\"note\">\nknowledge graph\n</div>\n\nA [knowledge graph](glossary.md#knowledge-graph).\n"
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for resolving the citation markers on a page, which
+must leave code blocks and HTML blocks unchanged.
+"""
+
+from mkrefs.cite import resolve_citations
+
+
+INDEX = {
+    "smith2015": ("biblio.md#smith2015", "A Title",),
+    "jones2020": ("biblio.md#jones2020", "Another Title",),
+}
+
+
+def test_citation_gets_linked () -> None:
+    """
+Known citekeys get linked relative to the page, and unknown citekeys
+get reported.
+    """
+    markdown, cited, unknown = resolve_citations("See [smith2015; @jones2020] and [doe2019].\n", INDEX, "guide/intro.md")
+
+    assert markdown == "See [[smith2015]](../biblio.md#smith2015), [[jones2020]](../biblio.md#jones2020) and [doe2019].\n"
+    assert cited == [ "smith2015", "jones2020" ]
+    assert unknown == [ "doe2019" ]
+
+
+def test_code_blocks () -> None:
+    """
+Citation markers within fenced code, indented code, and `<pre>` blocks
+neither get linked nor reported.
+    """
+    markdown = "\n".join([
+        "```",
+        "[smith2015]",
+        "```",
+        "",
+        "    [smith2015]",
+        "    [doe2019]",
+        "",
+        "<pre>",
+        "[smith2015]",
+        "[doe2019]",
+        "</pre>",
+        "",
+        ])
+
+    assert resolve_citations(markdown, INDEX, "index.md") == (markdown, [], [],)
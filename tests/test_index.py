@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for collecting the mentions of the index entities.
+"""
+
+from mkrefs.index import MentionIndex, get_apidocs_index_entities, get_biblio_index_entities
+
+
+def _get_mentions () -> MentionIndex:
+    """
+Index a glossary topic, an apidocs function, and a bibliography entry.
+    """
+    entities = [
+        {
+            "name": "knowledge graph",
+            "kind": "glossary",
+            "page": "glossary.md",
+            "heading": "knowledge graph",
+            "terms": [ "knowledge graph", "KG" ],
+            "aliases": [ "KG" ],
+        },
+    ]
+
+    entities.extend(get_apidocs_index_entities("ref.md", {
+        "package": [ { "package": "mkrefs", "class": {}, "function": { "load_kg": {} } } ],
+    }))
+
+    entities.extend(get_biblio_index_entities({ "biblio": { "page": "biblio.md" } }, {
+        "f": [ { "citeKey": "florescuc17" } ],
+    }))
+
+    return MentionIndex(entities)
+
+
+def test_scan_prose_only () -> None:
+    """
+Only the prose of a page counts as mentions of the glossary topics, not
+its code or headings, while the apidocs names count within inline code
+but not within code blocks.
+    """
+    mentions = _get_mentions()
+
+    assert mentions.scan("code.md", "# The knowledge graph\n\n```\nload_kg()\n```\n\n    load_kg()\n") == 0
+    assert mentions.scan("prose.md", "Call `load_kg()` to load a KG.\n") == 2
+    assert mentions.scan("quoted.md", "The `knowledge graph` gets loaded.\n") == 0
+    assert mentions.mentions == [ [ "prose.md" ], [ "prose.md" ], [] ]
+
+
+def test_scan_citation () -> None:
+    """
+The citekeys count as mentions within citation markers.
+    """
+    mentions = _get_mentions()
+
+    assert mentions.scan("page2.md", "See [florescuc17] and [@page1998; florescuc17].\n") == 1
+    assert mentions.scan("page3.md", "See [unknownkey2020].\n") == 0
+    assert mentions.mentions[2] == [ "page2.md" ]
+
+
+def test_function_anchor () -> None:
+    """
+Functions resolve to the anchor of their heading under `module
+functions`, rather than a method with the same name, and the links are
+relative to the base URL.
+    """
+    mentions = _get_mentions()
+    mentions.scan("guide/intro.md", "About the knowledge graph.\n")
+
+    page_anchors = {
+        "ref.md": {
+            "load_kg method": "load_kg-method",
+            "module functions\nload_kg method": "load_kg-method_1",
+        },
+    }
+
+    groups = mentions.get_groups(
+        "mkrefs_data/index.json",
+        { "glossary.md": "glossary/", "ref.md": "ref/", "guide/intro.md": "guide/intro/" },
+        { "guide/intro.md": "Intro" },
+        page_anchors,
+        )
+
+    assert groups["l"][0]["url"] == "../ref/#load_kg-method_1"
+    assert groups["k"][0]["pages"] == [ { "title": "Intro", "url": "../guide/intro/" } ]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for removing the stale generated pages, which must
+leave any hand-written pages in the same directory alone.
+"""
+
+import pathlib
+
+from mkrefs.util import prune_pages
+
+
+def test_prune_generated_pages_only (
+    tmp_path: pathlib.Path,
+    monkeypatch,
+    ) -> None:
+    """
+Only the pages which a previous build generated get removed, once the
+current build no longer generates them.
+    """
+    monkeypatch.setenv("MKREFS_CACHE_DIR", str(tmp_path / "cache"))
+
+    page_dir = tmp_path / "docs" / "ref"
+    page_dir.mkdir(parents=True)
+
+    for name in [ "index.md", "Old.md", "Kept.md" ]:
+        (page_dir / name).write_text(name, encoding="utf-8")
+
+    # the first build generates both class pages
+    assert not prune_pages(page_dir, [ page_dir / "Old.md", page_dir / "Kept.md" ])
+
+    # the next build no longer generates the page for the deleted class
+    assert prune_pages(page_dir, [ page_dir / "Kept.md" ]) == [ page_dir / "Old.md" ]
+    assert sorted(path.name for path in page_dir.glob("*.md")) == [ "Kept.md", "index.md" ]
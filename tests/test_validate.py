@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/mkrefs#license-and-copyright
+
+"""
+Regression cases for the invariants which get checked in the glossary
+and bibliography graphs before rendering.
+"""
+
+import kglab
+
+from mkrefs.validate import validate_biblio, validate_glossary
+
+
+_PREFIXES = """
+@prefix bibo: <http://purl.org/ontology/bibo/> .
+@prefix cito: <http://purl.org/spar/cito/> .
+@prefix derw: <https://derwen.ai/ns/v1#> .
+@prefix ex: <http://example.org/> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+"""
+
+_SPARQL_PREFIXES = " ".join([
+    "PREFIX bibo: <http://purl.org/ontology/bibo/>",
+    "PREFIX cito: <http://purl.org/spar/cito/>",
+    "PREFIX dct: <http://purl.org/dc/terms/>",
+    "PREFIX derw: <https://derwen.ai/ns/v1#>",
+    "PREFIX skos: <http://www.w3.org/2004/02/skos/core#>",
+    ])
+
+LOCAL_CONFIG = {
+    "biblio": {
+        "queries": {
+            "entry": f"{_SPARQL_PREFIXES} SELECT ?entry ?citeKey WHERE {{ ?entry a bibo:Article . OPTIONAL {{ ?entry derw:citeKey ?citeKey }} }}",
+            "entry_publisher": f"{_SPARQL_PREFIXES} SELECT ?entry ?isPartOf WHERE {{ ?entry a bibo:Article . ?entry dct:isPartOf ?isPartOf }}",
+        },
+    },
+    "glossary": {
+        "queries": {
+            "entry": f"{_SPARQL_PREFIXES} SELECT ?entry ?label WHERE {{ ?entry a derw:Topic . ?entry skos:prefLabel ?label }}",
+            "entry_syn": f"{_SPARQL_PREFIXES} SELECT ?entry ?synonym WHERE {{ ?entry a derw:Topic . ?entry skos:altLabel ?synonym }}",
+            "entry_ref": f"{_SPARQL_PREFIXES} SELECT ?entry ?closeMatch WHERE {{ ?entry a derw:Topic . ?entry skos:closeMatch ?closeMatch }}",
+            "entry_hyp": f"{_SPARQL_PREFIXES} SELECT ?entry ?hypernym WHERE {{ ?entry a derw:Topic . ?entry skos:broader ?hypernym }}",
+            "entry_cite": f"{_SPARQL_PREFIXES} SELECT ?entry ?citeKey WHERE {{ ?entry a derw:Topic . ?entry cito:usesMethodIn ?citeKey }}",
+        },
+    },
+}
+
+
+def _load_kg (
+    turtle: str,
+    ) -> kglab.KnowledgeGraph:
+    """
+Load a small inline graph.
+    """
+    kg = kglab.KnowledgeGraph()
+    kg.load_rdf_text(_PREFIXES + turtle, format="ttl")
+
+    return kg
+
+
+def test_missing_citekey () -> None:
+    """
+A bibliography entry without a citekey is an error.
+    """
+    issues, citekeys = validate_biblio(LOCAL_CONFIG, _load_kg("""
+ex:a a bibo:Article ; derw:citeKey "able2020" .
+ex:b a bibo:Article .
+"""))
+
+    assert issues == [ ("ERROR", "biblio entry `http://example.org/b` has no citekey",) ]
+    assert citekeys == { "able2020" }
+
+
+def test_duplicate_citekey () -> None:
+    """
+A citekey which several bibliography entries use is an error.
+    """
+    issues, _ = validate_biblio(LOCAL_CONFIG, _load_kg("""
+ex:a a bibo:Article ; derw:citeKey "able2020" .
+ex:b a bibo:Article ; derw:citeKey "able2020" .
+"""))
+
+    assert issues == [ ("ERROR", "biblio citekey `able2020` is used by several entries: http://example.org/a, http://example.org/b",) ]
+
+
+def test_unresolved_citation () -> None:
+    """
+A glossary entry which cites an unknown citekey is an error.
+    """
+    issues = validate_glossary(LOCAL_CONFIG, _load_kg("""
+ex:t a derw:Topic ; skos:prefLabel "topic" ; cito:usesMethodIn "able2020", "baker2021" .
+"""), citekeys={ "able2020" })
+
+    assert issues == [ ("ERROR", "glossary entry `http://example.org/t` cites `baker2021`, which is not a biblio entry",) ]
+
+
+def test_dangling_hypernym () -> None:
+    """
+A hypernym which the graph describes, but which is not a glossary
+entry, is an error, while an undescribed hypernym gets linked as an
+external IRI.
+    """
+    issues = validate_glossary(LOCAL_CONFIG, _load_kg("""
+ex:t a derw:Topic ; skos:prefLabel "topic" ; skos:broader ex:u, <http://example.com/external> .
+ex:u skos:prefLabel "untyped" .
+"""))
+
+    assert issues == [ ("ERROR", "glossary entry `http://example.org/t` has a dangling hypernym `http://example.org/u`, which is not a glossary entry",) ]